@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+""" bench_accessor_logging.py:
+    CPU cost per incoming device status message, with the message and device
+    field accessors' debug logging on and off.  Each message is a GDS-ACK for
+    the last of 20 devices, processed as MainTask does, followed by the LSU
+    message its change of state produces
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.envelope import MessageEnvelope
+from bob_auto_service.messages.log_status_update import LogStatusUpdateMessage
+from bob_auto_service.msg_processing_wemo import process_get_device_state_msg_ack
+from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.log_support import set_accessor_debug
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+MESSAGES = 2000
+DEVICES = 20
+GDSA_MSG = '%s,127.0.0.1,27001,127.0.0.1,27061,603,device%02d,%s,' \
+           '2017-10-04 07:01:%02d'
+
+
+# Benchmark *******************************************************************
+def make_logger(level, handler_level):
+    """ A logger like the service's: a handler, at handler_level, that
+    discards what it is given """
+    logger = logging.getLogger('bench.%s.%s' % (level, handler_level))
+    logger.setLevel(level)
+    logger.propagate = False
+    handler = logging.StreamHandler(open(os.devnull, 'w'))
+    handler.setLevel(handler_level)
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)-25s %(levelname)-10s %(funcName)-22s %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def measure(logger):
+    devices = [
+        Device(logger=logger, dev_name='device%02d' % i, dev_type='wemo_switch',
+               dev_addr='192.168.86.%s' % (i + 1), dev_rule='dusk to dawn')
+        for i in range(DEVICES)]
+    start = time.process_time()
+    for i in range(MESSAGES):
+        process_get_device_state_msg_ack(
+            logger, devices,
+            MessageEnvelope(GDSA_MSG % (100 + i % 900, DEVICES - 1,
+                                        ['on', 'off'][i % 2], i % 60)))
+        device = devices[-1]
+        LogStatusUpdateMessage(
+            logger=logger,
+            ref='101',
+            dest_addr='127.0.0.1',
+            dest_port='27011',
+            source_addr='127.0.0.1',
+            source_port='27001',
+            msg_type='102',
+            dev_name=device.dev_name,
+            dev_addr=device.dev_addr,
+            dev_status=device.dev_status,
+            dev_last_seen=device.dev_last_seen).complete
+    return 1e6 * (time.process_time() - start) / MESSAGES
+
+
+def main():
+    print('%s messages, %s devices' % (MESSAGES, DEVICES))
+    cases = [
+        ('DEBUG logger, DEBUG handler', logging.DEBUG, logging.DEBUG),
+        ('DEBUG logger, INFO handler', logging.DEBUG, logging.INFO),
+        ('INFO logger', logging.INFO, logging.INFO)]
+    for accessor_debug in [True, False]:
+        set_accessor_debug(accessor_debug)
+        for label, level, handler_level in cases:
+            print('accessor debug %-5s  %-28s %9.1f us/msg' % (
+                accessor_debug, label, measure(make_logger(level, handler_level))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+""" bench_cos.py:
+    Cost of the change of state check MainTask makes after each incoming
+    message, as the number of devices grows.  Each check follows a status
+    change on one device.  Compares scanning every device with taking the
+    registry's changed devices
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.device import DeviceRegistry
+from bob_auto_service.tools.log_support import set_accessor_debug
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+CHECKS = 2000
+DEVICE_COUNTS = [10, 100, 1000, 10000]
+
+
+# Benchmark *******************************************************************
+def scan_all(devices):
+    changed = [d for d in devices if d.status_changed]
+    for d in changed:
+        d.mark_logged()
+    return changed
+
+
+def scan_changed(devices):
+    changed = [d for d in devices.pop_changed() if d.status_changed]
+    for d in changed:
+        d.mark_logged()
+    return changed
+
+
+def measure(logger, count, scan):
+    devices = DeviceRegistry([
+        Device(logger=logger, dev_name='device%05d' % i,
+               dev_addr='192.168.86.%s' % (i % 254 + 1), dev_status='off',
+               dev_last_seen='2017-10-04 07:01:30')
+        for i in range(count)], logger=logger)
+    scan(devices)
+    elapsed = 0.0
+    for i in range(CHECKS):
+        devices[(i * 7919) % count].dev_status = ['on', 'off'][(i // count) % 2]
+        start = time.perf_counter()
+        scan(devices)
+        elapsed += time.perf_counter() - start
+    return 1e6 * elapsed / CHECKS
+
+
+def main():
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.INFO)
+    set_accessor_debug(False)
+    print('%s checks per case, us per check' % CHECKS)
+    print('%8s %12s %12s' % ('devices', 'scan all', 'changed only'))
+    for count in DEVICE_COUNTS:
+        print('%8s %12.2f %12.2f' % (
+            count, measure(logger, count, scan_all),
+            measure(logger, count, scan_changed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+""" bench_device_lookup.py:
+    Cost of finding a device by name, and of processing a GDS-ACK message,
+    as the number of devices grows.  Compares the linear search of a device
+    list with the name index of a DeviceRegistry
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.envelope import MessageEnvelope
+from bob_auto_service.msg_processing_wemo import process_get_device_state_msg_ack
+from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.device import DeviceRegistry
+from bob_auto_service.tools.device import search_device_list
+from bob_auto_service.tools.log_support import set_accessor_debug
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+LOOKUPS = 2000
+DEVICE_COUNTS = [10, 100, 1000, 10000]
+GDSA_MSG = '%s,127.0.0.1,27001,127.0.0.1,27061,603,device%05d,%s,' \
+           '2017-10-04 07:01:%02d'
+
+
+# Benchmark *******************************************************************
+def timed(func):
+    start = time.process_time()
+    for i in range(LOOKUPS):
+        func(i)
+    return 1e6 * (time.process_time() - start) / LOOKUPS
+
+
+def measure(logger, count):
+    devices = [
+        Device(logger=logger, dev_name='device%05d' % i, dev_type='wemo_switch',
+               dev_addr='192.168.86.%s' % (i % 254 + 1), dev_rule='schedule')
+        for i in range(count)]
+    registry = DeviceRegistry(list(devices), logger=logger)
+    # Spread the lookups over the whole table
+    names = ['device%05d' % ((i * 7919) % count) for i in range(LOOKUPS)]
+    msgs = [GDSA_MSG % (100 + i % 900, (i * 7919) % count, ['on', 'off'][i % 2],
+                        i % 60) for i in range(LOOKUPS)]
+    return (
+        timed(lambda i: search_device_list(devices, names[i], logger=logger)),
+        timed(lambda i: registry.by_name(names[i])),
+        timed(lambda i: process_get_device_state_msg_ack(
+            logger, devices, MessageEnvelope(msgs[i]))),
+        timed(lambda i: process_get_device_state_msg_ack(
+            logger, registry, MessageEnvelope(msgs[i]))))
+
+
+def main():
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.INFO)
+    set_accessor_debug(False)
+    print('%s lookups per case, us per lookup / message' % LOOKUPS)
+    print('%8s %12s %12s %12s %12s' % (
+        'devices', 'list search', 'registry', 'GDSA list', 'GDSA registry'))
+    for count in DEVICE_COUNTS:
+        print('%8s %12.2f %12.2f %12.2f %12.2f' % ((count,) + measure(logger, count)))
+
+
+if __name__ == "__main__":
+    main()
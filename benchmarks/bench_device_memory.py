@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+""" bench_device_memory.py:
+    Memory used per device, and the cost per device of the change of state
+    scan MainTask.check_cos runs over the device table
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import datetime
+import logging
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.log_support import set_accessor_debug
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+DEVICES = 10000
+SCANS = 20
+
+
+# Benchmark *******************************************************************
+def make_devices(logger):
+    return [
+        Device(logger=logger, dev_name='device%05d' % i, dev_type='wemo_switch',
+               dev_addr='192.168.86.%s' % (i % 254 + 1), dev_cmd='on',
+               dev_status='on', dev_status_mem='on',
+               dev_last_seen=datetime.datetime(2017, 10, 4, 7, 1, i % 60),
+               dev_last_seen_mem=datetime.datetime(2017, 10, 4, 7, 1, i % 60),
+               dev_rule='schedule')
+        for i in range(DEVICES)]
+
+
+def scan(devices):
+    """ The compare check_cos makes for each device, with no changes found """
+    changed = 0
+    for d in devices:
+        if d.dev_status is not d.dev_status_mem or \
+                d.last_seen != d.last_seen_mem:
+            changed += 1
+    return changed
+
+
+def main():
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.INFO)
+    set_accessor_debug(False)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    devices = make_devices(logger)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print('%s devices' % DEVICES)
+    print('memory per device     %9.1f bytes' % ((after - before) / DEVICES))
+    start = time.process_time()
+    for i in range(SCANS):
+        scan(devices)
+    print('COS scan per device   %9.3f us' % (
+        1e6 * (time.process_time() - start) / (DEVICES * SCANS)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+""" bench_forwarding.py:
+    Compares re-addressing a misdirected message by decoding it into its
+    message class against splicing the new destination into the raw header
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import timeit
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.log_status_update import LogStatusUpdateMessage
+from bob_auto_service.messages.set_device_state import SetDeviceStateMessage
+from bob_auto_service.msg_processing import forward_msg
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+NUMBER = 50000
+LOGGER = logging.getLogger('bench')
+LOGGER.setLevel(logging.WARNING)
+CASES = [
+    (LogStatusUpdateMessage,
+     '102,127.0.0.1,27001,192.168.86.2,27051,102,fylt1,192.168.86.21,on,'
+     '2017-10-04 07:01:03'),
+    (SetDeviceStateMessage,
+     '103,127.0.0.1,27001,192.168.86.2,27051,604,fylt1,192.168.86.21,on,'
+     'off,2017-10-04 07:01:03')
+]
+
+
+# Benchmark *******************************************************************
+def decoded_forward(cls, msg, dest_addr, dest_port):
+    """ The decode / re-address / encode path forward_msg replaced """
+    message = cls(LOGGER)
+    message.complete = msg
+    message.dest_addr = dest_addr
+    message.dest_port = dest_port
+    return message.complete
+
+
+def main():
+    print('%-24s %12s %12s %8s' % ('message', 'decoded', 'spliced', 'speedup'))
+    for cls, msg in CASES:
+        assert decoded_forward(cls, msg, '192.168.86.1', '27011') == \
+            forward_msg(LOGGER, msg, '192.168.86.1', '27011')
+        decoded = timeit.timeit(
+            lambda: decoded_forward(cls, msg, '192.168.86.1', '27011'),
+            number=NUMBER)
+        spliced = timeit.timeit(
+            lambda: forward_msg(LOGGER, msg, '192.168.86.1', '27011'),
+            number=NUMBER)
+        print('%-24s %9.2f us %9.2f us %7.1fx' % (
+            cls.__name__, 1e6 * decoded / NUMBER, 1e6 * spliced / NUMBER,
+            decoded / spliced))
+
+
+if __name__ == "__main__":
+    main()
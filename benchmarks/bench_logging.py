@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+""" bench_logging.py:
+    Time spent in the calling thread per debug record, for the original
+    logging setup (console, debug file and one filtered file handler per
+    [EXTRA LOG HANDLERS] entry, all run synchronously) against the queue
+    handler with a background listener and routed log files
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.tools.log_support import LogRouter
+from bob_auto_service.tools.log_support import start_queue_logging
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+RECORDS = 5000
+ROUTES = 30
+
+
+# Benchmark *******************************************************************
+class FileFuncFilter(logging.Filter):
+    """ The per-handler filter the original setup used """
+    def __init__(self, file_name, func_name):
+        super(FileFuncFilter, self).__init__()
+        self.file_name = file_name
+        self.func_name = func_name
+
+    def filter(self, record):
+        if len(self.file_name) != 0 and len(self.func_name) != 0:
+            return record.filename == self.file_name and record.funcName == self.func_name
+        if len(self.file_name) != 0:
+            return record.filename == self.file_name
+        if len(self.func_name) != 0:
+            return record.funcName == self.func_name
+        return True
+
+
+def file_handlers(log_path):
+    handlers = []
+    for i in range(ROUTES):
+        file_name = 'bench_logging.py' if i == ROUTES - 1 else 'module%02d.py' % i
+        handler = logging.FileHandler(os.path.join(log_path, '%s.log' % i))
+        handler.setFormatter(logging.Formatter('%(asctime)-25s %(levelname)-10s %(message)s'))
+        handlers.append((file_name, handler))
+    debug = logging.FileHandler(os.path.join(log_path, 'Debug.log'))
+    debug.setFormatter(logging.Formatter(
+        '%(asctime)-25s %(levelname)-10s %(funcName)-22s %(message)s'))
+    return debug, handlers
+
+
+def measure(logger):
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        logger.debug('Message [%s] successfully queued', i)
+    return 1e6 * (time.perf_counter() - start) / RECORDS
+
+
+def main():
+    log_path = tempfile.mkdtemp()
+    # Original: every handler, and its filter, runs in the caller's thread
+    logger = logging.getLogger('bench.sync')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    debug, handlers = file_handlers(log_path)
+    logger.addHandler(debug)
+    for file_name, handler in handlers:
+        handler.addFilter(FileFuncFilter(file_name, ''))
+        logger.addHandler(handler)
+    print('synchronous, %s filtered handlers  %8.1f us/record' % (ROUTES, measure(logger)))
+
+    # Queue handler in the caller's thread, routed handlers on the listener's
+    logger = logging.getLogger('bench.queue')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    debug, handlers = file_handlers(log_path)
+    router = LogRouter()
+    for file_name, handler in handlers:
+        router.add_route(file_name, '', handler)
+    listener = start_queue_logging(logger, [debug, router])
+    caller = measure(logger)
+    start = time.perf_counter()
+    listener.stop()
+    print('queued, %s routes                 %8.1f us/record '
+          '(listener drained the rest in %.2f s)' % (
+              ROUTES, caller, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
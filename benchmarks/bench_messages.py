@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+""" bench_messages.py:
+    Compares construct, encode, decode and memory cost of the table-driven
+    message classes, with their compiled codecs, against the hand-written
+    classes they replaced.  Decode is timed into an existing message.  The
+    legacy classes are loaded from the commit before messages/base.py was
+    added, so this must be run from a git checkout
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import datetime
+import logging
+import os
+import subprocess
+import sys
+import timeit
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.heartbeat import HeartbeatMessage
+from bob_auto_service.messages.log_status_update import LogStatusUpdateMessage
+from bob_auto_service.messages.set_device_state import SetDeviceStateMessage
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NUMBER = 20000
+INSTANCES = 10000
+LOGGER = logging.getLogger('bench')
+LOGGER.setLevel(logging.WARNING)
+CASES = [
+    ('heartbeat', 'HeartbeatMessage', HeartbeatMessage,
+     dict(ref='101', dest_addr='192.168.86.1', dest_port='27061',
+          source_addr='192.168.86.2', source_port='27051', msg_type='100'),
+     '101,192.168.86.1,27061,192.168.86.2,27051,100'),
+    ('log_status_update', 'LogStatusUpdateMessage', LogStatusUpdateMessage,
+     dict(ref='102', dest_addr='192.168.86.1', dest_port='27011',
+          source_addr='192.168.86.2', source_port='27051', msg_type='102',
+          dev_name='fylt1', dev_addr='192.168.86.21', dev_status='on',
+          dev_last_seen=datetime.datetime(2017, 10, 4, 7, 1, 3)),
+     '102,192.168.86.1,27011,192.168.86.2,27051,102,fylt1,192.168.86.21,on,'
+     '2017-10-04 07:01:03'),
+    ('set_device_state', 'SetDeviceStateMessage', SetDeviceStateMessage,
+     dict(ref='103', dest_addr='192.168.86.1', dest_port='27041',
+          source_addr='192.168.86.2', source_port='27051', msg_type='604',
+          dev_name='fylt1', dev_addr='192.168.86.21', dev_cmd='on',
+          dev_status='off', dev_last_seen='2017-10-04 07:01:03'),
+     '103,192.168.86.1,27041,192.168.86.2,27051,604,fylt1,192.168.86.21,on,'
+     'off,2017-10-04 07:01:03')
+]
+
+
+# Benchmark *******************************************************************
+def legacy_class(module, name):
+    """ Loads a hand-written message class from before messages/base.py """
+    added = subprocess.check_output(
+        ['git', 'log', '--diff-filter=A', '--format=%H', '--',
+         'bob_auto_service/messages/base.py'], cwd=REPO).decode().split()
+    revision = added[-1] + '^' if len(added) > 0 else 'HEAD'
+    source = subprocess.check_output(
+        ['git', 'show', '%s:bob_auto_service/messages/%s.py' % (revision, module)],
+        cwd=REPO).decode()
+    namespace = {'__name__': 'legacy_' + module}
+    exec(compile(source, module + '.py', 'exec'), namespace)
+    return namespace[name]
+
+
+def measure(cls, kwargs, wire):
+    built = cls(logger=LOGGER, **kwargs)
+    construct = timeit.timeit(lambda: cls(logger=LOGGER, **kwargs), number=NUMBER)
+    encode = timeit.timeit(lambda: built.complete, number=NUMBER)
+
+    target = cls(logger=LOGGER)
+
+    def decode():
+        target.complete = wire
+    decode = timeit.timeit(decode, number=NUMBER)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [cls(logger=LOGGER, **kwargs) for i in range(INSTANCES)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del keep
+    return [1e6 * construct / NUMBER, 1e6 * encode / NUMBER,
+            1e6 * decode / NUMBER, size / INSTANCES]
+
+
+def main():
+    print('%-18s %-8s %12s %12s %12s %12s' % (
+        'message', 'classes', 'construct', 'encode', 'decode', 'bytes/msg'))
+    for module, name, cls, kwargs, wire in CASES:
+        legacy = legacy_class(module, name)
+        assert legacy(logger=LOGGER, **kwargs).complete == cls(logger=LOGGER, **kwargs).complete
+        decoded = cls(logger=LOGGER)
+        decoded.complete = wire
+        assert decoded.complete == wire
+        results = []
+        for label, msg_class in [('legacy', legacy), ('table', cls)]:
+            results.append(measure(msg_class, kwargs, wire))
+            print('%-18s %-8s %9.2f us %9.2f us %9.2f us %12.0f' % tuple(
+                [module, label] + results[-1]))
+        print('%-18s %-8s %11.1fx %11.1fx %11.1fx %11.1fx' % tuple(
+            [module, 'speedup'] +
+            [old / new for old, new in zip(results[0], results[1])]))
+
+
+if __name__ == "__main__":
+    main()
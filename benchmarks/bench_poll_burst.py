@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+""" bench_poll_burst.py:
+    Outbound queue depth while MainTask sends its periodic heartbeats and
+    schedule polls, with all of each interval's messages queued at once and
+    with them paced over the interval.  Intervals are scaled down from
+    minutes to a second, and the outbound queue is drained at a fixed send
+    rate, as the message handler would
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.configure import ConfigureService
+from bob_auto_service.service_main import MainTask
+from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.ref_num import RefNum
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+DEVICES = 200
+INTERVAL = 1.0
+RUN_TIME = 5.0
+SEND_TIME = 0.002
+SAMPLE_TIME = 0.005
+WINDOW = 0.1
+CASES = [
+    ('all at once', {}),
+    ('paced', {'hb_spread': 0.15, 'schedule_spread': 0.75, 'pace_jitter': 0.2})]
+
+
+# Benchmark *******************************************************************
+@asyncio.coroutine
+def send(loop, msg_out_queue, sent):
+    """ Takes messages off the outbound queue at one per SEND_TIME """
+    while True:
+        yield from msg_out_queue.get()
+        sent.append(loop.time())
+        yield from asyncio.sleep(SEND_TIME, loop=loop)
+
+
+@asyncio.coroutine
+def measure(loop, logger, service_addresses, message_types, pacing):
+    """ Returns the sampled outbound queue depths and the send times """
+    msg_out_queue = asyncio.Queue(loop=loop)
+    main_task = MainTask(
+        logger=logger,
+        loop=loop,
+        ref=RefNum(logger=logger),
+        devices=[Device(logger=logger, dev_name='device%03d' % i,
+                        dev_type='wemo_switch', dev_rule='schedule')
+                 for i in range(DEVICES)],
+        msg_in_queue=asyncio.Queue(loop=loop),
+        msg_out_queue=msg_out_queue,
+        service_addresses=service_addresses,
+        message_types=message_types,
+        hb_interval=INTERVAL,
+        schedule_interval=INTERVAL,
+        **pacing)
+    sent = []
+    tasks = [asyncio.ensure_future(main_task.run(), loop=loop),
+             asyncio.ensure_future(send(loop, msg_out_queue, sent), loop=loop)]
+
+    depths = []
+    end = loop.time() + RUN_TIME
+    while loop.time() < end:
+        depths.append(msg_out_queue.qsize())
+        yield from asyncio.sleep(SAMPLE_TIME, loop=loop)
+
+    for task in tasks:
+        task.cancel()
+    yield from asyncio.wait(tasks, loop=loop)
+    return depths, sent
+
+
+def peak_rate(sent):
+    """ Most messages sent in any WINDOW seconds """
+    peak = 0
+    first = 0
+    for last, when in enumerate(sent):
+        while sent[first] <= when - WINDOW:
+            first += 1
+        peak = max(peak, last - first + 1)
+    return peak
+
+
+def main():
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.WARNING)
+    config = ConfigureService(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini'))
+    service_addresses = config.get_servers()
+    message_types = config.get_message_types()
+    loop = asyncio.get_event_loop()
+    print('%s devices, %s s intervals, %s s run, %.0f ms per send' % (
+        DEVICES, INTERVAL, RUN_TIME, 1000 * SEND_TIME))
+    print('%-12s %10s %10s %10s %18s' % (
+        '', 'peak depth', 'avg depth', 'sent', 'peak per %.0f ms' % (1000 * WINDOW)))
+    for name, pacing in CASES:
+        depths, sent = loop.run_until_complete(
+            measure(loop, logger, service_addresses, message_types, pacing))
+        print('%-12s %10s %10.1f %10s %18s' % (
+            name, max(depths), sum(depths) / len(depths), len(sent),
+            peak_rate(sent)))
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
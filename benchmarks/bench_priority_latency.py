@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+""" bench_priority_latency.py:
+    Measures set-device-state command latency under bursts of schedule
+    polls, log updates and heartbeats, with a FIFO outgoing queue and with
+    the priority queue
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.configure import ConfigureService
+from bob_auto_service.tools.framing import FRAMED_PREAMBLE
+from bob_auto_service.tools.message_handlers import MessageHandler
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+PORT = 27092
+BURSTS = 10
+BURST_SIZE = 300
+COMMANDS_PER_BURST = 10
+PEER_DELAY = 0.0005
+MSG = '%s,127.0.0.1,' + str(PORT) + ',127.0.0.1,27051,%s,fylt1,192.168.86.21'
+
+
+# Benchmark *******************************************************************
+class Peer(object):
+    """ Peer that takes PEER_DELAY seconds to handle each message """
+    def __init__(self):
+        self.received = {}
+
+    @asyncio.coroutine
+    def handle(self, reader, writer):
+        while True:
+            data = yield from reader.readline()
+            data = data.lstrip(FRAMED_PREAMBLE)
+            if len(data) == 0:
+                break
+            self.received[data.split(b',', 1)[0].decode()] = time.perf_counter()
+            yield from asyncio.sleep(PEER_DELAY)
+            writer.write(data.split(b',', 1)[0] + b'\n')
+            yield from writer.drain()
+        writer.close()
+
+
+@asyncio.coroutine
+def measure(loop, logger, priorities, default_class):
+    """ Returns the latencies of the command messages """
+    random.seed(1)
+    peer = Peer()
+    server = yield from asyncio.start_server(
+        peer.handle, host='127.0.0.1', port=PORT, loop=loop)
+    handler = MessageHandler(loop, logger=logger, priorities=priorities,
+                             default_class=default_class,
+                             framed_peers=[('127.0.0.1', PORT)])
+    task = asyncio.ensure_future(handler.handle_msg_out(), loop=loop)
+
+    ref = 100
+    sent_at = {}
+    for burst in range(BURSTS):
+        commands = set(random.sample(range(BURST_SIZE), COMMANDS_PER_BURST))
+        for i in range(BURST_SIZE):
+            ref += 1
+            if i in commands:
+                msg_type = '604'
+                sent_at[str(ref)] = time.perf_counter()
+            else:
+                msg_type = random.choice(['302', '302', '102', '100'])
+            handler.msg_out_queue.put_nowait(MSG % (ref, msg_type))
+        while len(peer.received) < ref - 100:
+            yield from asyncio.sleep(0.01, loop=loop)
+
+    task.cancel()
+    for sender in handler.senders.values():
+        sender.stop()
+    handler.pool.close_all()
+    server.close()
+    yield from server.wait_closed()
+    yield from asyncio.sleep(0.01, loop=loop)
+    return [peer.received[key] - value for key, value in sent_at.items()]
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    print('%-10s mean %8.2f ms   p50 %8.2f ms   p99 %8.2f ms   max %8.2f ms' % (
+        name,
+        1000 * sum(latencies) / len(latencies),
+        1000 * latencies[len(latencies) // 2],
+        1000 * latencies[int(len(latencies) * 0.99) - 1],
+        1000 * latencies[-1]))
+
+
+def main():
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.WARNING)
+    config = ConfigureService(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini'))
+    priorities, default_class = config.get_message_priorities()
+    loop = asyncio.get_event_loop()
+    print('%s bursts of %s messages (%s set_device_state each), peer takes '
+          '%s ms per message' % (BURSTS, BURST_SIZE, COMMANDS_PER_BURST,
+                                  1000 * PEER_DELAY))
+    report('fifo', loop.run_until_complete(measure(loop, logger, {}, 0)))
+    report('priority', loop.run_until_complete(
+        measure(loop, logger, priorities, default_class)))
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
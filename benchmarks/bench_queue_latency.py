@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+""" bench_queue_latency.py:
+    Compares inbound-to-outbound latency and idle CPU use of the legacy
+    sleep-polling main loop against the event-driven main loop
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.configure import ConfigureService
+from bob_auto_service.service_main import MainTask
+from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.ref_num import RefNum
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+MESSAGES = 200
+GAP = 0.02
+IDLE_TIME = 2.0
+GDS_MSG = '%s,127.0.0.1,27001,127.0.0.1,27061,602,fylt1,192.168.86.21,on,' \
+          '2017-08-05 08:45:00'
+
+
+# Legacy main loop ************************************************************
+class PollingMainTask(MainTask):
+    """ Main task driven by the original qsize()/sleep() polling loop """
+    @asyncio.coroutine
+    def run(self):
+        while True:
+            self.out_msg_list = []
+            sleep_time = 0.2
+            if self.msg_in_queue.qsize() > 0:
+                sleep_time = 0.01
+                self.next_msg = self.msg_in_queue.get_nowait()
+                self.process_msg()
+            self.check_cos()
+            yield from asyncio.sleep(sleep_time)
+
+
+# Benchmark *******************************************************************
+@asyncio.coroutine
+def measure(task_class, loop, logger, service_addresses, message_types):
+    """ Returns per-message latencies and the CPU seconds used while idle """
+    ref_num = RefNum(logger=logger)
+    msg_in_queue = asyncio.Queue(loop=loop)
+    msg_out_queue = asyncio.Queue(loop=loop)
+    main_task = task_class(
+        logger=logger,
+        loop=loop,
+        ref=ref_num,
+        devices=[Device(logger=logger, dev_name='fylt1', dev_type='wemo_switch',
+                        dev_addr='192.168.86.21', dev_rule='dusk to dawn')],
+        msg_in_queue=msg_in_queue,
+        msg_out_queue=msg_out_queue,
+        service_addresses=service_addresses,
+        message_types=message_types)
+    task = asyncio.ensure_future(main_task.run(), loop=loop)
+
+    latencies = []
+    for i in range(MESSAGES):
+        yield from asyncio.sleep(GAP, loop=loop)
+        start = time.perf_counter()
+        msg_in_queue.put_nowait(GDS_MSG % ref_num.new())
+        yield from msg_out_queue.get()
+        latencies.append(time.perf_counter() - start)
+
+    cpu_start = time.process_time()
+    yield from asyncio.sleep(IDLE_TIME, loop=loop)
+    idle_cpu = time.process_time() - cpu_start
+
+    task.cancel()
+    yield from asyncio.wait([task], loop=loop)
+    return latencies, idle_cpu
+
+
+def report(name, latencies, idle_cpu):
+    latencies = sorted(latencies)
+    print('%-14s mean %8.3f ms   p50 %8.3f ms   p99 %8.3f ms   idle CPU %6.2f%%' % (
+        name,
+        1000 * sum(latencies) / len(latencies),
+        1000 * latencies[len(latencies) // 2],
+        1000 * latencies[int(len(latencies) * 0.99) - 1],
+        100 * idle_cpu / IDLE_TIME))
+
+
+def main():
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.WARNING)
+    config = ConfigureService(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini'))
+    service_addresses = config.get_servers()
+    message_types = config.get_message_types()
+    loop = asyncio.get_event_loop()
+    print('%s messages, %s s apart, %s s idle window' % (MESSAGES, GAP, IDLE_TIME))
+    for name, task_class in [('polling', PollingMainTask), ('event-driven', MainTask)]:
+        latencies, idle_cpu = loop.run_until_complete(
+            measure(task_class, loop, logger, service_addresses, message_types))
+        report(name, latencies, idle_cpu)
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
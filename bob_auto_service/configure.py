@@ -13,6 +13,11 @@ import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.device import DeviceRegistry
+from bob_auto_service.tools.log_support import FlightRecorder
+from bob_auto_service.tools.log_support import LogRouter
+from bob_auto_service.tools.log_support import set_accessor_debug
+from bob_auto_service.tools.log_support import start_queue_logging
 
 
 # Authorship Info *************************************************************
@@ -26,43 +31,21 @@ __email__ = "csmaue@gmail.com"
 __status__ = "Development"
 
 
-# Log Filter for Individual file/functions ************************************
-class MyLogHandlerFilter(logging.Filter):
-    def __init__(self, file_name, func_name):
-        self.file_name = file_name
-        self.func_name = func_name
-        super().__init__()
-
-    def filter(self, record):
-        if len(self.file_name) != 0 and len(self.func_name) != 0:
-            if record.filename == self.file_name and record.funcName == self.func_name:
-                return True
-            else:
-                return False
-        elif len(self.file_name) != 0 and len(self.func_name) == 0:
-            if record.filename == self.file_name:
-                return True
-            else:
-                return False
-        elif len(self.file_name) == 0 and len(self.func_name) != 0:
-            if record.funcName == self.func_name:
-                return True
-            else:
-                return False
-        elif len(self.file_name) == 0 and len(self.func_name) == 0:
-            return True
-        else:
-            return False
-
-
 # Config Function Def *********************************************************
 class ConfigureService(object):
     def __init__(self, filename):
         self.filename = filename
+        self.logger = logging.getLogger(__name__)
+        self.accessor_debug = True
         self.service_addresses = {}
+        self.framed_peers = []
+        self.message_handling = {}
         self.message_types = {}
+        self.message_priorities = {}
+        self.default_class = 1
         self.latitude = float()
         self.longitude = float()
+        self.utc_offset = None
         self.devices = []
         self.device_num = int()
         self.device_id = str()
@@ -71,8 +54,11 @@ class ConfigureService(object):
         self.func_names = {}
         self.handlers = []
         self.log_path = str()
-        self.handlers = []
-        self.filters = []
+        self.log_listener = None
+        self.router = None
+        self.flight_recorder = None
+        self.flight_recorder_size = 0
+        self.file_level = logging.DEBUG
         self.formatters = []
         self.file_name = str()
         self.func_name = str()
@@ -87,15 +73,14 @@ class ConfigureService(object):
         self.log_path = self.config_file['LOG FILES']['log_file_path']
         self.logger = logging.getLogger('master')
         self.logger.setLevel(logging.DEBUG)
-        self.logger.handlers = []
+        if self.log_listener is not None:
+            self.log_listener.stop()
         os.makedirs(self.log_path, exist_ok=True)
         # Console handler
         self.ch = logging.StreamHandler(sys.stdout)
         self.ch.setLevel(logging.INFO)
         self.cf = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         self.ch.setFormatter(self.cf)
-        self.logger.addHandler(self.ch)
-        self.logger.info('Console logger handler created and applied')
         # File handler
         self.fh = logging.handlers.TimedRotatingFileHandler(
             os.path.join(self.log_path, "Debug.log"),
@@ -103,16 +88,25 @@ class ConfigureService(object):
             interval=1,
             backupCount=4
         )
-        self.fh.setLevel(logging.DEBUG)
+        # With the flight recorder on, debug records are only kept in memory
+        self.flight_recorder_size = self.config_file['LOG FILES'].getint(
+            'flight_recorder_size', fallback=0)
+        if self.flight_recorder_size > 0:
+            self.file_level = logging.INFO
+        else:
+            self.file_level = logging.DEBUG
+        self.fh.setLevel(self.file_level)
         self.ff = logging.Formatter(
             '%(asctime)-25s %(levelname)-10s '
             '%(funcName)-22s %(message)s'
         )
         self.fh.setFormatter(self.ff)
-        self.logger.addHandler(self.fh)
-        self.logger.info('File logger handler created and applied')
 
-        # Extra handlers defined by config.ini
+        # Extra handlers defined by config.ini, each fed by the router from
+        # the file and/or function it names
+        self.router = LogRouter()
+        self.handlers = []
+        self.formatters = []
         self.i = 0
         for key, value in self.config_file.items('EXTRA LOG HANDLERS'):
             self.file_name = str()
@@ -137,21 +131,39 @@ class ConfigureService(object):
                     backupCount=4
                 )
             )
-            # Create filter based on function name and apply to handler
-            self.filters.append(
-                MyLogHandlerFilter(
-                    file_name=self.file_name,
-                    func_name=self.func_name
-                )
-            )
-            self.handlers[self.i].addFilter(self.filters[self.i])
             # Create formatter and apply to handler
             self.formatters.append(logging.Formatter('%(asctime)-25s %(levelname)-10s %(message)s'))
             self.handlers[self.i].setFormatter(self.formatters[self.i])
-            # Add handler to logger
-            self.logger.addHandler(self.handlers[self.i])
+            self.handlers[self.i].setLevel(self.file_level)
+            # Route this file/function name's records to handler
+            self.router.add_route(
+                self.file_name, self.func_name, self.handlers[self.i])
             self.i += 1
 
+        # Ring buffer of recent records, written out on errors or on request
+        self.flight_recorder = None
+        if self.flight_recorder_size > 0:
+            self.flight_recorder = FlightRecorder(
+                self.log_path, capacity=self.flight_recorder_size)
+
+        # Handlers run on a background thread so disk I/O never blocks the
+        # event loop
+        self.log_listener = start_queue_logging(
+            self.logger,
+            [self.ch, self.fh, self.router] +
+            ([self.flight_recorder] if self.flight_recorder is not None else []))
+        self.logger.info('Console and file log handlers created and applied, '
+                         'with %s routed log files', self.i)
+        self.logger.info('Log files written at %s and up, debug flight recorder '
+                         'size: %s', logging.getLevelName(self.file_level),
+                         self.flight_recorder_size)
+
+        # Message and device field accessor logging, off for production
+        self.accessor_debug = self.config_file['LOG FILES'].getboolean(
+            'accessor_debug', fallback=True)
+        set_accessor_debug(self.accessor_debug)
+        self.logger.info('Field accessor debug logging: %s', self.accessor_debug)
+
         # Return configured objects to main program
         return self.logger
 
@@ -165,6 +177,32 @@ class ConfigureService(object):
         return self.service_addresses
 
 
+    def get_framed_peers(self):
+        # Create list of (addr, port) services that have been upgraded to
+        # newline-framed messages on a persistent connection
+        self.config_file.read(self.filename)
+        self.framed_peers = []
+        if self.config_file.has_section('FRAMED PEERS'):
+            for key, value in self.config_file.items('FRAMED PEERS'):
+                self.split = value.split(':', 1)
+                if len(self.split) == 2:
+                    self.framed_peers.append((self.split[0], self.split[1]))
+        # Return list of framed peers to main program
+        return self.framed_peers
+
+
+    def get_message_handling(self):
+        # Create dict of outgoing message handling options defined in INI file
+        self.config_file.read(self.filename)
+        self.message_handling = {}
+        if self.config_file.has_section('MESSAGE HANDLING'):
+            for option in self.config_file.options('MESSAGE HANDLING'):
+                self.message_handling[option] = \
+                    self.config_file['MESSAGE HANDLING'][option]
+        # Return dict of message handling options to main program
+        return self.message_handling
+
+
     def get_message_types(self):
         # Create dict with all services defined in INI file
         self.config_file.read(self.filename)
@@ -174,6 +212,24 @@ class ConfigureService(object):
         return self.message_types
 
 
+    def get_message_priorities(self):
+        # Create dict of outgoing priority class by message type code.  The
+        # INI file names the message types, so look up their codes
+        self.config_file.read(self.filename)
+        self.message_priorities = {}
+        self.default_class = 1
+        if self.config_file.has_section('MESSAGE PRIORITIES'):
+            for option in self.config_file.options('MESSAGE PRIORITIES'):
+                value = int(self.config_file['MESSAGE PRIORITIES'][option])
+                if option == 'default':
+                    self.default_class = value
+                elif self.config_file.has_option('MESSAGE TYPES', option):
+                    self.message_priorities[
+                        self.config_file['MESSAGE TYPES'][option]] = value
+        # Return dict of priority classes and the default class to main program
+        return self.message_priorities, self.default_class
+
+
     def get_location(self):
         self.config_file.read(self.filename)
         self.latitude = float(self.config_file['LOCATION']['latitude'])
@@ -182,6 +238,17 @@ class ConfigureService(object):
         return self.latitude, self.longitude
 
 
+    def get_utc_offset(self):
+        # Standard time offset from UTC in hours, or None if the INI file
+        # doesn't give one and the system time zone should be used
+        self.config_file.read(self.filename)
+        self.utc_offset = None
+        if self.config_file.has_option('LOCATION', 'utc_offset'):
+            self.utc_offset = float(self.config_file['LOCATION']['utc_offset'])
+        # Return configured offset to main program
+        return self.utc_offset
+
+
     def get_devices(self):
         self.config_file.read(self.filename)
         # Create list of automation devices defined in config.ini file
@@ -216,5 +283,5 @@ class ConfigureService(object):
                 self.device.dev_addr, self.device.dev_cmd,
                 self.device.dev_status, self.device.dev_last_seen,
                 self.device.dev_rule)
-        # Return configured objects to main program
-        return self.devices
+        # Return configured objects to main program, indexed for lookups
+        return DeviceRegistry(self.devices, logger=self.logger)
@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+""" base.py:
+    Table-driven base class for the inter-service message types
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import re
+import sys
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.tools.ipv4_help import IPV4_REGEX
+from bob_auto_service.tools.field_checkers import DATETIME_REGEX
+from bob_auto_service.tools.field_checkers import is_valid_datetime
+from bob_auto_service.tools import log_support
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Field validators ************************************************************
+# Each validator takes the new value, the field's current value and a logger,
+# and returns the string to store or REJECTED to keep the current value.
+# They accept the same values as in_int_range() and check_ipv4(), without
+# those functions' per-call debug logging.
+#
+# A validator's `pattern` is a regex for the wire values it accepts as-is, and
+# its `value` a %-template of the expression, given the wire value, that
+# yields the string to store.  The generated decoder checks every field's
+# pattern in a single match and falls back to the validators themselves when
+# it fails, so a pattern may be narrower than its validator but never wider
+REJECTED = object()
+
+
+def _int_range(low_limit, high_limit, pattern):
+    def check(value, current, logger):
+        if isinstance(value, (str, int)):
+            try:
+                if low_limit <= int(value) <= high_limit:
+                    return str(value)
+            except ValueError:
+                pass
+        return REJECTED
+    check.pattern = pattern
+    check.value = '%s'
+    return check
+
+
+ref_number = _int_range(100, 999, r'[1-9][0-9][0-9]')
+port_number = _int_range(10000, 60000, r'[1-5][0-9]{4}|60000')
+msg_type_number = _int_range(100, 999, r'[1-9][0-9][0-9]')
+device_id = _int_range(1, 99999999, r'0*[1-9][0-9]{0,7}')
+
+
+def ipv4_address(value, current, logger):
+    if isinstance(value, str) is not True:
+        value = str(value)
+    if IPV4_REGEX.fullmatch(value) is not None:
+        return value
+    return REJECTED
+ipv4_address.reject_level = logging.WARNING
+ipv4_address.pattern = IPV4_REGEX.pattern
+ipv4_address.value = '%s'
+
+
+def text(value, current, logger):
+    if isinstance(value, str):
+        return value
+    return str(value)
+text.pattern = r'[^,]*'
+text.value = '%s'
+
+
+def lower_text(value, current, logger):
+    if isinstance(value, str):
+        return value.lower()
+    return str(value).lower()
+lower_text.pattern = r'[^,]*'
+lower_text.value = '%s.lower()'
+
+
+def datetime_string(value, current, logger):
+    return is_valid_datetime(value, current, logger=logger)
+datetime_string.pattern = DATETIME_REGEX
+datetime_string.value = '%s[:19]'
+
+
+def _field_property(name, slot, check, debug):
+    """ Returns a validating property storing its value in a slot.  Without
+    debug, gets and sets don't log at all, but rejected values are still
+    logged if their validator's reject_level is above debug """
+    label = name.replace('_', ' ')
+    returning = 'Returning current value of ' + label + ': %s'
+    updated = label.capitalize() + ' updated to: %s'
+    failed = label.capitalize() + ' update failed with input value: %s'
+    get_slot = slot.__get__
+    set_slot = slot.__set__
+    reject_level = getattr(check, 'reject_level', logging.DEBUG)
+
+    def fget(self):
+        value = get_slot(self)
+        self.logger.debug(returning, value)
+        return value
+
+    def fset(self, value):
+        result = check(value, get_slot(self), self.logger)
+        if result is REJECTED:
+            self.logger.log(reject_level, failed, value)
+        else:
+            set_slot(self, result)
+            self.logger.debug(updated, result)
+
+    def fset_quiet(self, value):
+        result = check(value, get_slot(self), self.logger)
+        if result is not REJECTED:
+            set_slot(self, result)
+        elif reject_level > logging.DEBUG:
+            self.logger.log(reject_level, failed, value)
+
+    if debug is True:
+        return property(fget, fset)
+    return property(get_slot, fset_quiet)
+
+
+# Codec generation ************************************************************
+def _build_codecs(cls, checks, debug):
+    """ Compiles the reset, encode and decode functions for a message type.
+    Encoding is a single join of the field slots, which always hold strings.
+    Decoding validates all the fields with one regex match and stores them
+    from a single split.  Messages that don't match go through the field
+    properties one at a time, as before """
+    count = len(cls._fields)
+    slots = ['self._' + field for field in cls._fields]
+    wire = re.compile(','.join(
+        '(?:%s)' % check.pattern for check in checks) + r'(?:,|\Z)')
+    source = [
+        'def reset(self):',
+        '    %s = str()' % ' = '.join(slots),
+        '',
+        'def encode(self):',
+        '    return ",".join((%s,))' % ', '.join(slots),
+        '',
+        'def decode(self, value):',
+        '    if isinstance(value, str) is not True:',
+        '        return',
+        '    if match(value) is not None:',
+        '        values = value.split(",", %s)' % count]
+    for i, (slot, check) in enumerate(zip(slots, checks)):
+        source.append('        %s = %s' % (
+            slot, check.value % ('values[%s]' % i)))
+    source.extend([
+        '        return',
+        '    values = value.split(",")',
+        '    if len(values) >= %s:' % count])
+    if debug is True:
+        source.append(
+            '        self.logger.debug("Message was properly formatted for decoding")')
+    source.extend([
+        '        for setter, item in zip(setters, values):',
+        '            setter(self, item)'])
+    namespace = {'match': wire.match, 'setters': cls._setters}
+    exec(compile('\n'.join(source), '<%s codec>' % cls.__name__, 'exec'), namespace)
+    return namespace['reset'], namespace['encode'], namespace['decode']
+
+
+# Message metaclass ***********************************************************
+class MessageMeta(type):
+    """ Builds a message class from its `fields` table.  Each (name,
+    validator) pair becomes a `_name` slot and a validating `name`
+    property, appended to the fields inherited from the base class.  The
+    `complete` encoder/decoder is compiled for each class from the
+    resulting field list.  Both are rebuilt, with or without their debug
+    logging, when log_support.set_accessor_debug() is called """
+    classes = []
+
+    def __new__(mcs, name, bases, namespace):
+        fields = list(namespace.pop('fields', []))
+        namespace['__slots__'] = tuple(namespace.get('__slots__', ())) + tuple(
+            '_' + field for field, check in fields)
+        cls = super(MessageMeta, mcs).__new__(mcs, name, bases, namespace)
+        cls._own_fields = fields
+        cls._fields = getattr(cls, '_fields', ()) + tuple(
+            field for field, check in fields)
+        cls._checks = getattr(cls, '_checks', ()) + tuple(
+            check for field, check in fields)
+        mcs.classes.append(cls)
+        _install_fields(cls, log_support.accessor_debug)
+        return cls
+
+
+def _install_fields(cls, debug):
+    """ (Re)creates a message class' field properties and codecs """
+    for field, check in cls._own_fields:
+        setattr(cls, field, _field_property(
+            field, cls.__dict__['_' + field], check, debug))
+    cls._setters = tuple(getattr(cls, field).fset for field in cls._fields)
+    cls._setter_map = dict(zip(cls._fields, cls._setters))
+    cls._reset, encode, decode = _build_codecs(cls, cls._checks, debug)
+    cls.complete = property(encode, decode, doc='The complete message string')
+
+
+def _set_accessor_debug(enabled):
+    # Base classes first, so subclasses pick up their new header setters
+    for cls in MessageMeta.classes:
+        _install_fields(cls, enabled)
+
+
+# Message base class **********************************************************
+class Message(object, metaclass=MessageMeta):
+    """ Common message header and encode/decode.
+
+    Subclasses list their body fields, in wire order, in a `fields` table
+    of (name, validator) pairs.  Any field can be set as a keyword argument
+    to __init__, and `complete` encodes or decodes the whole comma separated
+    message """
+    __slots__ = ('logger',)
+    fields = [
+        ('ref', ref_number),
+        ('dest_addr', ipv4_address),
+        ('dest_port', port_number),
+        ('source_addr', ipv4_address),
+        ('source_port', port_number),
+        ('msg_type', msg_type_number)
+    ]
+
+    def __init__(self, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(type(self).__module__)
+
+        self._reset()
+        # Process input variables if present
+        for key, value in kwargs.items():
+            setter = self._setter_map.get(key)
+            if setter is not None:
+                setter(self, value)
+
+
+log_support.on_accessor_debug(_set_accessor_debug)
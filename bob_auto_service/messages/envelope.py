@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+""" envelope.py:
+    Inbound message wrapper that is parsed once, when the message is received
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import os
+import sys
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Message Envelope Class Definition *******************************************
+class MessageEnvelope(object):
+    """ A received message string with its header split out.
+
+    The message is split once, into the six header fields and the rest of
+    the message, which the ACK, routing and forwarding all read from.  The
+    body is only decoded, and validated, when a processing function asks for
+    it through decode() """
+    __slots__ = ('raw', 'fields', 'ref', 'dest_addr', 'dest_port',
+                 'source_addr', 'source_port', 'msg_type', 'message')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.fields = raw.split(',', 6)
+        self.ref = self.fields[0]
+        if len(self.fields) >= 6:
+            self.dest_addr, self.dest_port, self.source_addr, \
+                self.source_port, self.msg_type = self.fields[1:6]
+        else:
+            self.dest_addr = self.dest_port = self.source_addr = \
+                self.source_port = self.msg_type = str()
+        self.message = None
+
+    @property
+    def has_header(self):
+        """ True if the message has all six header fields """
+        return len(self.fields) >= 6
+
+    def decode(self, cls, logger=None):
+        """ Returns the message decoded into message class cls.  The decoded
+        message is kept, so later calls for the same class are free """
+        if type(self.message) is not cls:
+            message = cls(logger)
+            message.complete = self.raw
+            self.message = message
+        return self.message
+
+    def forward(self, dest_addr, dest_port):
+        """ Returns the raw message re-addressed to dest_addr:dest_port, or
+        None if it is too short to have a destination """
+        if len(self.fields) < 4:
+            return None
+        return ','.join([self.ref, dest_addr, dest_port] + self.fields[3:])
+
+    def __str__(self):
+        return self.raw
+
+    def __repr__(self):
+        return 'MessageEnvelope(%r)' % self.raw
+
+
+def as_envelope(msg):
+    """ Wraps a message string in an envelope.  Envelopes are returned as-is """
+    if isinstance(msg, MessageEnvelope):
+        return msg
+    return MessageEnvelope(msg)
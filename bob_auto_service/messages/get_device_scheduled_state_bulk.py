@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+""" get_device_scheduled_state_bulk.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import os
+import sys
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.base import Message
+from bob_auto_service.messages.base import text
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Message Class Definition ****************************************************
+class GetDeviceScheduledStateBulkMessage(Message):
+    """ Get Device Scheduled State message for several devices at once.
+    Fields follow the common message header.  dev_names holds the device
+    names separated by ';' """
+    fields = [
+        ('dev_names', text)
+    ]
+
+    @property
+    def dev_name_list(self):
+        if self.dev_names == '':
+            return []
+        return self.dev_names.split(';')
+
+    @dev_name_list.setter
+    def dev_name_list(self, value):
+        self.dev_names = ';'.join(value)
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+""" get_device_scheduled_state_bulk_ack.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import os
+import sys
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.base import Message
+from bob_auto_service.messages.base import text
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Message Class Definition ****************************************************
+class GetDeviceScheduledStateBulkMessageACK(Message):
+    """ Get Device Scheduled State ACK message for several devices at once.
+    Fields follow the common message header.  dev_states holds one
+    'dev_name|dev_cmd|next_transition' entry per device, separated by ';'.
+    next_transition may be left empty """
+    fields = [
+        ('dev_states', text)
+    ]
+
+    @property
+    def dev_state_list(self):
+        """ List of (dev_name, dev_cmd, next_transition) tuples, with
+        next_transition None where it was left out """
+        states = []
+        if self.dev_states == '':
+            return states
+        for entry in self.dev_states.split(';'):
+            values = entry.split('|')
+            if len(values) < 2 or values[0] == '':
+                self.logger.warning('Skipping malformed device state: [%s]',
+                                    entry)
+                continue
+            next_transition = values[2] if len(values) > 2 else ''
+            states.append((values[0], values[1], next_transition or None))
+        return states
+
+    @dev_state_list.setter
+    def dev_state_list(self, value):
+        self.dev_states = ';'.join(
+            '|'.join((dev_name, dev_cmd, next_transition or ''))
+            for dev_name, dev_cmd, next_transition in value)
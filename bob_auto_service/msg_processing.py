@@ -3,12 +3,12 @@
 """
 
 # Import Required Libraries (Standard, Third Party, Local) ********************
-import copy
 import logging
 import os
 import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.envelope import as_envelope
 from bob_auto_service.messages.heartbeat import HeartbeatMessage
 from bob_auto_service.messages.heartbeat_ack import HeartbeatMessageACK
 
@@ -47,14 +47,27 @@ def create_heartbeat_msg(logger, ref_num, destinations, source_addr, source_port
             msg_type=message_types['heartbeat']
         )
         # Load message into output list
-        logger.debug('Loading completed msg: %s', out_msg.complete)
-        out_msg_list.append(copy.copy(out_msg.complete))
+        out_msg_list.append(out_msg.complete)
+        logger.debug('Loading completed msg: %s', out_msg_list[-1])
 
     # Return response message
     logger.debug('Returning generated messages: %s', out_msg_list)
     return out_msg_list
 
 
+def forward_msg(logger, msg, dest_addr, dest_port):
+    """ Returns msg (a string or MessageEnvelope) re-addressed to
+        dest_addr:dest_port, or None if msg is too short to have a
+        destination.  Only the destination fields are replaced: the rest of
+        the message is passed on exactly as received, without being decoded,
+        validated or logged
+    """
+    out_msg = as_envelope(msg).forward(dest_addr, dest_port)
+    if out_msg is None:
+        logger.warning('Cannot forward malformed message: [%s]', msg)
+    return out_msg
+
+
 def process_heartbeat_msg(logger, ref_num, msg, message_types):
     """ function to ack wake-up requests to wemo service """
     # Configure logging for this function
@@ -64,8 +77,7 @@ def process_heartbeat_msg(logger, ref_num, msg, message_types):
     out_msg_list = []
 
     # Map message into wemo wake-up message class
-    message = HeartbeatMessage(logger)
-    message.complete = msg
+    message = as_envelope(msg).decode(HeartbeatMessage, logger)
 
     # Send response indicating query was executed
     logger.debug('Building response message header')
@@ -79,8 +91,8 @@ def process_heartbeat_msg(logger, ref_num, msg, message_types):
         msg_type=message_types['heartbeat_ack'])
 
     # Load message into output list
-    logger.debug('Loading completed msg: [%s]', out_msg.complete)
-    out_msg_list.append(copy.copy(out_msg.complete))
+    out_msg_list.append(out_msg.complete)
+    logger.debug('Loading completed msg: [%s]', out_msg_list[-1])
 
     # Return response message
     return out_msg_list
\ No newline at end of file
@@ -3,19 +3,18 @@
 """
 
 # Import Required Libraries (Standard, Third Party, Local) ********************
-import copy
 import datetime
 import logging
 import os
 import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from bob_auto_service.tools.device import search_device_list
+from bob_auto_service.tools.device import find_device
+from bob_auto_service.messages.envelope import as_envelope
+from bob_auto_service.msg_processing import forward_msg
 from bob_auto_service.messages.heartbeat import HeartbeatMessage
 from bob_auto_service.messages.heartbeat_ack import HeartbeatMessageACK
-from bob_auto_service.messages.log_status_update import LogStatusUpdateMessage
 from bob_auto_service.messages.log_status_update_ack import LogStatusUpdateMessageACK
-from bob_auto_service.messages.return_command import ReturnCommandMessage
 from bob_auto_service.messages.return_command_ack import ReturnCommandMessageACK
 from bob_auto_service.messages.set_device_state import SetDeviceStateMessage
 from bob_auto_service.messages.update_command import UpdateCommandMessage
@@ -44,18 +43,15 @@ def process_log_status_update_msg(logger, msg, service_addresses):
     # Initialize result list
     out_msg_list = []
 
-    # Map message into LSU message class
-    message = LogStatusUpdateMessage(logger)
-    message.complete = msg
-
-    # Update destination address and port to forward to db service
-    logger.debug('Revising LSU message to to forward to DB service')
-    message.dest_addr = service_addresses['database_addr']
-    message.dest_port = service_addresses['database_port']
+    # Re-address message to forward to db service
+    out_msg = forward_msg(
+        logger, msg,
+        service_addresses['database_addr'],
+        service_addresses['database_port'])
 
     # Load revised message into output list
-    logger.debug('Loading completed msg: %s', message.complete)
-    out_msg_list.append(copy.copy(message.complete))
+    if out_msg is not None:
+        out_msg_list.append(out_msg)
 
     # Return response messages
     return out_msg_list
@@ -73,11 +69,10 @@ def process_log_status_update_msg_ack(logger, msg):
     out_msg_list = []
 
     # Map message into LSU message class
-    message = LogStatusUpdateMessageACK(logger)
-    message.complete = msg
+    message = as_envelope(msg).decode(LogStatusUpdateMessageACK, logger)
 
     # Log receipt of ACK for debug purposes
-    logger.debug('Log Status Update Ack message received: %s', message.complete)
+    logger.debug('Log Status Update Ack message received: %s', msg)
 
     # Return response messages
     return out_msg_list
@@ -94,18 +89,15 @@ def process_return_command_msg(logger, msg, service_addresses):
     # Initialize result list
     out_msg_list = []
 
-    # Map message into LSU message class
-    message = ReturnCommandMessage(logger)
-    message.complete = msg
-
-    # Update destination address and port to forward to db service
-    logger.debug('Revising RC message to to forward to DB service')
-    message.dest_addr = service_addresses['database_addr']
-    message.dest_port = service_addresses['database_port']    
-    
+    # Re-address message to forward to db service
+    out_msg = forward_msg(
+        logger, msg,
+        service_addresses['database_addr'],
+        service_addresses['database_port'])
+
     # Load message into output list
-    logger.debug('Loading completed msg: %s', message.complete)
-    out_msg_list.append(copy.copy(message.complete))
+    if out_msg is not None:
+        out_msg_list.append(out_msg)
 
     # Return response message
     return out_msg_list
@@ -125,13 +117,12 @@ def process_return_command_msg_ack(logger, ref_num, devices, msg, service_addres
     out_msg_list = []
 
     # Map message into LSU message class
-    message = ReturnCommandMessageACK(logger)
-    message.complete = msg
+    message = as_envelope(msg).decode(ReturnCommandMessageACK, logger)
 
     # Search device table to find device name
     logger.debug('Searching device table for [%s]', message.dev_name)
-    dev_pointer = search_device_list(devices, message.dev_name, logger=logger)
-    logger.debug('Match found at device table index: %s', dev_pointer)
+    device = find_device(devices, message.dev_name, logger=logger)
+    logger.debug('Match found in device table: %s', device is not None)
 
     # Send UC message to acknowledge received command and mark as processed
     logger.debug('Generating UC message to mark device cmd as processed')
@@ -147,13 +138,13 @@ def process_return_command_msg_ack(logger, ref_num, devices, msg, service_addres
         dev_processed=datetime.datetime.now())
 
     # Load message into output list
-    logger.debug('Loading completed msg: %s', out_msg.complete)
-    out_msg_list.append(copy.copy(out_msg.complete))
+    out_msg_list.append(out_msg.complete)
+    logger.debug('Loading completed msg: %s', out_msg_list[-1])
 
     # Create message to wemo service to issue command to device
-    if dev_pointer is not None:
+    if device is not None:
         # Wemo switch commands get sent to the wemo service for handling
-        if devices[dev_pointer].dev_type == 'wemo_switch':
+        if device.dev_type == 'wemo_switch':
             # Determine what command to issue
             out_msg = SetDeviceStateMessage(
                 logger=logger,
@@ -164,13 +155,13 @@ def process_return_command_msg_ack(logger, ref_num, devices, msg, service_addres
                 source_port=service_addresses['automation_port'],
                 msg_type=message_types['set_device_state'],
                 dev_name=message.dev_name,
-                dev_addr=devices[dev_pointer].dev_addr,
+                dev_addr=device.dev_addr,
                 dev_cmd=message.dev_cmd,
-                dev_status=devices[dev_pointer].dev_status,
-                dev_last_seen=devices[dev_pointer].dev_last_seen)
+                dev_status=device.dev_status,
+                dev_last_seen=device.dev_last_seen)
             # Load message into output list
-            logger.debug('Loading completed msg: %s', out_msg.complete)
-            out_msg_list.append(copy.copy(out_msg.complete))
+            out_msg_list.append(out_msg.complete)
+            logger.debug('Loading completed msg: %s', out_msg_list[-1])
     else:
         logger.debug('Device name not found in known device table')
 
@@ -189,18 +180,15 @@ def process_update_command_msg(logger, msg, service_addresses):
     # Initialize result list
     out_msg_list = []
 
-    # Map message into LSU message class
-    message = UpdateCommandMessage(logger)
-    message.complete = msg
-
-    # Update destination address and port to forward to db service
-    logger.debug('Revising UC message to to forward to DB service')
-    message.dest_addr = service_addresses['database_addr']
-    message.dest_port = service_addresses['database_port']
+    # Re-address message to forward to db service
+    out_msg = forward_msg(
+        logger, msg,
+        service_addresses['database_addr'],
+        service_addresses['database_port'])
 
     # Load message into output list
-    logger.debug('Loading completed msg: %s', message.complete)
-    out_msg_list.append(copy.copy(message.complete))
+    if out_msg is not None:
+        out_msg_list.append(out_msg)
 
     # Return response message
     return out_msg_list
@@ -219,11 +207,10 @@ def process_update_command_msg_ack(logger, msg):
     out_msg_list = []
 
     # Map message into LSU message class
-    message = UpdateCommandMessageACK(logger)
-    message.complete = msg
+    message = as_envelope(msg).decode(UpdateCommandMessageACK, logger)
 
     # Log receipt of ACK for debug purposes
-    logger.debug('Update Command ACK message Received: %s', message.complete)
+    logger.debug('Update Command ACK message Received: %s', msg)
 
     # Return response message
     return out_msg_list
@@ -9,9 +9,14 @@ import os
 import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  
-from bob_auto_service.tools.device import search_device_list
+from bob_auto_service.tools.device import find_device
+from bob_auto_service.tools.rule_engine import rule_name
+from bob_auto_service.messages.envelope import as_envelope
+from bob_auto_service.msg_processing import forward_msg
 from bob_auto_service.messages.get_device_scheduled_state import GetDeviceScheduledStateMessage
 from bob_auto_service.messages.get_device_scheduled_state_ack import GetDeviceScheduledStateMessageACK
+from bob_auto_service.messages.get_device_scheduled_state_bulk import GetDeviceScheduledStateBulkMessage
+from bob_auto_service.messages.get_device_scheduled_state_bulk_ack import GetDeviceScheduledStateBulkMessageACK
 from bob_auto_service.messages.set_device_state import SetDeviceStateMessage
 
 
@@ -27,9 +32,14 @@ __status__ = "Development"
 
 
 # Create get device scheduled state message ***********************************
-def create_get_device_scheduled_state_msg(logger, ref_num, devices, service_addresses, message_types):
+def create_get_device_scheduled_state_msg(logger, ref_num, devices, service_addresses, message_types, schedule_cache=None, bulk_size=0, local_rules=()):
     """ When called, this function will generate and queue a get device
-        scheduled state message for every device in the device list
+        scheduled state message for every device in the device list.  If a
+        schedule cache is given, devices whose schedule is cached until their
+        next transition are skipped.  If bulk_size is set and the bulk message
+        type is configured, the devices are asked for bulk_size at a time in
+        bulk messages instead.  Devices whose rule is in local_rules are
+        evaluated by the service itself and are never asked for
     """
     # Configure logging for this function
     logger = logger or logging.getLogger(__name__)
@@ -37,24 +47,53 @@ def create_get_device_scheduled_state_msg(logger, ref_num, devices, service_addr
     # Initialize result list
     out_msg_list = []
 
-    # Create CCS messages for each device in the list
+    # Find the devices whose scheduled state is needed
+    dev_names = []
     for device in devices:
-        if device.dev_rule == 'schedule' or \
-           device.dev_rule == 'dusk_to_dawn' or \
-           device.dev_rule == '':
-            out_msg = GetDeviceScheduledStateMessage(
+        rule = rule_name(device.dev_rule)
+        if rule in local_rules:
+            continue
+        if rule == 'schedule' or \
+           rule == 'dusk to dawn' or \
+           rule == '':
+            if schedule_cache is not None and \
+               schedule_cache.needs_query(device.dev_name) is not True:
+                continue
+            dev_names.append(device.dev_name)
+
+    # Create bulk messages for the devices if the schedule service takes them
+    if bulk_size > 0 and 'get_device_scheduled_state_bulk' in message_types:
+        for i in range(0, len(dev_names), bulk_size):
+            out_msg = GetDeviceScheduledStateBulkMessage(
                 logger=logger,
                 ref=ref_num.new(),
                 dest_addr=service_addresses['schedule_addr'],
                 dest_port=service_addresses['schedule_port'],
                 source_addr=service_addresses['automation_addr'],
                 source_port=service_addresses['automation_port'],
-                msg_type=message_types['get_device_scheduled_state'],
-                dev_name=device.dev_name)
+                msg_type=message_types['get_device_scheduled_state_bulk'])
+            out_msg.dev_name_list = dev_names[i:i + bulk_size]
 
             # Load message into output list
-            logger.debug('Loading completed msg: [%s]', out_msg.complete)
-            out_msg_list.append(copy.copy(out_msg.complete))
+            out_msg_list.append(out_msg.complete)
+            logger.debug('Loading completed msg: [%s]', out_msg_list[-1])
+        return out_msg_list
+
+    # Create CCS messages for each device in the list
+    for dev_name in dev_names:
+        out_msg = GetDeviceScheduledStateMessage(
+            logger=logger,
+            ref=ref_num.new(),
+            dest_addr=service_addresses['schedule_addr'],
+            dest_port=service_addresses['schedule_port'],
+            source_addr=service_addresses['automation_addr'],
+            source_port=service_addresses['automation_port'],
+            msg_type=message_types['get_device_scheduled_state'],
+            dev_name=dev_name)
+
+        # Load message into output list
+        out_msg_list.append(out_msg.complete)
+        logger.debug('Loading completed msg: [%s]', out_msg_list[-1])
 
     # Return response message
     return out_msg_list
@@ -73,29 +112,49 @@ def process_get_device_scheduled_state_msg(logger, msg, service_addresses):
     # Initialize result list
     out_msg_list = []
 
-    # Map message into GDSS message class
-    message = GetDeviceScheduledStateMessage(logger)
-    message.complete = msg
-
-    # Modify GDSS message to forward to schedule service
-    message.dest_addr = service_addresses['schedule_addr']
-    message.dest_port = service_addresses['schedule_port']
+    # Re-address message to forward to schedule service
+    out_msg = forward_msg(
+        logger, msg,
+        service_addresses['schedule_addr'],
+        service_addresses['schedule_port'])
 
     # Load message into output list
-    logger.debug('Loading completed msg: [%s]', message.complete)
-    out_msg_list.append(copy.copy(message.complete))
+    if out_msg is not None:
+        out_msg_list.append(out_msg)
 
     # Return response message
     return out_msg_list
 
 
-# Process get device scheduled state ACK message ******************************
-def process_get_device_scheduled_state_msg_ack(logger, ref_num, devices, msg, service_addresses, message_types):
-    """ When a get device scheduled state ACK message is received, this
-        function will first check if the command in the message matches the
-        last command sent to the device and if a change of state is detected
-        it will create a new set device state message to send to the device
-        via the outgoing message queue
+# Read next transition time from ACK ******************************************
+def next_transition_of(envelope):
+    """ Returns the next transition time the schedule service added after the
+        command in a get device scheduled state ACK message, or None if the
+        message doesn't have one
+    """
+    if envelope.has_header is not True:
+        return None
+    body = envelope.fields[6].split(',', 2)
+    if len(body) < 3 or body[2] == '':
+        return None
+    return body[2].split(',', 1)[0]
+
+
+# Process get device scheduled state bulk message *****************************
+def process_get_device_scheduled_state_bulk_msg(logger, msg, service_addresses):
+    """ If a mis-directed get device scheduled state bulk message is received,
+        this function will forward it to the schedule service the same way as
+        the single device message
+    """
+    return process_get_device_scheduled_state_msg(logger, msg, service_addresses)
+
+
+# Apply scheduled states ******************************************************
+def apply_scheduled_states(logger, ref_num, devices, states, source_addr, source_port, service_addresses, message_types, schedule_cache=None):
+    """ Applies a list of (dev_name, dev_cmd, next_transition) results from
+        the schedule service in one pass.  For each device whose command has
+        changed a new set device state message is created for the device, and
+        each result is stored in the schedule cache if one is given
     """
     # Configure logging for this function
     logger = logger or logging.getLogger(__name__)
@@ -103,27 +162,30 @@ def process_get_device_scheduled_state_msg_ack(logger, ref_num, devices, msg, se
     # Initialize result list
     out_msg_list = []
 
-    # Map message into LSU message class
-    message = GetDeviceScheduledStateMessageACK(logger)
-    message.complete = msg
+    for dev_name, dev_cmd, next_transition in states:
+        # Search device table to find device name
+        logger.debug('Searching device table for [%s]', dev_name)
+        device = find_device(devices, dev_name, logger=logger)
+        logger.debug('Match found in device table: %s', device is not None)
 
-    # Search device table to find device name
-    logger.debug('Searching device table for [%s]', message.dev_name)
-    dev_pointer = search_device_list(devices, message.dev_name, logger=logger)
-    logger.debug('Match found at device table index: %s', dev_pointer)
+        # Update values based on message content
+        if device is None:
+            logger.debug('Device not in device list: %s', dev_name)
+            continue
+        logger.debug('[%s] found in device table', dev_name)
 
-    # Update values based on message content
-    if dev_pointer is not None:
-        logger.debug('[%s] found in table at index [%s]', message.dev_name, dev_pointer)
+        # Remember the answer until the device's next transition
+        if schedule_cache is not None:
+            schedule_cache.update(dev_name, dev_cmd, next_transition)
 
         # Check for command change-of-state
-        if devices[dev_pointer].dev_cmd != message.dev_cmd:
-            logger.debug('New command detected [%s]', message.dev_cmd)
+        if device.dev_cmd != dev_cmd:
+            logger.debug('New command detected [%s]', dev_cmd)
             # Snapshot command so we only issue command message once
-            devices[dev_pointer].dev_cmd = copy.copy(message.dev_cmd)
+            device.dev_cmd = copy.copy(dev_cmd)
 
             # Issue messages to wemo servivce for wemo device commands
-            if devices[dev_pointer].dev_type == 'wemo_switch':
+            if device.dev_type == 'wemo_switch':
                 # Build new message to forward to wemo service
                 logger.debug('Generating message to wemo service')
                 out_msg = SetDeviceStateMessage(
@@ -131,20 +193,53 @@ def process_get_device_scheduled_state_msg_ack(logger, ref_num, devices, msg, se
                     ref=ref_num.new(),
                     dest_addr=service_addresses['wemo_addr'],
                     dest_port=service_addresses['wemo_port'],
-                    source_addr=message.source_addr,
-                    source_port=message.source_port,
+                    source_addr=source_addr,
+                    source_port=source_port,
                     msg_type=message_types['set_device_state'],
-                    dev_name=message.dev_name,
-                    dev_addr=devices[dev_pointer].dev_addr,
-                    dev_cmd=message.dev_cmd,
-                    dev_status=devices[dev_pointer].dev_status,
-                    dev_last_seen=devices[dev_pointer].dev_last_seen)
+                    dev_name=dev_name,
+                    dev_addr=device.dev_addr,
+                    dev_cmd=dev_cmd,
+                    dev_status=device.dev_status,
+                    dev_last_seen=device.dev_last_seen)
 
                 # Load message into output list
-                logger.debug('Loading completed msg: [%s]', out_msg.complete)
-                out_msg_list.append(copy.copy(out_msg.complete))
-    else:
-        logger.debug('Device not in device list: %s', message.dev_name)
+                out_msg_list.append(out_msg.complete)
+                logger.debug('Loading completed msg: [%s]', out_msg_list[-1])
 
     # Return response message
     return out_msg_list
+
+
+# Process get device scheduled state ACK message ******************************
+def process_get_device_scheduled_state_msg_ack(logger, ref_num, devices, msg, service_addresses, message_types, schedule_cache=None):
+    """ When a get device scheduled state ACK message is received, this
+        function will first check if the command in the message matches the
+        last command sent to the device and if a change of state is detected
+        it will create a new set device state message to send to the device
+        via the outgoing message queue.  The command, and the time of the
+        device's next transition if the schedule service sent one, are stored
+        in the schedule cache if one is given
+    """
+    # Map message into GDSS-ACK message class
+    envelope = as_envelope(msg)
+    message = envelope.decode(GetDeviceScheduledStateMessageACK, logger)
+
+    return apply_scheduled_states(
+        logger, ref_num, devices,
+        [(message.dev_name, message.dev_cmd, next_transition_of(envelope))],
+        message.source_addr, message.source_port,
+        service_addresses, message_types, schedule_cache=schedule_cache)
+
+
+# Process get device scheduled state bulk ACK message *************************
+def process_get_device_scheduled_state_bulk_msg_ack(logger, ref_num, devices, msg, service_addresses, message_types, schedule_cache=None):
+    """ When a get device scheduled state bulk ACK message is received, the
+        command for each device in it is applied as for the single device ACK
+    """
+    # Map message into bulk GDSS-ACK message class
+    message = as_envelope(msg).decode(GetDeviceScheduledStateBulkMessageACK, logger)
+
+    return apply_scheduled_states(
+        logger, ref_num, devices, message.dev_state_list,
+        message.source_addr, message.source_port,
+        service_addresses, message_types, schedule_cache=schedule_cache)
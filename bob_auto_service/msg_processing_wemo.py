@@ -9,10 +9,10 @@ import os
 import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) 
-from bob_auto_service.tools.device import search_device_list
-from bob_auto_service.messages.get_device_state import GetDeviceStateMessage
+from bob_auto_service.tools.device import find_device
+from bob_auto_service.messages.envelope import as_envelope
+from bob_auto_service.msg_processing import forward_msg
 from bob_auto_service.messages.get_device_state_ack import GetDeviceStateMessageACK
-from bob_auto_service.messages.set_device_state import SetDeviceStateMessage
 from bob_auto_service.messages.set_device_state_ack import SetDeviceStateMessageACK
 
 
@@ -43,17 +43,15 @@ def process_get_device_state_msg(logger, msg, service_addresses):
     # Initialize result list
     out_msg_list = []
 
-    # Map message into CCS message class
-    message = GetDeviceStateMessage(logger=logger)
-    message.complete = msg
-
-    # Modify CCS message to forward to wemo service
-    message.dest_addr = service_addresses['wemo_addr']
-    message.dest_port = service_addresses['wemo_port']
+    # Re-address message to forward to wemo service
+    out_msg = forward_msg(
+        logger, msg,
+        service_addresses['wemo_addr'],
+        service_addresses['wemo_port'])
 
     # Load message into output list
-    logger.debug('Loading completed msg: [%s]', message.complete)
-    out_msg_list.append(copy.copy(message.complete))
+    if out_msg is not None:
+        out_msg_list.append(out_msg)
 
     # Return response message
     return out_msg_list
@@ -74,22 +72,21 @@ def process_get_device_state_msg_ack(logger, devices, msg):
     out_msg_list = []
 
     # Map message into CCS message class
-    message = GetDeviceStateMessageACK(logger=logger)
-    message.complete = msg
+    message = as_envelope(msg).decode(GetDeviceStateMessageACK, logger)
 
     # Search device table to find device name
     logger.debug('Searching device table for [%s]', message.dev_name)
-    dev_pointer = search_device_list(devices, message.dev_name, logger=logger)
-    logger.debug('Match found at device table index: %s', dev_pointer)    
+    device = find_device(devices, message.dev_name, logger=logger)
+    logger.debug('Match found in device table: %s', device is not None)
 
     # Update values based on message content
-    if dev_pointer is not None:
+    if device is not None:
         logger.debug('Updating device [%s] status to [%s] and last seen to [%s]',
                      message.dev_name,
                      message.dev_status,
                      message.dev_last_seen)
-        devices[dev_pointer].dev_status = copy.copy(message.dev_status)
-        devices[dev_pointer].dev_last_seen = copy.copy(message.dev_last_seen)
+        device.dev_status = copy.copy(message.dev_status)
+        device.dev_last_seen = copy.copy(message.dev_last_seen)
     else:
         logger.debug('Device [%s] not found in active device table. '
                      'No further action being taken', message.dev_name)
@@ -114,16 +111,15 @@ def process_set_device_state_msg(logger, msg, service_addresses):
     # Initialize result list
     out_msg_list = []
 
-    # Map message into CCS message class
-    message = SetDeviceStateMessage(logger=logger)
-    message.complete = msg
+    # Re-address message to forward to wemo service
+    out_msg = forward_msg(
+        logger, msg,
+        service_addresses['wemo_addr'],
+        service_addresses['wemo_port'])
 
-    message.dest_addr=service_addresses['wemo_addr']
-    message.dest_port=service_addresses['wemo_port']
-        
     # Load message into output list
-    logger.debug('Loading completed msg: [%s]', message.complete)
-    out_msg_list.append(copy.copy(message.complete))
+    if out_msg is not None:
+        out_msg_list.append(out_msg)
 
     # Return response message
     return out_msg_list
@@ -144,22 +140,21 @@ def process_set_device_state_msg_ack(logger, devices, msg):
     out_msg_list = []
 
     # Map message into CCS message class
-    message = SetDeviceStateMessageACK(logger=logger)
-    message.complete = msg
+    message = as_envelope(msg).decode(SetDeviceStateMessageACK, logger)
 
     # Search device table to find device name
     logger.debug('Searching device table for [%s]', message.dev_name)
-    dev_pointer = search_device_list(devices, message.dev_name, logger=logger)
-    logger.debug('Match found at device table index: %s', dev_pointer)
+    device = find_device(devices, message.dev_name, logger=logger)
+    logger.debug('Match found in device table: %s', device is not None)
 
     # Update values based on message content
-    if dev_pointer is not None:
+    if device is not None:
         logger.debug('Updating device [%s] status to [%s] and last seen to [%s]',
                      message.dev_name,
                      message.dev_status,
                      message.dev_last_seen)
-        devices[dev_pointer].dev_status = copy.copy(message.dev_status)
-        devices[dev_pointer].dev_last_seen = copy.copy(message.dev_last_seen)
+        device.dev_status = copy.copy(message.dev_status)
+        device.dev_last_seen = copy.copy(message.dev_last_seen)
     else:
         logger.debug('Device [%s] not found in active device table. '
                      'No further action being taken', message.dev_name)
@@ -5,13 +5,21 @@
 # Import Required Libraries (Standard, Third Party, Local) ********************
 import asyncio
 import copy
-import datetime
 import logging
 import os
 import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.envelope import as_envelope
 from bob_auto_service.messages.log_status_update import LogStatusUpdateMessage
+from bob_auto_service.tools.device import DeviceRegistry
+from bob_auto_service.tools.device import find_device
+from bob_auto_service.tools.pacer import PacedEmitter
+from bob_auto_service.tools.rule_engine import RuleEngine
+from bob_auto_service.tools.rule_engine import rule_name
+from bob_auto_service.tools.schedule_cache import ScheduleCache
+from bob_auto_service.tools.supervisor import SupervisedTask
+from bob_auto_service.tools.timer_scheduler import TimerScheduler
 
 from bob_auto_service.msg_processing import create_heartbeat_msg
 from bob_auto_service.msg_processing import process_heartbeat_msg
@@ -28,9 +36,12 @@ from bob_auto_service.msg_processing_wemo import process_get_device_state_msg_ac
 from bob_auto_service.msg_processing_wemo import process_set_device_state_msg
 from bob_auto_service.msg_processing_wemo import process_set_device_state_msg_ack
 
+from bob_auto_service.msg_processing_schedule import apply_scheduled_states
 from bob_auto_service.msg_processing_schedule import create_get_device_scheduled_state_msg
 from bob_auto_service.msg_processing_schedule import process_get_device_scheduled_state_msg
 from bob_auto_service.msg_processing_schedule import process_get_device_scheduled_state_msg_ack
+from bob_auto_service.msg_processing_schedule import process_get_device_scheduled_state_bulk_msg
+from bob_auto_service.msg_processing_schedule import process_get_device_scheduled_state_bulk_msg_ack
 
 
 # Authorship Info *************************************************************
@@ -56,9 +67,34 @@ class MainTask(object):
         self.msg_out_queue = None
         self.service_addresses = []
         self.message_types = []
-        self.last_check_schedule = datetime.datetime.now()
-        self.last_check_hb = datetime.datetime.now()
-        self.sleep_time = 0.2
+        self.last_check_schedule = 0.0
+        self.last_check_hb = 0.0
+        self.loop = asyncio.get_event_loop()
+        self.hb_interval = 60.0
+        self.hb_timeout = 120.0
+        self.get_breaker = None
+        self.started = 0.0
+        self.hb_tripped = {}
+        self.hb_jitter = 0.0
+        self.schedule_interval = 60.0
+        self.schedule_jitter = 0.0
+        self.scheduler = None
+        self.schedule_cache = None
+        self.schedule_max_age = 3600.0
+        self.schedule_bulk_size = 0
+        self.hb_spread = 0.0
+        self.schedule_spread = 0.0
+        self.pace_jitter = 0.0
+        self.hb_pacer = None
+        self.schedule_pacer = None
+        self.latitude = None
+        self.longitude = None
+        self.utc_offset = None
+        self.rule_engine = None
+        self.cos_interval = 0.1
+        self.stats_interval = 300.0
+        self.tasks = []
+        self.cos_event = None
         self.out_msg = str()
         self.out_msg_list = []
         self.next_msg = str()
@@ -67,18 +103,30 @@ class MainTask(object):
         self.msg_source_port = str()
         self.msg_type = str()
         self.destinations = []
-        self.timestamp_db = datetime.datetime.now() + datetime.timedelta(seconds=-120)
-        self.timestamp_schedule = datetime.datetime.now() + datetime.timedelta(seconds=-120)
-        self.timestamp_wemo = datetime.datetime.now() + datetime.timedelta(seconds=-120)
+        self.sources = {}
+        self.handlers = {}
+        self.unroutable = 0
+        # Loop times of the last heartbeat from each service, None until the
+        # first one arrives
+        self.timestamp_db = None
+        self.timestamp_schedule = None
+        self.timestamp_wemo = None
         # Map input variables
         if kwargs is not None:
             for key, value in kwargs.items():
+                if key == "loop":
+                    self.loop = value
+                    self.logger.debug('Event loop set during __init__ '
+                                      'to: %s', self.loop)
                 if key == "ref":
                     self.ref_num = value
                     self.logger.debug('Ref number generator set during __init__ '
                                       'to: %s', self.ref_num)
                 if key == "devices":
-                    self.devices = value
+                    if isinstance(value, DeviceRegistry):
+                        self.devices = value
+                    else:
+                        self.devices = DeviceRegistry(value, logger=self.logger)
                     self.logger.debug('Device list set during __init__ '
                                       'to: %s', self.devices)
                 if key == "msg_in_queue":
@@ -97,296 +145,503 @@ class MainTask(object):
                     self.message_types = value
                     self.logger.debug('Message type list set during __init__ '
                                       'to: %s', self.message_types)
+                if key == "get_breaker":
+                    self.get_breaker = value
+                    self.logger.debug('Circuit breaker lookup set during '
+                                      '__init__ to: %s', self.get_breaker)
+                if key == "hb_timeout":
+                    self.hb_timeout = float(value)
+                    self.logger.debug('Heartbeat timeout set during __init__ '
+                                      'to: %s', self.hb_timeout)
+                if key == "hb_interval":
+                    self.hb_interval = float(value)
+                    self.logger.debug('Heartbeat interval set during __init__ '
+                                      'to: %s', self.hb_interval)
+                if key == "hb_jitter":
+                    self.hb_jitter = float(value)
+                    self.logger.debug('Heartbeat jitter set during __init__ '
+                                      'to: %s', self.hb_jitter)
+                if key == "schedule_interval":
+                    self.schedule_interval = float(value)
+                    self.logger.debug('Schedule interval set during __init__ '
+                                      'to: %s', self.schedule_interval)
+                if key == "schedule_jitter":
+                    self.schedule_jitter = float(value)
+                    self.logger.debug('Schedule jitter set during __init__ '
+                                      'to: %s', self.schedule_jitter)
+                if key == "cos_interval":
+                    self.cos_interval = float(value)
+                    self.logger.debug('COS interval set during __init__ '
+                                      'to: %s', self.cos_interval)
+                if key == "stats_interval":
+                    self.stats_interval = float(value)
+                    self.logger.debug('Stats interval set during __init__ '
+                                      'to: %s', self.stats_interval)
+                if key == "schedule_max_age":
+                    self.schedule_max_age = float(value)
+                    self.logger.debug('Schedule max age set during __init__ '
+                                      'to: %s', self.schedule_max_age)
+                if key == "schedule_bulk_size":
+                    self.schedule_bulk_size = int(value)
+                    self.logger.debug('Schedule bulk size set during __init__ '
+                                      'to: %s', self.schedule_bulk_size)
+                if key == "hb_spread":
+                    self.hb_spread = float(value)
+                    self.logger.debug('Heartbeat spread set during __init__ '
+                                      'to: %s', self.hb_spread)
+                if key == "schedule_spread":
+                    self.schedule_spread = float(value)
+                    self.logger.debug('Schedule spread set during __init__ '
+                                      'to: %s', self.schedule_spread)
+                if key == "pace_jitter":
+                    self.pace_jitter = float(value)
+                    self.logger.debug('Pace jitter set during __init__ '
+                                      'to: %s', self.pace_jitter)
+                if key == "latitude":
+                    self.latitude = value
+                    self.logger.debug('Latitude set during __init__ '
+                                      'to: %s', self.latitude)
+                if key == "longitude":
+                    self.longitude = value
+                    self.logger.debug('Longitude set during __init__ '
+                                      'to: %s', self.longitude)
+                if key == "utc_offset":
+                    self.utc_offset = value
+                    self.logger.debug('UTC offset set during __init__ '
+                                      'to: %s', self.utc_offset)
+        self.cos_event = asyncio.Event(loop=self.loop)
+        # Rules such as dusk to dawn are evaluated here when the service
+        # knows where it is, instead of asking the schedule service
+        if self.latitude is not None and self.longitude is not None:
+            self.rule_engine = RuleEngine(
+                self.loop, self.latitude, self.longitude,
+                on_transition=self.apply_local_rule, logger=self.logger,
+                utc_offset=self.utc_offset)
+        self.hb_pacer = PacedEmitter(
+            self.loop, self.queue_msg, logger=self.logger,
+            name='Heartbeat pacer', jitter=self.pace_jitter)
+        self.schedule_pacer = PacedEmitter(
+            self.loop, self.queue_msg, logger=self.logger,
+            name='Schedule pacer', jitter=self.pace_jitter)
+        self.schedule_cache = ScheduleCache(
+            self.loop, on_due=self.query_schedule_device, logger=self.logger,
+            max_age=self.schedule_max_age)
+        self.started = self.loop.time()
+        self.register_handlers()
 
     @asyncio.coroutine
     def run(self):
-        """ task to handle the work the service is intended to do """
+        """ task to handle the work the service is intended to do.  Each part
+        of the work runs as its own supervised task with its own cadence, so a
+        slow or crashed part doesn't hold up the others """
         self.logger.info('Starting automation service main task')
+        self.started = self.loop.time()
+
+        # Periodic work is timed by one scheduler on the loop's clock
+        self.scheduler = TimerScheduler(self.loop, logger=self.logger)
+        self.scheduler.add('Heartbeat', self.hb_interval, self.heartbeat,
+                           jitter=self.hb_jitter)
+        self.scheduler.add('Schedule poller', self.schedule_interval,
+                           self.check_schedule, jitter=self.schedule_jitter)
+        self.scheduler.add('Stats', self.stats_interval, self.log_stats)
+        self.tasks = [
+            SupervisedTask(self.loop, 'Inbound dispatcher', self.dispatch,
+                           logger=self.logger),
+            SupervisedTask(self.loop, 'Timer scheduler', self.scheduler.run,
+                           logger=self.logger),
+            SupervisedTask(self.loop, 'COS publisher', self.publish_cos,
+                           logger=self.logger)]
+        for task in self.tasks:
+            task.start()
+        if self.rule_engine is not None:
+            self.rule_engine.start()
+        try:
+            yield from asyncio.wait(
+                [task.task for task in self.tasks], loop=self.loop)
+        finally:
+            if self.rule_engine is not None:
+                self.rule_engine.stop()
+            self.hb_pacer.cancel()
+            self.schedule_pacer.cancel()
+            for task in self.tasks:
+                task.stop()
+            yield from asyncio.wait(
+                [task.task for task in self.tasks], loop=self.loop)
+
+
+    def log_stats(self):
+        """ Logs the main task's task and periodic job statistics """
+        for task in self.tasks:
+            self.logger.info('%s task stats: %s', task.name, task.stats)
+        for job in self.scheduler.jobs:
+            self.logger.info('%s job stats: %s', job.name, job.stats)
+        self.logger.info('Schedule cache stats: %s', self.schedule_cache.stats)
+        for pacer in [self.hb_pacer, self.schedule_pacer]:
+            self.logger.info('%s stats: %s', pacer.name, pacer.stats)
+        if self.rule_engine is not None:
+            self.logger.info('Rule engine stats: %s', self.rule_engine.stats)
 
+
+    @asyncio.coroutine
+    def dispatch(self, task):
+        """ task to route incoming messages to their processing functions """
         while True:
-            # Initialize result list
+            # Sleep until the next incoming message arrives
+            self.next_msg = yield from self.msg_in_queue.get()
+            started = self.loop.time()
+            self.logger.debug('Message pulled from queue: [%s]', self.next_msg)
             self.out_msg_list = []
-            self.sleep_time = 0.2
-            
-            # INCOMING MESSAGE HANDLING
-            if self.msg_in_queue.qsize() > 0:
-                self.sleep_time = 0.01
-                self.logger.debug('Getting Incoming message from queue')
-                self.next_msg = self.msg_in_queue.get_nowait()
-                self.logger.debug('Message pulled from queue: [%s]', self.next_msg)
-
-                # Determine message type
-                self.next_msg_split = self.next_msg.split(',')
-                if len(self.next_msg_split) >= 6:
-                    self.logger.debug('Extracting source address and message type')
-                    self.msg_source_addr = self.next_msg_split[3]
-                    self.msg_source_port = self.next_msg_split[4]
-                    self.msg_type = self.next_msg_split[5]
-                    self.logger.debug('Source Address: %s', self.msg_source_addr)
-                    self.logger.debug('Source Port: %s', self.msg_source_addr)
-                    self.logger.debug('Message Type: %s', self.msg_type)
-
-
-                # Process messages from database service
-                if self.msg_source_addr == self.service_addresses['database_addr'] \
-                    and self.msg_source_port == self.service_addresses['database_port']:
-
-
-                    # update last-seen timestamp from database service
-                    if self.msg_type == self.message_types['heartbeat']:
-                        self.logger.debug('Updating heartbeat timestamp'
-                                          'from database service')
-                        self.timestamp_db = datetime.datetime.now()
-
-                    # Process log status update message
-                    if self.msg_type == self.message_types['log_status_update']:
-                        self.logger.debug('Message is a Log Status Update message')
-                        self.out_msg_list = process_log_status_update_msg(
-                            self.logger,
-                            self.next_msg,
-                            self.service_addresses)
-
-                    # # Process log status update ACK message
-                    elif self.msg_type == self.message_types['log_status_update_ack']:
-                        self.logger.debug('Message is a Log Status Update ACK message')
-                        process_log_status_update_msg_ack(
-                            self.logger,
-                            self.next_msg)
-
-                    # Process return command message
-                    elif self.msg_type == self.message_types['return_command']:
-                        self.logger.debug('Message is a Return Command (RC) message')
-                        self.out_msg_list = process_return_command_msg(
-                            self.logger,
-                            self.next_msg,
-                            self.service_addresses)
-
-                    # Process return command ACK message
-                    elif self.msg_type == self.message_types['return_command_ack']:
-                        self.logger.debug('Message is a Return Command ACK (RCA) message')
-                        self.out_msg_list = process_return_command_msg_ack(
-                            self.logger,
-                            self.ref_num,
-                            self.devices,
-                            self.next_msg,
-                            self.service_addresses,
-                            self.message_types)
-
-                    # Process update command message
-                    elif self.msg_type == self.message_types['update_command']:
-                        self.logger.debug('Message is a Update Command (UC) message')
-                        self.out_msg_list = process_update_command_msg(
-                            self.logger,
-                            self.next_msg,
-                            self.service_addresses)
-
-                    # Process update command ACK message
-                    elif self.msg_type == self.message_types['update_command_ack']:
-                        self.logger.debug('Message is a Update Command ACK (UCA) message')
-                        process_update_command_msg_ack(
-                            self.logger,
-                            self.next_msg)
-
-                    # Que up response messages in outgoing msg que
-                    if len(self.out_msg_list) > 0:
-                        self.logger.debug('Queueing response message(s)')
-                        for self.out_msg in self.out_msg_list:
-                            self.msg_out_queue.put_nowait(copy.copy(self.out_msg))
-                            self.logger.debug('Message [%s] successfully queued', self.out_msg)
-
-                # Process messages from wemo service
-                if self.msg_source_addr == self.service_addresses['wemo_addr'] \
-                    and self.msg_source_port == self.service_addresses['wemo_port']:
-
-                    # update last-seen timestamp from wemo service
-                    if self.msg_type == self.message_types['heartbeat']:
-                        self.logger.debug('Updating heartbeat timestamp '
-                                       'from wemo service')
-                        self.timestamp_wemo = datetime.datetime.now()
-
-                    # Process get device state message
-                    if self.msg_type == self.message_types['get_device_state']:
-                        self.logger.debug('Message is a Get Device Status (GDS) message')
-                        self.out_msg_list = process_get_device_state_msg(
-                            self.logger,
-                            self.next_msg,
-                            self.service_addresses)
-
-                    # Process get device state ACK message
-                    elif self.msg_type == self.message_types['get_device_state_ack']:
-                        self.logger.debug('Message is a Get Device Status ACK (GDSA) message')
-                        self.out_msg_list = process_get_device_state_msg_ack(
-                            self.logger,
-                            self.devices,
-                            self.next_msg)
-
-                    # Process set device state message
-                    elif self.msg_type == self.message_types['set_device_state']:
-                        self.logger.debug('Message is a Set Device Status (SDS) message')
-                        self.out_msg_list = process_set_device_state_msg(
-                            self.logger,
-                            self.next_msg,
-                            self.service_addresses)
-
-                    # Process set device state ACK message
-                    elif self.msg_type == self.message_types['set_device_state_ack']:
-                        self.logger.debug('Message is a Set Device Status ACK (SDSA) message')
-                        self.out_msg_list = process_set_device_state_msg_ack(
-                            self.logger,
-                            self.devices,
-                            self.next_msg)
-
-                    # Que up response messages in outgoing msg que
-                    if len(self.out_msg_list) > 0:
-                        self.logger.debug('Queueing response message(s)')
-                        for self.out_msg in self.out_msg_list:
-                            self.msg_out_queue.put_nowait(copy.copy(self.out_msg))
-                            self.logger.debug('Message [%s] successfully queued', self.out_msg)
-
-                # Process messages from calendar/schedule service
-                if self.msg_source_addr == self.service_addresses['schedule_addr'] \
-                    and self.msg_source_port == self.service_addresses['schedule_port']:
-
-                    # update last-seen timestamp from database service
-                    if self.msg_type == self.message_types['heartbeat']:
-                        self.logger.debug('Updating heartbeat timestamp '
-                                          'from schedule service')
-                        self.timestamp_schedule = datetime.datetime.now()
-
-                    # Process get device scheduled state message
-                    if self.msg_type == self.message_types['get_device_scheduled_state']:
-                        self.logger.debug('Message is a get device scheduled state message')
-                        self.out_msg_list = process_get_device_scheduled_state_msg(
-                            self.logger,
-                            self.next_msg,
-                            self.service_addresses)
-
-                    # Process get device scheduled state ACK message
-                    if self.msg_type == self.message_types['get_device_scheduled_state_ack']:
-                        self.logger.debug('Message is a get device scheduled state ACK message')
-                        self.out_msg_list = process_get_device_scheduled_state_msg_ack(
-                            self.logger,
-                            self.ref_num,
-                            self.devices,
-                            self.next_msg,
-                            self.service_addresses,
-                            self.message_types)
-
-                    # Que up response messages in outgoing msg que
-                    if len(self.out_msg_list) > 0:
-                        self.logger.debug('Queueing response message(s)')
-                        for self.out_msg in self.out_msg_list:
-                            self.msg_out_queue.put_nowait(copy.copy(self.out_msg))
-                            self.logger.debug('Message [%s] successfully queued', self.out_msg)
-
-
-            # PERIODIC TASKS
-            # Periodically send heartbeats to other services
-            if datetime.datetime.now() >= (self.last_check_hb + datetime.timedelta(seconds=60)):
-                self.destinations = [
-                    (self.service_addresses['database_addr'],
-                     self.service_addresses['database_port']),
-                    (self.service_addresses['motion_addr'],
-                     self.service_addresses['motion_port']),
-                    (self.service_addresses['nest_addr'],
-                     self.service_addresses['nest_port']),
-                    (self.service_addresses['occupancy_addr'],
-                     self.service_addresses['occupancy_port']),
-                    (self.service_addresses['schedule_addr'],
-                     self.service_addresses['schedule_port']),
-                    (self.service_addresses['wemo_addr'],
-                     self.service_addresses['wemo_port'])
-                ]
-                self.out_msg_list = create_heartbeat_msg(
-                    self.logger,
-                    self.ref_num,
-                    self.destinations,
-                    self.service_addresses['automation_addr'],
-                    self.service_addresses['automation_port'],
-                    self.message_types)
-
-                # Que up response messages in outgoing msg que
-                if len(self.out_msg_list) > 0:
-                    self.logger.debug('Queueing message(s)')
-                    for self.out_msg in self.out_msg_list:
-                        self.msg_out_queue.put_nowait(copy.copy(self.out_msg))
-                        self.logger.debug('Message [%s] successfully queued', self.out_msg)
-
-                # Update last-check
-                self.last_check_hb = datetime.datetime.now()
-
-
-            # PERIODIC TASKS
-            # Periodically check scheduled on/off commands for devices
-            if datetime.datetime.now() \
-                >= (self.last_check_schedule + datetime.timedelta(minutes=1)):
-                self.out_msg_list = create_get_device_scheduled_state_msg(
-                    self.logger,
-                    self.ref_num,
-                    self.devices,
-                    self.service_addresses,
-                    self.message_types)
-
-                # Que up response messages in outgoing msg que
-                if len(self.out_msg_list) > 0:
-                    self.logger.debug('Queueing message(s)')
-                    for self.out_msg in self.out_msg_list:
-                        self.msg_out_queue.put_nowait(copy.copy(self.out_msg))
-                        self.logger.debug('Message [%s] successfully queued', self.out_msg)
-
-                # Update last-check
-                self.last_check_schedule = datetime.datetime.now()
-
-
-            # DEVICE STATUS CHANGE OF STATE CHECKS
-            # Log any device changes of state to database.  Only log if database
-            # service is confirmed alive to avoid data loss (hb received
-            # within 120 seconds)
-            if datetime.datetime.now() < self.timestamp_db \
-                + datetime.timedelta(seconds=120):
-                # Initialize outgoing message list
-                self.out_msg_list = []
-                # Cycle through devices in list looking for changes of state
-                for i, d in enumerate(self.devices):
-                    # COS detected by comparing stats and last_seen to their memory
-                    # values
-                    if d.dev_status != d.dev_status_mem or d.dev_last_seen != d.dev_last_seen_mem:
-                        # When COS detected, append new LSU message to outgoing list
-                        self.logger.debug('Change of state detected in the status '
-                                          'of: %s', d.dev_name)
-                        self.out_msg_list.append(
-                            copy.copy(
-                                LogStatusUpdateMessage(
-                                    logger=self.logger,
-                                    ref=self.ref_num.new(),
-                                    dest_addr=self.service_addresses['database_addr'],
-                                    dest_port=self.service_addresses['database_port'],
-                                    source_addr=self.service_addresses['automation_addr'],
-                                    source_port=self.service_addresses['automation_port'],
-                                    msg_type=self.message_types['log_status_update'],
-                                    dev_name=d.dev_name,
-                                    dev_addr=d.dev_addr,
-                                    dev_status=d.dev_status,
-                                    dev_last_seen=d.dev_last_seen
-                                ).complete
-                            )
-                        )
-                        # Update values in status_mem and last_seen_mem to prevent
-                        # duplicate triggers
-                        self.logger.debug('LSU message for %s created and '
-                                          'queued', d.dev_name)
-                        self.devices[i].dev_status_mem = copy.copy(d.dev_status)
-                        self.devices[i].dev_last_seen_mem = copy.copy(d.dev_last_seen)
-
-                # Que up response messages in outgoing msg que
-                if len(self.out_msg_list) > 0:
-                    self.logger.debug('Queueing message(s)')
-                    for self.out_msg in self.out_msg_list:
-                        self.msg_out_queue.put_nowait(copy.copy(self.out_msg))
-                        self.logger.debug('Message [%s] successfully queued',
-                                          self.out_msg)
+            self.process_msg()
+            task.record(started)
 
+            # Incoming messages are the only source of device status changes
+            # and database heartbeats, so wake the COS publisher if there is
+            # anything for it to log
+            if self.devices is not None and len(self.devices.changed) > 0:
+                self.cos_event.set()
 
 
-            # Yield to other tasks for a while
-            yield from asyncio.sleep(self.sleep_time)
+    @asyncio.coroutine
+    def publish_cos(self, task):
+        """ task to log device changes of state, at most once every
+        cos_interval seconds so bursts of changes are sent together """
+        while True:
+            yield from self.cos_event.wait()
+            self.cos_event.clear()
+            started = self.loop.time()
+            self.check_cos()
+            task.record(started)
+            yield from asyncio.sleep(self.cos_interval, loop=self.loop)
+
+
+    def queue_msgs(self, msg_list):
+        """ Queues a list of messages in the outgoing msg queue """
+        if len(msg_list) > 0:
+            self.logger.debug('Queueing message(s)')
+            for self.out_msg in msg_list:
+                self.msg_out_queue.put_nowait(copy.copy(self.out_msg))
+                self.logger.debug('Message [%s] successfully queued', self.out_msg)
+
+
+    def queue_msg(self, msg):
+        """ Queues one message in the outgoing msg queue """
+        self.queue_msgs([msg])
+
+
+    # INCOMING MESSAGE HANDLING
+    def register(self, service, msg_type, handler):
+        """ Routes messages of type `msg_type` (a name from [MESSAGE TYPES])
+        from `service` (a name from [SERVICES], e.g. 'wemo') to `handler`.
+        The handler is called with the message's MessageEnvelope and returns
+        a list of messages to send, or None """
+        if msg_type not in self.message_types:
+            self.logger.warning('Handler for unknown message type %s from %s '
+                                'service not registered', msg_type, service)
+            return
+        self.handlers[(service, self.message_types[msg_type])] = handler
+        self.logger.debug('Registered %s for %s messages from %s service',
+                          handler, msg_type, service)
+
+
+    def register_handlers(self):
+        """ Builds the (source service, msg_type) dispatch table """
+        self.sources = {}
+        self.handlers = {}
+        if len(self.message_types) == 0:
+            return
+        for key in self.service_addresses:
+            if key.endswith('_addr'):
+                service = key[:-len('_addr')]
+                self.sources[(self.service_addresses[key],
+                              self.service_addresses.get(service + '_port'))] = service
+        self.register('database', 'heartbeat', self.process_heartbeat_db)
+        self.register(
+            'database', 'log_status_update',
+            lambda msg: process_log_status_update_msg(
+                self.logger, msg, self.service_addresses))
+        self.register(
+            'database', 'log_status_update_ack',
+            lambda msg: process_log_status_update_msg_ack(
+                self.logger, msg))
+        self.register(
+            'database', 'return_command',
+            lambda msg: process_return_command_msg(
+                self.logger, msg, self.service_addresses))
+        self.register(
+            'database', 'return_command_ack',
+            lambda msg: process_return_command_msg_ack(
+                self.logger, self.ref_num, self.devices, msg, self.service_addresses,
+                self.message_types))
+        self.register(
+            'database', 'update_command',
+            lambda msg: process_update_command_msg(
+                self.logger, msg, self.service_addresses))
+        self.register(
+            'database', 'update_command_ack',
+            lambda msg: process_update_command_msg_ack(
+                self.logger, msg))
+        self.register('wemo', 'heartbeat', self.process_heartbeat_wemo)
+        self.register(
+            'wemo', 'get_device_state',
+            lambda msg: process_get_device_state_msg(
+                self.logger, msg, self.service_addresses))
+        self.register(
+            'wemo', 'get_device_state_ack',
+            lambda msg: process_get_device_state_msg_ack(
+                self.logger, self.devices, msg))
+        self.register(
+            'wemo', 'set_device_state',
+            lambda msg: process_set_device_state_msg(
+                self.logger, msg, self.service_addresses))
+        self.register(
+            'wemo', 'set_device_state_ack',
+            lambda msg: process_set_device_state_msg_ack(
+                self.logger, self.devices, msg))
+        self.register('schedule', 'heartbeat', self.process_heartbeat_schedule)
+        self.register(
+            'schedule', 'get_device_scheduled_state',
+            lambda msg: process_get_device_scheduled_state_msg(
+                self.logger, msg, self.service_addresses))
+        self.register(
+            'schedule', 'get_device_scheduled_state_ack',
+            lambda msg: process_get_device_scheduled_state_msg_ack(
+                self.logger, self.ref_num, self.devices, msg, self.service_addresses,
+                self.message_types, schedule_cache=self.schedule_cache))
+        self.register(
+            'schedule', 'get_device_scheduled_state_bulk',
+            lambda msg: process_get_device_scheduled_state_bulk_msg(
+                self.logger, msg, self.service_addresses))
+        self.register(
+            'schedule', 'get_device_scheduled_state_bulk_ack',
+            lambda msg: process_get_device_scheduled_state_bulk_msg_ack(
+                self.logger, self.ref_num, self.devices, msg, self.service_addresses,
+                self.message_types, schedule_cache=self.schedule_cache))
+
+
+    def process_msg(self):
+        """ Routes the message in next_msg to its processing function """
+        # Determine message type from the header split out on receipt
+        self.next_msg = as_envelope(self.next_msg)
+        self.next_msg_split = self.next_msg.fields
+        if self.next_msg.has_header is not True:
+            self.unroutable += 1
+            self.logger.warning('Dropping malformed message: [%s]', self.next_msg)
+            return
+        self.msg_source_addr = self.next_msg.source_addr
+        self.msg_source_port = self.next_msg.source_port
+        self.msg_type = self.next_msg.msg_type
+
+        # Look up the handler for this source and message type
+        service = self.sources.get((self.msg_source_addr, self.msg_source_port))
+        handler = self.handlers.get((service, self.msg_type))
+        if handler is None:
+            self.unroutable += 1
+            self.logger.debug('No handler for message type %s from %s:%s '
+                              '(%s unroutable so far)', self.msg_type,
+                              self.msg_source_addr, self.msg_source_port,
+                              self.unroutable)
+            return
+
+        # Que up response messages in outgoing msg que
+        self.out_msg_list = handler(self.next_msg) or []
+        self.queue_msgs(self.out_msg_list)
+
+
+    def process_heartbeat_db(self, msg):
+        """ update last-seen timestamp from database service """
+        self.timestamp_db = self.loop.time()
+
+
+    def process_heartbeat_wemo(self, msg):
+        """ update last-seen timestamp from wemo service """
+        self.timestamp_wemo = self.loop.time()
+
+
+    def process_heartbeat_schedule(self, msg):
+        """ update last-seen timestamp from schedule service.  If the service
+        is back after its heartbeats stopped, its schedules may have changed
+        while it was gone, so the cached ones are dropped """
+        now = self.loop.time()
+        if self.timestamp_schedule is not None and \
+           now - self.timestamp_schedule >= self.hb_timeout:
+            self.logger.info('Schedule service is back, re-checking all '
+                             'device schedules')
+            self.schedule_cache.invalidate()
+        self.timestamp_schedule = now
+
+
+    # PERIODIC TASKS
+    def heartbeat(self):
+        """ Periodically send heartbeats to other services """
+        self.send_heartbeats()
+        self.check_heartbeats()
+
+
+    def send_heartbeats(self):
+        self.destinations = [
+            (self.service_addresses['database_addr'],
+             self.service_addresses['database_port']),
+            (self.service_addresses['motion_addr'],
+             self.service_addresses['motion_port']),
+            (self.service_addresses['nest_addr'],
+             self.service_addresses['nest_port']),
+            (self.service_addresses['occupancy_addr'],
+             self.service_addresses['occupancy_port']),
+            (self.service_addresses['schedule_addr'],
+             self.service_addresses['schedule_port']),
+            (self.service_addresses['wemo_addr'],
+             self.service_addresses['wemo_port'])
+        ]
+        self.out_msg_list = create_heartbeat_msg(
+            self.logger,
+            self.ref_num,
+            self.destinations,
+            self.service_addresses['automation_addr'],
+            self.service_addresses['automation_port'],
+            self.message_types)
+
+        # Que up heartbeats, spread over hb_spread seconds so they don't all
+        # go out in the same tick
+        self.hb_pacer.submit(self.out_msg_list, self.hb_spread)
+
+        # Update last-check
+        self.last_check_hb = self.loop.time()
+
+
+    def check_heartbeats(self):
+        """ Opens the circuit breaker of any service whose heartbeats have
+        stopped, so messages to it are held instead of timing out one by one.
+        Each lapse trips the breaker once; after that the breaker's own probe
+        decides when the service is back """
+        if self.get_breaker is None:
+            return
+        peers = [
+            ('database', self.timestamp_db),
+            ('schedule', self.timestamp_schedule),
+            ('wemo', self.timestamp_wemo)
+        ]
+        now = self.loop.time()
+        for name, timestamp in peers:
+            # Services get hb_timeout from start-up to send their first one
+            last_seen = max(timestamp or self.started, self.started)
+            if now - last_seen < self.hb_timeout:
+                continue
+            if self.hb_tripped.get(name) == timestamp:
+                continue
+            self.hb_tripped[name] = timestamp
+            self.get_breaker(
+                self.service_addresses[name + '_addr'],
+                self.service_addresses[name + '_port']
+            ).trip('no heartbeat from %s service for %.0f seconds' % (
+                name, now - last_seen))
+
+
+    def check_schedule(self):
+        """ Periodically check scheduled on/off commands for devices.  Devices
+        whose schedule is cached until a known next transition are skipped;
+        they are checked by query_schedule_device() when it arrives.  With a
+        schedule_bulk_size, the rest are asked for in bulk messages """
+        self.out_msg_list = create_get_device_scheduled_state_msg(
+            self.logger,
+            self.ref_num,
+            self.devices,
+            self.service_addresses,
+            self.message_types,
+            schedule_cache=self.schedule_cache,
+            bulk_size=self.schedule_bulk_size,
+            local_rules=self.local_rules)
+
+        # Que up the polls, spread over schedule_spread seconds so the
+        # schedule service gets a steady trickle rather than a burst
+        self.schedule_pacer.submit(self.out_msg_list, self.schedule_spread)
+
+        # Update last-check
+        self.last_check_schedule = self.loop.time()
+
+
+    def query_schedule_device(self, dev_name):
+        """ Checks one device's scheduled command, when its cached schedule
+        reaches its next transition """
+        device = find_device(self.devices, dev_name, logger=self.logger)
+        if device is None:
+            self.schedule_cache.invalidate(dev_name)
+            return
+        self.queue_msgs(create_get_device_scheduled_state_msg(
+            self.logger,
+            self.ref_num,
+            [device],
+            self.service_addresses,
+            self.message_types))
+
+
+    @property
+    def local_rules(self):
+        """ Device rules evaluated by the rule engine rather than the
+        schedule service """
+        if self.rule_engine is None:
+            return ()
+        return self.rule_engine.rules
+
+
+    def apply_local_rule(self, rule, dev_cmd):
+        """ Sends dev_cmd to every device following rule, when the rule
+        engine finds that rule's command has changed """
+        states = [(d.dev_name, dev_cmd, None) for d in self.devices
+                  if rule_name(d.dev_rule) == rule]
+        self.logger.debug('Applying %s to %s devices with the %s rule',
+                          dev_cmd, len(states), rule)
+        self.queue_msgs(apply_scheduled_states(
+            self.logger,
+            self.ref_num,
+            self.devices,
+            states,
+            self.service_addresses['automation_addr'],
+            self.service_addresses['automation_port'],
+            self.service_addresses,
+            self.message_types))
+
+
+    # DEVICE STATUS CHANGE OF STATE CHECKS
+    def check_cos(self):
+        """ Log any device changes of state to database.  Only log if database
+        service is confirmed alive to avoid data loss (hb received within
+        hb_timeout seconds) """
+        if self.timestamp_db is not None and \
+           self.loop.time() - self.timestamp_db < self.hb_timeout:
+            # Initialize outgoing message list
+            self.out_msg_list = []
+            # Only devices whose status or last seen time changed since the
+            # last check are looked at.  While the database is down they stay
+            # in the registry's changed list
+            for d in self.devices.pop_changed():
+                # A change may since have been undone, so confirm the status
+                # and last_seen still differ from their memory values
+                if d.status_changed:
+                    # When COS detected, append new LSU message to outgoing list
+                    self.logger.debug('Change of state detected in the status '
+                                      'of: %s', d.dev_name)
+                    self.out_msg_list.append(
+                        copy.copy(
+                            LogStatusUpdateMessage(
+                                logger=self.logger,
+                                ref=self.ref_num.new(),
+                                dest_addr=self.service_addresses['database_addr'],
+                                dest_port=self.service_addresses['database_port'],
+                                source_addr=self.service_addresses['automation_addr'],
+                                source_port=self.service_addresses['automation_port'],
+                                msg_type=self.message_types['log_status_update'],
+                                dev_name=d.dev_name,
+                                dev_addr=d.dev_addr,
+                                dev_status=d.dev_status,
+                                dev_last_seen=d.dev_last_seen
+                            ).complete
+                        )
+                    )
+                    # Update values in status_mem and last_seen_mem to prevent
+                    # duplicate triggers
+                    self.logger.debug('LSU message for %s created and '
+                                      'queued', d.dev_name)
+                    d.mark_logged()
+
+            # Que up response messages in outgoing msg que
+            self.queue_msgs(self.out_msg_list)
@@ -6,6 +6,7 @@
 import asyncio
 from contextlib import suppress
 import os
+import signal
 import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -35,12 +36,23 @@ SERVICE_CONFIG = ConfigureService(config_file)
 LOGGER = SERVICE_CONFIG.get_logger()
 SERVICE_ADDRESSES = SERVICE_CONFIG.get_servers()
 MESSAGE_TYPES = SERVICE_CONFIG.get_message_types()
+FRAMED_PEERS = SERVICE_CONFIG.get_framed_peers()
+MESSAGE_HANDLING = SERVICE_CONFIG.get_message_handling()
+MESSAGE_PRIORITIES, DEFAULT_CLASS = SERVICE_CONFIG.get_message_priorities()
 CUR_LAT, CUR_LONG = SERVICE_CONFIG.get_location()
+UTC_OFFSET = SERVICE_CONFIG.get_utc_offset()
 DEVICES = SERVICE_CONFIG.get_devices()
 
 REF_NUM = RefNum(logger=LOGGER)
 LOOP = asyncio.get_event_loop()
-COMM_HANDLER = MessageHandler(LOOP, logger=LOGGER)
+COMM_HANDLER = MessageHandler(
+    LOOP,
+    logger=LOGGER,
+    framed_peers=FRAMED_PEERS,
+    priorities=MESSAGE_PRIORITIES,
+    default_class=DEFAULT_CLASS,
+    **MESSAGE_HANDLING
+)
 MAINTASK = MainTask(
     logger=LOGGER,
     ref=REF_NUM,
@@ -48,7 +60,23 @@ MAINTASK = MainTask(
     msg_in_queue=COMM_HANDLER.msg_in_queue,
     msg_out_queue=COMM_HANDLER.msg_out_queue,
     service_addresses=SERVICE_ADDRESSES,
-    message_types=MESSAGE_TYPES
+    message_types=MESSAGE_TYPES,
+    get_breaker=COMM_HANDLER.get_breaker,
+    hb_timeout=MESSAGE_HANDLING.get('hb_timeout', 120),
+    hb_interval=MESSAGE_HANDLING.get('hb_interval', 60),
+    hb_jitter=MESSAGE_HANDLING.get('hb_jitter', 0),
+    schedule_interval=MESSAGE_HANDLING.get('schedule_interval', 60),
+    schedule_jitter=MESSAGE_HANDLING.get('schedule_jitter', 0),
+    schedule_max_age=MESSAGE_HANDLING.get('schedule_max_age', 3600),
+    schedule_bulk_size=MESSAGE_HANDLING.get('schedule_bulk_size', 0),
+    hb_spread=MESSAGE_HANDLING.get('hb_spread', 0),
+    schedule_spread=MESSAGE_HANDLING.get('schedule_spread', 0),
+    pace_jitter=MESSAGE_HANDLING.get('pace_jitter', 0),
+    latitude=CUR_LAT,
+    longitude=CUR_LONG,
+    utc_offset=UTC_OFFSET,
+    cos_interval=MESSAGE_HANDLING.get('cos_interval', 0.1),
+    stats_interval=MESSAGE_HANDLING.get('stats_interval', 300)
 )
 
 # Main ************************************************************************
@@ -82,6 +110,16 @@ def main():
     LOGGER.debug('Scheduling outgoing message task for execution')
     asyncio.ensure_future(COMM_HANDLER.handle_msg_out())
 
+    # Dump the debug flight recorder on SIGUSR1, off the event loop thread
+    if SERVICE_CONFIG.flight_recorder is not None:
+        try:
+            LOOP.add_signal_handler(
+                signal.SIGUSR1, LOOP.run_in_executor, None,
+                SERVICE_CONFIG.flight_recorder.dump, 'SIGUSR1')
+        except (AttributeError, NotImplementedError):
+            LOGGER.info('Flight recorder dump signal not supported on this '
+                        'platform')
+
     # Serve requests until Ctrl+C is pressed
     LOGGER.info('Automation Service')
     LOGGER.info('Serving on {}'.format(msg_in_task.sockets[0].getsockname()))
@@ -108,6 +146,9 @@ def main():
     # Terminate the execution LOOP
     LOOP.close()
 
+    # Write out any log records still queued for the log handlers
+    SERVICE_CONFIG.log_listener.stop()
+
 
 # Call Main *******************************************************************
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+""" circuit_breaker.py:
+    Per-destination circuit breaker used to stop sending to peers that are
+    known to be down
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+# Circuit Breaker Class Def ***************************************************
+class CircuitBreaker(object):
+    """ Tracks whether a destination is worth sending to.
+
+    A closed breaker lets everything through.  `failure_threshold`
+    consecutive send failures, or a call to trip() (e.g. for missed
+    heartbeats), opens it.  Once `reset_timeout` seconds have passed an open
+    breaker goes half-open and lets a single probe message through: success
+    closes it again, failure re-opens it for another reset_timeout """
+    def __init__(self, loop, addr, port, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.addr = addr
+        self.port = str(port)
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.shed = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+        self.reason = str()
+        self.closed_event = asyncio.Event(loop=self.loop)
+        self.closed_event.set()
+        self.failure_threshold = 5
+        self.reset_timeout = 30.0
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "failure_threshold":
+                    self.failure_threshold = max(1, int(value))
+                    self.logger.debug('Failure threshold set during __init__ '
+                                      'to: %s', self.failure_threshold)
+                if key == "reset_timeout":
+                    self.reset_timeout = float(value)
+                    self.logger.debug('Reset timeout set during __init__ '
+                                      'to: %s', self.reset_timeout)
+
+    def allow(self):
+        """ Returns True if a message may be sent now.  An open breaker whose
+        reset_timeout has passed goes half-open and allows one probe; a probe
+        that never resolves is replaced after another reset_timeout """
+        if self.state == CLOSED:
+            return True
+        now = self.loop.time()
+        if self.state == OPEN and now >= self.opened_at + self.reset_timeout:
+            self.state = HALF_OPEN
+            self.probe_at = now
+            self.logger.info('Circuit to %s:%s half-open, sending probe',
+                             self.addr, self.port)
+            return True
+        if self.state == HALF_OPEN and now >= self.probe_at + self.reset_timeout:
+            self.probe_at = now
+            return True
+        return False
+
+    def retry_in(self):
+        """ Seconds until allow() could next return True """
+        if self.state == CLOSED:
+            return 0.0
+        if self.state == OPEN:
+            return max(0.0, self.opened_at + self.reset_timeout - self.loop.time())
+        return max(0.0, self.probe_at + self.reset_timeout - self.loop.time())
+
+    @asyncio.coroutine
+    def wait_allowed(self):
+        """ Parks the caller until a message may be sent """
+        while self.allow() is False:
+            try:
+                yield from asyncio.wait_for(
+                    self.closed_event.wait(), self.retry_in(), loop=self.loop)
+            except asyncio.TimeoutError:
+                pass
+
+    def record_success(self):
+        """ Records a delivered message.  Returns True if this closed the
+        breaker """
+        self.failures = 0
+        if self.state == CLOSED:
+            return False
+        self.state = CLOSED
+        self.closed_event.set()
+        self.logger.info('Circuit to %s:%s closed, peer is reachable again',
+                         self.addr, self.port)
+        return True
+
+    def record_failure(self, reason='send failed'):
+        """ Records a failed send, opening the breaker if the peer looks down """
+        self.failures += 1
+        if self.state == HALF_OPEN or \
+           (self.state == CLOSED and self.failures >= self.failure_threshold):
+            self.open(reason)
+
+    def trip(self, reason):
+        """ Opens a closed breaker for a reason other than send failures """
+        if self.state == CLOSED:
+            self.open(reason)
+
+    def open(self, reason):
+        self.state = OPEN
+        self.opened_at = self.loop.time()
+        self.reason = reason
+        self.trips += 1
+        self.closed_event.clear()
+        self.logger.warning('Circuit to %s:%s opened (%s), holding messages for '
+                            '%s seconds', self.addr, self.port, reason,
+                            self.reset_timeout)
+
+    @property
+    def stats(self):
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'trips': self.trips,
+            'shed': self.shed}
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+""" connection_pool.py:
+    Pool of persistent outbound socket connections keyed by destination
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import collections
+import logging
+import os
+import sys
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Connection Pool Class Def ***************************************************
+class ConnectionPool(object):
+    """ Keeps outgoing socket connections open between messages so repeated
+    sends to the same (address, port) destination can skip the TCP handshake
+    and teardown """
+    def __init__(self, loop, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.max_idle = 60.0
+        self._idle = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dest_hits = collections.Counter()
+        self.dest_misses = collections.Counter()
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "max_idle":
+                    self.max_idle = float(value)
+                    self.logger.debug('Max idle time set during __init__ '
+                                      'to: %s', self.max_idle)
+
+    # Connection health check *************************************************
+    def is_healthy(self, reader, writer):
+        """ Returns True if a pooled connection can still be written to """
+        if writer.transport is None or writer.transport.is_closing():
+            return False
+        if reader.at_eof() or reader.exception() is not None:
+            return False
+        return True
+
+    # Get connection for destination ******************************************
+    @asyncio.coroutine
+    def acquire(self, addr, port, greeting=None):
+        """ Returns a (reader, writer) pair for the destination, reusing an
+        idle pooled connection when a healthy one is available.  greeting is
+        written to a newly opened connection only """
+        key = (addr, str(port))
+        idle = self._idle.get(key, [])
+        while len(idle) > 0:
+            reader, writer, last_used = idle.pop()
+            if self.is_healthy(reader, writer) is True:
+                self.hits += 1
+                self.dest_hits[key] += 1
+                self.logger.debug('Reusing pooled connection to %s:%s', addr, port)
+                return reader, writer
+            self.logger.debug('Discarding stale pooled connection to %s:%s',
+                              addr, port)
+            writer.close()
+        self.misses += 1
+        self.dest_misses[key] += 1
+        self.logger.debug('Opening new connection to %s:%s', addr, port)
+        reader, writer = yield from asyncio.open_connection(
+            addr, int(port), loop=self.loop)
+        if greeting is not None:
+            writer.write(greeting)
+        return reader, writer
+
+    # Return connection to pool ***********************************************
+    def release(self, addr, port, reader, writer):
+        """ Returns a connection to the pool once a send has completed """
+        if self.is_healthy(reader, writer) is True:
+            key = (addr, str(port))
+            self._idle.setdefault(key, []).append(
+                (reader, writer, self.loop.time()))
+            self.logger.debug('Connection to %s:%s returned to pool', addr, port)
+        else:
+            self.logger.debug('Connection to %s:%s closed by peer, not pooling',
+                              addr, port)
+            writer.close()
+
+    def discard(self, writer):
+        """ Closes a connection that failed mid-send rather than pooling it """
+        if writer is not None:
+            writer.close()
+
+    # Idle connection eviction ************************************************
+    def evict_idle(self):
+        """ Closes pooled connections that have gone unused longer than
+        max_idle seconds or that the peer has already closed """
+        now = self.loop.time()
+        for key in list(self._idle.keys()):
+            keep = []
+            for reader, writer, last_used in self._idle[key]:
+                if now - last_used > self.max_idle or \
+                   self.is_healthy(reader, writer) is False:
+                    writer.close()
+                    self.evictions += 1
+                else:
+                    keep.append((reader, writer, last_used))
+            if len(keep) > 0:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+
+    def close_all(self):
+        """ Closes every pooled connection """
+        for key in list(self._idle.keys()):
+            for reader, writer, last_used in self._idle.pop(key):
+                writer.close()
+
+    # Pool statistics *********************************************************
+    @property
+    def idle_count(self):
+        return sum(len(conns) for conns in self._idle.values())
+
+    def destination_stats(self, addr, port):
+        """ Returns how many connections to a destination were opened and
+        how many were reused from the pool """
+        key = (addr, str(port))
+        return {
+            'opened': self.dest_misses[key],
+            'reused': self.dest_hits[key]}
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'idle': self.idle_count}
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+""" dead_letter.py:
+    Store for outgoing messages that could not be delivered
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import collections
+import datetime
+import logging
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+DeadLetter = collections.namedtuple(
+    'DeadLetter', ['timestamp', 'dest_addr', 'dest_port', 'msg', 'attempts', 'reason'])
+
+
+# Dead Letter Queue Class Def *************************************************
+class DeadLetterQueue(object):
+    """ Keeps the most recent messages that exhausted their send retries so
+    they can be inspected and re-queued instead of being silently lost """
+    def __init__(self, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.max_size = 500
+        self.total = 0
+        self.replayed = 0
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "max_size":
+                    self.max_size = int(value)
+                    self.logger.debug('Max size set during __init__ '
+                                      'to: %s', self.max_size)
+        self._entries = collections.deque(maxlen=self.max_size)
+
+    def add(self, dest_addr, dest_port, msg, attempts, reason):
+        """ Records a message that could not be delivered """
+        self._entries.append(DeadLetter(
+            datetime.datetime.now(), dest_addr, str(dest_port), msg, attempts, reason))
+        self.total += 1
+        self.logger.warning('Dead-lettered message to %s:%s after %s attempt(s) '
+                            '(%s): %s', dest_addr, dest_port, attempts, reason, msg)
+
+    def entries(self, dest_addr=None, dest_port=None):
+        """ Returns the stored dead letters, optionally for one destination """
+        return [entry for entry in self._entries
+                if (dest_addr is None or entry.dest_addr == dest_addr) and
+                (dest_port is None or entry.dest_port == str(dest_port))]
+
+    def replay(self, msg_queue, dest_addr=None, dest_port=None):
+        """ Removes matching dead letters and puts their messages back on
+        msg_queue for another delivery attempt.  Returns the number
+        re-queued """
+        replay = self.entries(dest_addr, dest_port)
+        for entry in replay:
+            self._entries.remove(entry)
+            msg_queue.put_nowait(entry.msg)
+        self.replayed += len(replay)
+        self.logger.info('Re-queued %s dead-lettered message(s)', len(replay))
+        return len(replay)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        return {
+            'stored': len(self._entries),
+            'total': self.total,
+            'replayed': self.replayed}
@@ -3,13 +3,17 @@
 """
 
 # Import Required Libraries (Standard, Third Party, Local) ********************
+import collections
 import datetime
 import logging
 import os
+import re
 import sys
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.tools.field_checkers import is_valid_datetime
 from bob_auto_service.tools.ipv4_help import check_ipv4
+from bob_auto_service.tools.log_support import on_accessor_debug
 
 
 # Authorship Info *************************************************************
@@ -23,6 +27,12 @@ __email__ = "csmaue@gmail.com"
 __status__ = "Development"
 
 
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+DATETIME_FAST = re.compile(
+    r'[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}(\.[0-9]{1,6})?$')
+
+
 # Search device list by name **************************************************
 def search_device_list(devices, dev_name, logger=None):
     """ function to search a list of items of Device class items and return
@@ -41,10 +51,86 @@ def search_device_list(devices, dev_name, logger=None):
     return None
 
 
+# Find device by name *********************************************************
+def find_device(devices, dev_name, logger=None):
+    """ function to return the device with a matching dev_name element, or
+        None.  A DeviceRegistry is looked up through its name index, a plain
+        list of devices is searched in order
+    """
+    if isinstance(devices, DeviceRegistry):
+        return devices.by_name(dev_name)
+    i = search_device_list(devices, dev_name, logger=logger)
+    if i is None:
+        return None
+    return devices[i]
+
+
+# Last seen time conversion ***************************************************
+def to_epoch(value, logger=None):
+    """ function to convert a datetime, date, time, or datetime string into
+        seconds since 1970-01-01 00:00:00, counted in local wall-clock time
+        and truncated to the second.  Returns None if the value can not be
+        converted
+    """
+    if isinstance(value, str):
+        if DATETIME_FAST.match(value) is None:
+            # Date or time only strings are completed as the messages are
+            value = is_valid_datetime(value, '', logger=logger)
+            if len(value) != 19:
+                return None
+        try:
+            day = datetime.date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+        except ValueError:
+            return None
+        hour = int(value[11:13])
+        minute = int(value[14:16])
+        second = int(value[17:19])
+        # The fast pattern only checks for digits, so check the time is real
+        if hour > 23 or minute > 59 or second > 59:
+            return None
+        return float(
+            (day.toordinal() - EPOCH_ORDINAL) * 86400
+            + hour * 3600 + minute * 60 + second)
+    if isinstance(value, datetime.datetime):
+        pass
+    elif isinstance(value, datetime.time):
+        value = datetime.datetime.combine(datetime.datetime.now().date(), value)
+    elif isinstance(value, datetime.date):
+        value = datetime.datetime.combine(value, datetime.datetime.now().time())
+    else:
+        return None
+    return float(
+        (value.toordinal() - EPOCH_ORDINAL) * 86400
+        + value.hour * 3600 + value.minute * 60 + value.second)
+
+
+def from_epoch(seconds):
+    """ function to format seconds from to_epoch() as the 19 character
+        datetime string used in messages.  Zero, never seen, is an empty
+        string
+    """
+    if not seconds:
+        return str()
+    return str(EPOCH + datetime.timedelta(seconds=seconds))
+
+
 # Device Class Definition *****************************************************
 class Device(object):
     """ Class used to define the objects and methods associated with a physical
-    device that will be interfaced to/from this application """
+    device that will be interfaced to/from this application.
+
+    Name, type, command, status and rule values are interned, so equal values
+    are the same object.  Last seen times are kept in last_seen and
+    last_seen_mem as seconds from to_epoch(), and only formatted as strings
+    when read through dev_last_seen and dev_last_seen_mem.  Setting the status
+    or last seen time through those properties tells the device's registry
+    when it no longer matches the values last logged """
+    __slots__ = ('logger', '_dev_name', '_dev_type', '_dev_addr', '_dev_cmd',
+                 '_dev_status', '_dev_status_mem', 'last_seen', 'last_seen_mem',
+                 '_dev_rule', 'registry')
+    # Set from log_support.set_accessor_debug()
+    accessor_debug = True
+
     def __init__(self, logger=None, **kwargs):
         # Configure logger
         self.logger = logger or logging.getLogger(__name__)
@@ -56,10 +142,11 @@ class Device(object):
         self._dev_cmd = str()
         self._dev_status = str()
         self._dev_status_mem = str()
-        self._dev_last_seen = datetime.datetime
-        self._dev_last_seen_mem = datetime.datetime
+        self.last_seen = 0.0
+        self.last_seen_mem = 0.0
         self._dev_rule = str()
-        
+        # Registry indexing this device, told about name/addr/type/rule changes
+        self.registry = None
 
         # Process input variables if present
         if kwargs is not None:
@@ -104,157 +191,323 @@ class Device(object):
     # device name field *******************************************************
     @property
     def dev_name(self):
-        self.logger.debug('Returning current device name: %s', self._dev_name)
+        if self.accessor_debug:
+            self.logger.debug('Returning current device name: %s', self._dev_name)
         return self._dev_name
 
     @dev_name.setter
     def dev_name(self, value):
+        old_value = self._dev_name
         if isinstance(value, str):
-            self._dev_name = value.lower()
+            self._dev_name = sys.intern(value.lower())
         else:
-            self._dev_name = (str(value)).lower()
-        self.logger.debug('Device name updated to: %s', self._dev_name)
+            self._dev_name = sys.intern(str(value).lower())
+        if self.accessor_debug:
+            self.logger.debug('Device name updated to: %s', self._dev_name)
+        if self.registry is not None:
+            self.registry.reindex(self, 'dev_name', old_value, self._dev_name)
 
     # device type field *******************************************************
     @property
     def dev_type(self):
-        self.logger.debug('Returning current device type: %s', self._dev_type)
+        if self.accessor_debug:
+            self.logger.debug('Returning current device type: %s', self._dev_type)
         return self._dev_type
 
     @dev_type.setter
     def dev_type(self, value):
+        old_value = self._dev_type
         if isinstance(value, str):
-            self._dev_type = value.lower()
+            self._dev_type = sys.intern(value.lower())
         else:
-            self._dev_type = (str(value)).lower()
-        self.logger.debug('Device type updated to: %s', self._dev_type)
+            self._dev_type = sys.intern(str(value).lower())
+        if self.accessor_debug:
+            self.logger.debug('Device type updated to: %s', self._dev_type)
+        if self.registry is not None:
+            self.registry.reindex(self, 'dev_type', old_value, self._dev_type)
 
     # device address field ****************************************************
     @property
     def dev_addr(self):
-        self.logger.debug('Returning current device address: %s', self._dev_addr)
+        if self.accessor_debug:
+            self.logger.debug('Returning current device address: %s', self._dev_addr)
         return self._dev_addr
 
     @dev_addr.setter
     def dev_addr(self, value):
+        old_value = self._dev_addr
         if isinstance(value, str):
             if check_ipv4(value, logger=self.logger) is True:
                 self._dev_addr = value
-                self.logger.debug('Device address updated to: %s', self._dev_addr)
+                if self.accessor_debug:
+                    self.logger.debug('Device address updated to: %s', self._dev_addr)
             else:
                 self.logger.warning('Invalid address: %s', value)
         else:
             if check_ipv4(str(value), logger=self.logger) is True:
                 self._dev_addr = str(value)
-                self.logger.debug('Device address updated to: %s', self._dev_addr)
+                if self.accessor_debug:
+                    self.logger.debug('Device address updated to: %s', self._dev_addr)
             else:
                 self.logger.warning('Invalid address: %s', value)
+        if self.registry is not None:
+            self.registry.reindex(self, 'dev_addr', old_value, self._dev_addr)
 
     # device command field ****************************************************
     @property
     def dev_cmd(self):
-        self.logger.debug('Returning current device command: %s', self._dev_cmd)
+        if self.accessor_debug:
+            self.logger.debug('Returning current device command: %s', self._dev_cmd)
         return self._dev_cmd
 
     @dev_cmd.setter
     def dev_cmd(self, value):
         if isinstance(value, str):
-            self._dev_cmd = value.lower()
+            self._dev_cmd = sys.intern(value.lower())
         else:
-            self._dev_cmd = (str(value)).lower()
-        self.logger.debug('Device command updated to: %s', self._dev_cmd)
+            self._dev_cmd = sys.intern(str(value).lower())
+        if self.accessor_debug:
+            self.logger.debug('Device command updated to: %s', self._dev_cmd)
 
     # device status field *****************************************************
     @property
     def dev_status(self):
-        self.logger.debug('Returning current device status: %s', self._dev_status)
+        if self.accessor_debug:
+            self.logger.debug('Returning current device status: %s', self._dev_status)
         return self._dev_status
 
     @dev_status.setter
     def dev_status(self, value):
         if isinstance(value, str):
-            self._dev_status = value.lower()
+            self._dev_status = sys.intern(value.lower())
         else:
-            self._dev_status = (str(value)).lower()
-        self.logger.debug('Device status updated to: %s', self._dev_status)
+            self._dev_status = sys.intern(str(value).lower())
+        if self.accessor_debug:
+            self.logger.debug('Device status updated to: %s', self._dev_status)
+        self._check_changed()
 
     # device status memory field **********************************************
     @property
     def dev_status_mem(self):
-        self.logger.debug('Returning current device status mem: %s', self._dev_status_mem)
+        if self.accessor_debug:
+            self.logger.debug('Returning current device status mem: %s', self._dev_status_mem)
         return self._dev_status_mem
 
     @dev_status_mem.setter
     def dev_status_mem(self, value):
         if isinstance(value, str):
-            self._dev_status_mem = value.lower()
+            self._dev_status_mem = sys.intern(value.lower())
         else:
-            self._dev_status_mem = (str(value)).lower()
-        self.logger.debug('Device status mem updated to: %s', self._dev_status_mem)        
+            self._dev_status_mem = sys.intern(str(value).lower())
+        if self.accessor_debug:
+            self.logger.debug('Device status mem updated to: %s', self._dev_status_mem)
+        self._check_changed()
 
     # device last seen field **************************************************
     @property
     def dev_last_seen(self):
-        self.logger.debug('Returning current device last seen: %s',
-                       self._dev_last_seen)
-        return self._dev_last_seen
+        if self.accessor_debug:
+            self.logger.debug('Returning current device last seen: %s',
+                              from_epoch(self.last_seen))
+        return from_epoch(self.last_seen)
 
     @dev_last_seen.setter
     def dev_last_seen(self, value):
-        if isinstance(value, datetime.datetime):
-            self._dev_last_seen = (str(value))[:19]
-        elif isinstance(value, datetime.time):
-            self._dev_last_seen = (str(
-                datetime.datetime.combine(
-                    datetime.datetime.now().date(), value)))[:19]
-        elif isinstance(value, datetime.date):
-            self._dev_last_seen = (str(
-                datetime.datetime.combine(
-                    value, datetime.datetime.now().time())))[:19]
-        if isinstance(value, str):
-            if len(value) >= 19:
-                self._dev_last_seen = value[:19]
-            else:
-                self._dev_last_seen = value
-        self.logger.debug('Device last seen updated to: %s', self._dev_last_seen)
+        seconds = to_epoch(value, logger=self.logger)
+        if seconds is not None:
+            self.last_seen = seconds
+            if self.accessor_debug:
+                self.logger.debug('Device last seen updated to: %s',
+                                  from_epoch(self.last_seen))
+            self._check_changed()
+        else:
+            self.logger.warning('Invalid last seen time: %s', value)
 
-    # device last seen field **************************************************
+    # device last seen memory field *******************************************
     @property
     def dev_last_seen_mem(self):
-        self.logger.debug('Returning current device last seen mem: %s',
-                       self._dev_last_seen_mem)
-        return self._dev_last_seen_mem
+        if self.accessor_debug:
+            self.logger.debug('Returning current device last seen mem: %s',
+                              from_epoch(self.last_seen_mem))
+        return from_epoch(self.last_seen_mem)
 
     @dev_last_seen_mem.setter
     def dev_last_seen_mem(self, value):
-        if isinstance(value, datetime.datetime):
-            self._dev_last_seen_mem = (str(value))[:19]
-        elif isinstance(value, datetime.time):
-            self._dev_last_seen_mem = (str(
-                datetime.datetime.combine(
-                    datetime.datetime.now().date(), value)))[:19]
-        elif isinstance(value, datetime.date):
-            self._dev_last_seen_mem = (str(
-                datetime.datetime.combine(
-                    value, datetime.datetime.now().time())))[:19]
-        if isinstance(value, str):
-            if len(value) >= 19:
-                self._dev_last_seen_mem = value[:19]
-            else:
-                self._dev_last_seen_mem = value
-        self.logger.debug('Device last seen mem updated to: %s',
-                          self._dev_last_seen_mem)
+        seconds = to_epoch(value, logger=self.logger)
+        if seconds is not None:
+            self.last_seen_mem = seconds
+            if self.accessor_debug:
+                self.logger.debug('Device last seen mem updated to: %s',
+                                  from_epoch(self.last_seen_mem))
+            self._check_changed()
+        else:
+            self.logger.warning('Invalid last seen time: %s', value)
 
     # device rule field *******************************************************
     @property
     def dev_rule(self):
-        self.logger.debug('Returning current device rule: %s', self._dev_rule)
+        if self.accessor_debug:
+            self.logger.debug('Returning current device rule: %s', self._dev_rule)
         return self._dev_rule
 
     @dev_rule.setter
     def dev_rule(self, value):
+        old_value = self._dev_rule
         if isinstance(value, str):
-            self._dev_rule = value.lower()
+            self._dev_rule = sys.intern(value.lower())
         else:
-            self._dev_rule = (str(value)).lower()
-        self.logger.debug('Device rule updated to: %s', self._dev_rule)
+            self._dev_rule = sys.intern(str(value).lower())
+        if self.accessor_debug:
+            self.logger.debug('Device rule updated to: %s', self._dev_rule)
+        if self.registry is not None:
+            self.registry.reindex(self, 'dev_rule', old_value, self._dev_rule)
+
+    # change of state tracking ************************************************
+    @property
+    def status_changed(self):
+        """ True if the status or last seen time differ from the values last
+        logged to the database """
+        return self._dev_status is not self._dev_status_mem or \
+            self.last_seen != self.last_seen_mem
+
+    def mark_logged(self):
+        """ Records the current status and last seen time as logged """
+        self._dev_status_mem = self._dev_status
+        self.last_seen_mem = self.last_seen
+
+    def _check_changed(self):
+        # Tell the registry, so only changed devices are checked for COS
+        if self.registry is not None and self.status_changed:
+            self.registry.mark_changed(self)
+
+    def __copy__(self):
+        # Copies are not in the registry, so must not update its indexes
+        duplicate = Device.__new__(Device)
+        for slot in self.__slots__:
+            setattr(duplicate, slot, getattr(self, slot))
+        duplicate.registry = None
+        return duplicate
+
+
+# Device Registry Class Definition ********************************************
+class DeviceRegistry(object):
+    """ Ordered collection of devices, indexed by name, address, type and rule.
+
+    Iterating and indexing the registry works like the device list it
+    replaces.  Each device added points back at the registry, and its
+    dev_name, dev_addr, dev_type and dev_rule setters re-index it, so the
+    indexes always match the devices' current values.  Devices whose status
+    or last seen time changed are collected in changed, in the order the
+    changes happened, until pop_changed() hands them over """
+    index_fields = ('dev_name', 'dev_addr', 'dev_type', 'dev_rule')
+
+    def __init__(self, devices=None, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        # Devices and index entries are kept in OrderedDicts keyed by id(), so
+        # they stay in the order they were added and a device is removed
+        # without searching for it
+        self.devices = collections.OrderedDict()
+        self.indexes = dict((field, {}) for field in self.index_fields)
+        self.changed = collections.OrderedDict()
+        self._list = None
+        for device in devices or []:
+            self.add(device)
+
+    def add(self, device):
+        """ Adds a device to the end of the registry and its indexes """
+        if device.registry is not None and device.registry is not self:
+            device.registry.remove(device)
+        if id(device) not in self.devices and self._list is not None:
+            self._list.append(device)
+        self.devices[id(device)] = device
+        device.registry = self
+        for field in self.index_fields:
+            entry = self.indexes[field].setdefault(
+                getattr(device, field), collections.OrderedDict())
+            entry[id(device)] = device
+        if device.status_changed:
+            self.mark_changed(device)
+        self.logger.debug('Device %s added to registry', device.dev_name)
+
+    def remove(self, device):
+        """ Removes a device from the registry and its indexes """
+        if self.devices.pop(id(device), None) is None:
+            raise ValueError('Device %s is not in the registry' % device.dev_name)
+        self._list = None
+        device.registry = None
+        self.changed.pop(device, None)
+        for field in self.index_fields:
+            self._unindex(field, getattr(device, field), device)
+        self.logger.debug('Device %s removed from registry', device.dev_name)
+
+    def mark_changed(self, device):
+        """ Adds a device to the changed devices.  Called by the Device
+        setters """
+        self.changed[device] = None
+
+    def pop_changed(self):
+        """ Returns the list of changed devices and clears it """
+        devices = list(self.changed)
+        self.changed.clear()
+        return devices
+
+    def reindex(self, device, field, old_value, new_value):
+        """ Moves a device between index entries when one of its indexed
+        fields changes.  Called by the Device setters.  The device goes to
+        the end of its new entry """
+        if old_value == new_value:
+            return
+        self._unindex(field, old_value, device)
+        entry = self.indexes[field].setdefault(new_value, collections.OrderedDict())
+        entry[id(device)] = device
+
+    def _unindex(self, field, value, device):
+        entry = self.indexes[field].get(value)
+        if entry is None:
+            return
+        entry.pop(id(device), None)
+        if not entry:
+            del self.indexes[field][value]
+
+    def by_name(self, dev_name):
+        """ Returns the first device named dev_name (in any case), or None """
+        entry = self.indexes['dev_name'].get(str(dev_name).lower())
+        if entry:
+            return next(iter(entry.values()))
+        return None
+
+    def by_addr(self, dev_addr):
+        """ Returns the list of devices at address dev_addr """
+        return list(self.indexes['dev_addr'].get(dev_addr, {}).values())
+
+    def by_type(self, dev_type):
+        """ Returns the list of devices of type dev_type """
+        entry = self.indexes['dev_type'].get(str(dev_type).lower(), {})
+        return list(entry.values())
+
+    def by_rule(self, dev_rule):
+        """ Returns the list of devices following rule dev_rule """
+        entry = self.indexes['dev_rule'].get(str(dev_rule).lower(), {})
+        return list(entry.values())
+
+    def __iter__(self):
+        return iter(self.devices.values())
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __getitem__(self, index):
+        # Positional lookups use a list rebuilt after a device is removed
+        if self._list is None:
+            self._list = list(self.devices.values())
+        return self._list[index]
+
+    def __repr__(self):
+        return 'DeviceRegistry(%r)' % [d.dev_name for d in self]
+
+
+def _set_accessor_debug(enabled):
+    Device.accessor_debug = enabled
+
+
+on_accessor_debug(_set_accessor_debug)
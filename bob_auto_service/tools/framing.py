@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+""" framing.py:
+    Newline-delimited framing used to carry multiple messages on a single
+    socket connection
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+FRAME_DELIMITER = b'\n'
+# Written once by a framed sender when it opens a connection.  Legacy
+# messages start with their ref number, so never with this byte
+FRAMED_PREAMBLE = b'\x02'
+MAX_FRAME_SIZE = 65536
+
+
+# Frame encoder ***************************************************************
+def encode_frame(msg):
+    """ Returns the wire bytes for a single message """
+    return msg.encode() + FRAME_DELIMITER
+
+
+# Stream parser class *********************************************************
+class MessageFramer(object):
+    """ Buffers bytes read from a stream and splits them into complete
+    messages.  Partial messages are held until the rest of the frame
+    arrives """
+    def __init__(self, logger=None):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """ Adds data read from the stream and returns a list of all messages
+        completed by it """
+        self._buffer.extend(data)
+        messages = []
+        start = 0
+        end = self._buffer.find(FRAME_DELIMITER, start)
+        while end >= 0:
+            frame = bytes(self._buffer[start:end]).rstrip(b'\r')
+            if len(frame) > 0:
+                messages.append(frame.decode())
+            start = end + 1
+            end = self._buffer.find(FRAME_DELIMITER, start)
+        del self._buffer[:start]
+        if len(self._buffer) > MAX_FRAME_SIZE:
+            self.logger.warning('Discarding %s bytes received without a frame '
+                                'delimiter', len(self._buffer))
+            self._buffer.clear()
+        return messages
+
+    @property
+    def pending(self):
+        """ Bytes received that are not yet part of a complete message """
+        return bytes(self._buffer)
+
+    def flush(self):
+        """ Returns and clears any buffered partial message """
+        remainder = bytes(self._buffer).decode()
+        self._buffer.clear()
+        return remainder
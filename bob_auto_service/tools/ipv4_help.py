@@ -18,6 +18,13 @@ __email__ = "csmaue@gmail.com"
 __status__ = "Development"
 
 
+IPV4_REGEX = re.compile(
+    r'\b(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.'
+    r'(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.'
+    r'(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.'
+    r'(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b')
+
+
 # IPv4 Format helper function *************************************************
 def check_ipv4(address, logger=None):
     """ simple function used to determine if the contents of a string are
@@ -25,10 +32,6 @@ def check_ipv4(address, logger=None):
     # Configure loggers
     logger = logger or logging.getLogger(__name__)
 
-    ipv4_regex = r'\b(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.' \
-                 r'(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.' \
-                 r'(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.' \
-                 r'(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b'
     # check if address is a string
     if isinstance(address, str) is not True:
         try:
@@ -39,7 +42,7 @@ def check_ipv4(address, logger=None):
     else:
         logger.debug('Input value was not a string: %s', str(address))
     # check if address is formatted correctly for an ipv4 address
-    if re.fullmatch(ipv4_regex, address) is not None:
+    if IPV4_REGEX.fullmatch(address) is not None:
         logger.debug('Provided address is a valid IP address: %s', address)
         return True
     else:
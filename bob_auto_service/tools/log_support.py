@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+""" log_support.py:
+    Logging helpers shared by the service's modules
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import collections
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Accessor debug logging ******************************************************
+# The message and device field accessors log every get and set at debug level.
+# With accessor debug off those logger calls, and the evaluation of their
+# arguments, are skipped outright instead of being filtered by level
+accessor_debug = True
+accessor_hooks = []
+
+
+def set_accessor_debug(enabled):
+    """ Turns field accessor debug logging on or off everywhere """
+    global accessor_debug
+    accessor_debug = bool(enabled)
+    for hook in accessor_hooks:
+        hook(accessor_debug)
+
+
+def on_accessor_debug(hook):
+    """ Registers hook(enabled) to be called with the current setting now,
+    and again whenever set_accessor_debug() is called """
+    accessor_hooks.append(hook)
+    hook(accessor_debug)
+
+
+# Per-module log file router **************************************************
+class LogRouter(logging.Handler):
+    """ Passes each record on to the handlers routed to its source file and
+    function.  A route's file name or function name may be blank to match
+    any, so ('device.py', '') takes everything logged from device.py.
+    Routing is a few dict lookups per record however many routes exist """
+    def __init__(self, level=logging.NOTSET):
+        super(LogRouter, self).__init__(level)
+        self.routes = {}
+
+    def add_route(self, file_name, func_name, handler):
+        """ Sends records from func_name in file_name to handler """
+        self.routes.setdefault((file_name, func_name), []).append(handler)
+
+    def emit(self, record):
+        for key in ((record.filename, record.funcName),
+                    (record.filename, ''),
+                    ('', record.funcName),
+                    ('', '')):
+            for handler in self.routes.get(key, ()):
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def close(self):
+        for handlers in self.routes.values():
+            for handler in handlers:
+                handler.close()
+        super(LogRouter, self).close()
+
+
+# Debug flight recorder *******************************************************
+class FlightRecorder(logging.Handler):
+    """ Keeps the last `capacity` records in memory instead of writing them
+    to disk, and writes them out to a file in `path` when dump() is called or
+    a record at `dump_level` or above arrives.  Automatic dumps are at least
+    `dump_interval` seconds apart, so an error storm writes one file.
+
+    Records are kept as (created, levelname, filename, funcName, message)
+    tuples: the strings other than the message are shared with every other
+    record from the same place """
+    def __init__(self, path, capacity=10000, dump_level=logging.ERROR,
+                 dump_interval=60.0, level=logging.NOTSET):
+        super(FlightRecorder, self).__init__(level)
+        self.path = path
+        self.ring = collections.deque(maxlen=capacity)
+        self.dump_level = dump_level
+        self.dump_interval = dump_interval
+        self.last_dump = None
+        self.dumps = 0
+
+    def emit(self, record):
+        self.ring.append((record.created, record.levelname, record.filename,
+                          record.funcName, record.getMessage()))
+        if record.levelno >= self.dump_level and (
+                self.last_dump is None or
+                record.created - self.last_dump >= self.dump_interval):
+            try:
+                self.write_dump('%s logged by %s' % (record.levelname, record.funcName))
+            except Exception:
+                self.handleError(record)
+
+    def dump(self, reason='requested'):
+        """ Writes the recorded records to a new file and returns its name """
+        self.acquire()
+        try:
+            return self.write_dump(reason)
+        finally:
+            self.release()
+
+    def write_dump(self, reason):
+        now = time.time()
+        file_name = os.path.join(self.path, 'flight_recorder_%s_%03d.log' % (
+            time.strftime('%Y%m%d_%H%M%S', time.localtime(now)), self.dumps))
+        with open(file_name, 'w') as dump_file:
+            dump_file.write('# %s records, dumped %s: %s\n' % (
+                len(self.ring), time.strftime('%Y-%m-%d %H:%M:%S'), reason))
+            for created, levelname, filename, func_name, message in self.ring:
+                dump_file.write('%s,%03d %-10s %-24s %-22s %s\n' % (
+                    time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created)),
+                    (created % 1) * 1000, levelname, filename, func_name, message))
+        self.last_dump = now
+        self.dumps += 1
+        return file_name
+
+
+# Background logging **********************************************************
+def start_queue_logging(logger, handlers):
+    """ Moves logger's output onto a background thread.  The logger is left
+    with a single QueueHandler, and `handlers` are run by the returned
+    QueueListener, so file writes and rollovers never block the caller.
+    Call stop() on the listener at shutdown to flush the queue """
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True)
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
+# Stand-alone module logging **************************************************
+def setup_log_handlers(file, debug_file, info_file):
+    """ Returns a logger named after the module `file` that logs info and up
+    to the console and info_file, and everything to debug_file.  The log
+    files are only opened once something is written to them """
+    logger = logging.getLogger(os.path.splitext(os.path.basename(file))[0])
+    logger.setLevel(logging.DEBUG)
+    logger.handlers = []
+    formatter = logging.Formatter(
+        '%(asctime)-25s %(levelname)-10s %(funcName)-22s %(message)s')
+    for handler, level in [
+            (logging.StreamHandler(sys.stdout), logging.INFO),
+            (logging.FileHandler(debug_file, delay=True), logging.DEBUG),
+            (logging.FileHandler(info_file, delay=True), logging.INFO)]:
+        handler.setLevel(level)
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    return logger
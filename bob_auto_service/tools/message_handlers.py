@@ -7,6 +7,18 @@ import asyncio
 import logging
 import os
 import sys
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.messages.envelope import MessageEnvelope
+from bob_auto_service.tools.circuit_breaker import CLOSED
+from bob_auto_service.tools.connection_pool import ConnectionPool
+from bob_auto_service.tools.dead_letter import DeadLetterQueue
+from bob_auto_service.tools.framing import encode_frame
+from bob_auto_service.tools.framing import FRAMED_PREAMBLE
+from bob_auto_service.tools.framing import MAX_FRAME_SIZE
+from bob_auto_service.tools.framing import MessageFramer
+from bob_auto_service.tools.peer_sender import PeerSender
+from bob_auto_service.tools.priority_queue import PriorityMessageQueue
 
 
 # Authorship Info *************************************************************
@@ -22,93 +34,175 @@ __status__ = "Development"
 
 # Message Handler Class Def ***************************************************
 class MessageHandler(object):
-    def __init__(self, loop, logger=None):
+    def __init__(self, loop, logger=None, **kwargs):
         # Configure logger
         self.logger = logger or logging.getLogger(__name__)
 
         self.loop = loop
         self.msg_in_queue = asyncio.Queue()
-        self.msg_out_queue = asyncio.Queue()
-        self.data_in = None
-        self.message = None
-        self.addr = None
-        self.msg_seg = []
-        self.ack_to_send = str()
-        self.reader = None
-        self.writer = None
+        self.msg_out_queue = None
+        self.read_size = 4096
+        self.framed_peers = set()
         self.msg_to_send = None
         self.msg_seg_out = []
-        self.reader_out = None
-        self.writer_out = None
-        self.ack = str()
-        self.data_ack = str()
-        self.sleep_time = 0.2
+        self.senders = {}
+        self.sender_options = {}
+        self.pool = ConnectionPool(self.loop, logger=self.logger)
+        self.pool_check_interval = 30.0
+        self.dead_letters = DeadLetterQueue(logger=self.logger)
+        self.park_limit = 100
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "framed_peers":
+                    self.framed_peers = set((addr, str(port)) for addr, port in value)
+                    self.logger.debug('Framed peers set during '
+                                      '__init__ to: %s', self.framed_peers)
+                if key in ["send_window", "ack_timeout", "connect_timeout",
+                           "max_retransmits", "retry_backoff",
+                           "retry_backoff_max", "retry_jitter",
+                           "failure_threshold", "reset_timeout",
+                           "priorities", "default_class", "starvation_limit"]:
+                    self.sender_options[key] = value
+                    self.logger.debug('Sender option %s set during __init__ '
+                                      'to: %s', key, value)
+                if key == "park_limit":
+                    self.park_limit = int(value)
+                    self.logger.debug('Park limit set during __init__ '
+                                      'to: %s', self.park_limit)
+                if key == "dead_letter_size":
+                    self.dead_letters = DeadLetterQueue(
+                        logger=self.logger, max_size=value)
+                    self.logger.debug('Dead letter size set during __init__ '
+                                      'to: %s', value)
+        # Outgoing messages are handed to their sender in priority order too,
+        # so a command isn't stuck behind a burst headed for other peers
+        self.msg_out_queue = PriorityMessageQueue(
+            logger=self.logger,
+            **dict((key, value) for key, value in self.sender_options.items()
+                   if key in ["priorities", "default_class", "starvation_limit"]))
 
     # Incoming message handler ************************************************
     @asyncio.coroutine
     def handle_msg_in(self, reader, writer):
-        """ Callback used to send ACK messages back to acknowledge messages
-        received """
-        self.reader = reader
-        self.writer = writer
-        # Set up socket pair
+        """ Callback used to receive messages and send ACK messages back to
+        acknowledge them.  Framed peers open each connection with
+        FRAMED_PREAMBLE and may then send any number of newline terminated
+        messages on it.  Legacy peers send a single unframed message and wait
+        for its ACK, so anything else is handled as a one-shot legacy
+        connection """
+        addr = writer.get_extra_info('peername')
         self.logger.debug('Yielding to reader.read()')
-        self.data_in = yield from self.reader.read(200)
-        self.logger.debug('Decoding read data')
-        self.message = self.data_in.decode()
-        self.logger.debug('Extracting address from socket connection')
-        self.addr = self.writer.get_extra_info('peername')
-        self.logger.debug('Received %r from %r', self.message, self.addr)
-
-        # Coping incoming message to message buffer
-        self.logger.debug('Received message: %s', self.message)
-        self.msg_in_queue.put_nowait(self.message)
-        self.logger.debug('Resulting buffer length: %s',
-                          str(self.msg_in_queue.qsize()))
-
-        # Acknowledge receipt of message
-        self.logger.debug("ACK'ing message: %r", self.message)
-        self.logger.debug('Splitting message into constituent parts')
-        self.msg_seg = self.message.split(',')
-        self.logger.debug('Extracted msg sequence number: [%s]', self.msg_seg[0])
-        self.ack_to_send = self.msg_seg[0].encode()
-        self.logger.debug('Sending ACK: %s', self.ack_to_send)
-        self.writer.write(self.ack_to_send)
+        data = yield from reader.read(self.read_size)
+        if data[:1] != FRAMED_PREAMBLE:
+            yield from self.handle_legacy_msg(reader, writer, data, addr)
+            return
+
+        # Framed connections stay open until the peer closes them
+        framer = MessageFramer(logger=self.logger)
+        messages = framer.feed(data[1:])
+        while True:
+            for message in messages:
+                self.logger.debug('Received %r from %r', message, addr)
+                envelope = MessageEnvelope(message)
+                self.msg_in_queue.put_nowait(envelope)
+                self.logger.debug('Sending ACK: %s', envelope.ref)
+                writer.write(encode_frame(envelope.ref))
+            yield from writer.drain()
+            data = yield from reader.read(self.read_size)
+            if len(data) == 0:
+                break
+            messages = framer.feed(data)
+        self.logger.debug('Connection from %r closed by peer', addr)
+        writer.close()
+
+
+    @asyncio.coroutine
+    def handle_legacy_msg(self, reader, writer, data, addr):
+        """ Receives a single unframed message, ACKs it and closes the
+        connection.  An unframed message has no end marker, so reads are
+        joined until its six header fields have arrived.  A connection closed
+        before then is dropped, as its sender has given up on the ACK """
+        while data.count(b',') < 5 and 0 < len(data) <= MAX_FRAME_SIZE:
+            more = yield from reader.read(self.read_size)
+            if len(more) == 0:
+                break
+            data += more
+        envelope = MessageEnvelope(data.decode())
+        if envelope.has_header is not True:
+            if len(data) > 0:
+                self.logger.warning('Dropping incomplete message %r from %r',
+                                    envelope.raw, addr)
+            writer.close()
+            return
+        self.logger.debug('Received unframed %r from %r', envelope.raw, addr)
+        self.msg_in_queue.put_nowait(envelope)
+        self.logger.debug('Sending ACK: %s', envelope.ref)
+        writer.write(envelope.ref.encode())
         yield from writer.drain()
         self.logger.debug('Closing the socket after sending ACK')
-        self.writer.close()
+        writer.close()
 
 
     # Outgoing message handler ************************************************
     @asyncio.coroutine
     def handle_msg_out(self):
-        """ task to handle outgoing messages """
+        """ task to hand outgoing messages to the sender for their destination """
+        self.loop.call_later(self.pool_check_interval, self.pool_check_timer)
         while True:
-            self.sleep_time = 0.2
-            if self.msg_out_queue.qsize() > 0:
-                self.sleep_time = 0.05
-                self.logger.debug('Pulling next outgoing message from queue')
-                self.msg_to_send = self.msg_out_queue.get_nowait()
-                self.logger.debug('Preparing to send message: %s', self.msg_to_send)
-                self.logger.debug('Extracting msg destination address and port')
-                self.msg_seg_out = self.msg_to_send.split(',')
-                self.logger.debug('Opening outgoing connection to %s:%s',
-                                  self.msg_seg_out[1], self.msg_seg_out[2])
-                try:
-                    self.reader_out, self.writer_out = yield from asyncio.open_connection(
-                        self.msg_seg_out[1], int(self.msg_seg_out[2]), loop=self.loop)
-                    self.logger.debug('Sending message: %s', self.msg_to_send)
-                    self.writer_out.write(self.msg_to_send.encode())
-
-                    self.logger.debug('Waiting for ack')
-                    self.data_ack = yield from self.reader_out.read(200)
-                    self.ack = self.data_ack.decode()
-                    self.logger.debug('Received ACK: %r', self.ack)
-                    self.logger.debug('Closing socket')
-                    self.writer_out.close()
-                except Exception:
-                    self.logger.warning('Could not open socket connection to '
-                                        'target')
-            # Yield to other tasks for a while
-            yield from asyncio.sleep(self.sleep_time)
+            # Sleep until the next outgoing message is queued
+            self.msg_to_send = yield from self.msg_out_queue.get()
+            self.logger.debug('Extracting msg destination address and port')
+            self.msg_seg_out = self.msg_to_send.split(',')
+            if len(self.msg_seg_out) >= 3:
+                sender = self.get_sender(self.msg_seg_out[1], self.msg_seg_out[2])
+                if sender.breaker.state != CLOSED and \
+                   sender.queue.qsize() >= self.park_limit:
+                    # Peer is down and already has a full backlog parked
+                    sender.breaker.shed += 1
+                    self.dead_letters.add(
+                        sender.addr, sender.port, self.msg_to_send, 0,
+                        'circuit %s' % sender.breaker.state)
+                else:
+                    sender.queue.put_nowait(self.msg_to_send)
+            else:
+                self.logger.warning('Dropping outgoing message with no '
+                                    'destination: %s', self.msg_to_send)
+
+
+    def pool_check_timer(self):
+        """ Periodically close pooled connections that have been idle too long
+        and log connection statistics """
+        self.loop.call_later(self.pool_check_interval, self.pool_check_timer)
+        self.pool.evict_idle()
+        self.logger.info('Outgoing connection pool stats: %s', self.pool.stats)
+        for dest, sender in self.senders.items():
+            self.logger.info('Sender stats for %s:%s: %s',
+                             dest[0], dest[1], sender.stats)
+        self.logger.info('Dead letter stats: %s', self.dead_letters.stats)
+
+
+    def get_sender(self, addr, port):
+        """ Returns the sender for a destination, creating and starting one the
+        first time that destination is seen """
+        dest = (addr, str(port))
+        if dest not in self.senders:
+            self.logger.debug('Creating sender for %s:%s', addr, port)
+            self.senders[dest] = PeerSender(
+                self.loop, addr, port, self.pool, logger=self.logger,
+                framed=dest in self.framed_peers,
+                dead_letters=self.dead_letters, **self.sender_options)
+        self.senders[dest].start()
+        return self.senders[dest]
+
+
+    def get_breaker(self, addr, port):
+        """ Returns the circuit breaker for a destination """
+        return self.get_sender(addr, port).breaker
+
 
+    def replay_dead_letters(self, addr=None, port=None):
+        """ Re-queues dead-lettered messages for another delivery attempt,
+        optionally only those for one destination.  Returns the number of
+        messages re-queued """
+        return self.dead_letters.replay(self.msg_out_queue, addr, port)
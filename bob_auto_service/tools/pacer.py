@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+""" pacer.py:
+    Releases batches of periodic messages evenly across their interval
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import collections
+import logging
+import random
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Token Bucket Class Def ******************************************************
+class TokenBucket(object):
+    """ Holds up to `capacity` tokens, refilled at `rate` tokens a second.
+    Times are passed in, so the bucket runs on whatever clock its owner
+    uses """
+    def __init__(self, rate, capacity, now):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now):
+        """ Removes a token and returns True, or returns False if there
+        isn't a whole one yet """
+        self.refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now):
+        """ Seconds until the next whole token """
+        self.refill(now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+# Paced Emitter Class Def *****************************************************
+class PacedEmitter(object):
+    """ Passes the items of each batch to emit() spread over `period`
+    seconds, instead of all at once.
+
+    The pace is set by a token bucket refilled at the batch size divided by
+    the period, so a batch drains just inside its period whatever its size.
+    `burst` is how many items may go out back to back, and `jitter` moves
+    each wait by up to that fraction either way, so emitters started
+    together drift apart.  If a batch is submitted before the last one has
+    drained, the remainder of the last one is sent first and the pace is
+    raised to clear both in the new period """
+    def __init__(self, loop, emit, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.emit = emit
+        self.name = 'Paced emitter'
+        self.burst = 1
+        self.jitter = 0.0
+        self.backlog = collections.deque()
+        self.bucket = None
+        self.handle = None
+        self.batches = 0
+        self.emitted = 0
+        self.max_backlog = 0
+        self.overruns = 0
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "name":
+                    self.name = value
+                    self.logger.debug('Name set during __init__ '
+                                      'to: %s', self.name)
+                if key == "burst":
+                    self.burst = max(1, int(value))
+                    self.logger.debug('Burst set during __init__ '
+                                      'to: %s', self.burst)
+                if key == "jitter":
+                    self.jitter = min(1.0, max(0.0, float(value)))
+                    self.logger.debug('Jitter set during __init__ '
+                                      'to: %s', self.jitter)
+
+    def submit(self, items, period):
+        """ Queues a batch of items to be emitted over the next period
+        seconds.  With no period they are all emitted now """
+        if len(self.backlog) > 0:
+            self.overruns += 1
+            self.logger.debug('%s: %s items left from the last batch',
+                              self.name, len(self.backlog))
+        self.backlog.extend(items)
+        self.batches += 1
+        self.max_backlog = max(self.max_backlog, len(self.backlog))
+        if len(self.backlog) == 0:
+            return
+        if period <= 0.0:
+            self.flush()
+            return
+        # One token per item, refilled so the last item goes out within the
+        # period.  The bucket starts full, so the first burst go straight
+        # out, and is kept between batches so an overrun gets no extra burst
+        rate = max(len(self.backlog) - self.burst, 1) / float(period)
+        now = self.loop.time()
+        if self.bucket is None:
+            self.bucket = TokenBucket(rate, self.burst, now)
+        else:
+            self.bucket.refill(now)
+            self.bucket.rate = rate
+        self.cancel()
+        self.drain()
+
+    def drain(self, due=False):
+        """ Emits the items there are tokens for and arranges to be called
+        again when the next token is due """
+        self.handle = None
+        now = self.loop.time()
+        if due is True:
+            # Jitter may wake us a little early; the token counts as due so
+            # the early and late waits even out
+            self.bucket.refill(now)
+            self.bucket.tokens = max(self.bucket.tokens, 1.0)
+        while len(self.backlog) > 0 and self.bucket.take(now):
+            self.send(self.backlog.popleft())
+        if len(self.backlog) > 0:
+            delay = self.bucket.wait_time(now)
+            if self.jitter > 0.0:
+                delay *= 1.0 + random.uniform(-self.jitter, self.jitter)
+            self.handle = self.loop.call_at(now + delay, self.drain, True)
+
+    def send(self, item):
+        self.emitted += 1
+        try:
+            self.emit(item)
+        except Exception:
+            self.logger.exception('%s failed to emit: [%s]', self.name, item)
+
+    def flush(self):
+        """ Emits everything left in the backlog now """
+        self.cancel()
+        while len(self.backlog) > 0:
+            self.send(self.backlog.popleft())
+
+    def cancel(self):
+        """ Stops the pending drain call.  The backlog is kept """
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    @property
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'emitted': self.emitted,
+            'backlog': len(self.backlog),
+            'max_backlog': self.max_backlog,
+            'overruns': self.overruns}
@@ -0,0 +1,412 @@
+#!/usr/bin/python3
+""" peer_sender.py:
+    Per-destination outgoing message worker
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import collections
+import logging
+import os
+import random
+import sys
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.tools.circuit_breaker import CircuitBreaker
+from bob_auto_service.tools.framing import encode_frame
+from bob_auto_service.tools.framing import FRAMED_PREAMBLE
+from bob_auto_service.tools.priority_queue import PriorityMessageQueue
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Peer Sender Class Def *******************************************************
+class PeerSender(object):
+    """ Sends queued messages to a single destination service, highest
+    priority class first and in the order they were queued within a class.
+    Each destination gets its own sender so a slow or unreachable peer only
+    delays its own traffic.
+
+    Framed peers are sent up to `window` messages before their ACKs arrive.
+    ACKs are matched back to messages by the ref field the peer echoes, and
+    messages not ACK'd within `ack_timeout` seconds are retransmitted with a
+    jittered exponential backoff, so delivery is at-least-once.  Once every
+    message has been ACK'd and nothing is queued, the connection is returned
+    to the pool, so the next burst reuses it and idle eviction applies.  Messages
+    that exhaust their retries are moved to the dead-letter store.
+
+    Each sender has a circuit breaker.  While it is open, queued messages
+    are parked rather than spending connect and ACK timeouts on a peer that
+    is down """
+    def __init__(self, loop, addr, port, pool, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.addr = addr
+        self.port = str(port)
+        self.pool = pool
+        self.queue = None
+        self.task = None
+        self.ack_task = None
+        self.watch_task = None
+        self.sent = 0
+        self.failed = 0
+        self.retransmits = 0
+        self.max_in_flight = 0
+        self.releases = 0
+        self.in_flight = collections.OrderedDict()
+        self.ack_event = asyncio.Event(loop=self.loop)
+        self.pending_event = asyncio.Event(loop=self.loop)
+        self.conn_lock = asyncio.Lock(loop=self.loop)
+        self.msg_to_send = None
+        self.reader_out = None
+        self.writer_out = None
+        self.data_ack = bytes()
+        self.ack = str()
+        self.framed = True
+        self.window = 8
+        self.ack_timeout = 5.0
+        self.connect_timeout = 5.0
+        self.max_retransmits = 3
+        self.retry_backoff = 1.0
+        self.retry_backoff_max = 60.0
+        self.retry_jitter = 0.5
+        self.dead_letters = None
+        self.breaker_options = {}
+        self.queue_options = {}
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "framed":
+                    self.framed = value
+                    self.logger.debug('Framing set during __init__ '
+                                      'to: %s', self.framed)
+                if key == "send_window":
+                    self.window = max(1, int(value))
+                    self.logger.debug('Send window set during __init__ '
+                                      'to: %s', self.window)
+                if key == "ack_timeout":
+                    self.ack_timeout = float(value)
+                    self.logger.debug('ACK timeout set during __init__ '
+                                      'to: %s', self.ack_timeout)
+                if key == "connect_timeout":
+                    self.connect_timeout = float(value)
+                    self.logger.debug('Connect timeout set during __init__ '
+                                      'to: %s', self.connect_timeout)
+                if key == "max_retransmits":
+                    self.max_retransmits = int(value)
+                    self.logger.debug('Max retransmits set during __init__ '
+                                      'to: %s', self.max_retransmits)
+                if key == "retry_backoff":
+                    self.retry_backoff = float(value)
+                    self.logger.debug('Retry backoff set during __init__ '
+                                      'to: %s', self.retry_backoff)
+                if key == "retry_backoff_max":
+                    self.retry_backoff_max = float(value)
+                    self.logger.debug('Retry backoff max set during __init__ '
+                                      'to: %s', self.retry_backoff_max)
+                if key == "retry_jitter":
+                    self.retry_jitter = min(1.0, max(0.0, float(value)))
+                    self.logger.debug('Retry jitter set during __init__ '
+                                      'to: %s', self.retry_jitter)
+                if key == "dead_letters":
+                    self.dead_letters = value
+                    self.logger.debug('Dead letter store set during __init__ '
+                                      'to: %s', self.dead_letters)
+                if key in ["priorities", "default_class", "starvation_limit"]:
+                    self.queue_options[key] = value
+                    self.logger.debug('Queue option %s set during __init__ '
+                                      'to: %s', key, value)
+                if key in ["failure_threshold", "reset_timeout"]:
+                    self.breaker_options[key] = value
+                    self.logger.debug('Circuit breaker option %s set during '
+                                      '__init__ to: %s', key, value)
+        self.queue = PriorityMessageQueue(
+            loop=self.loop, logger=self.logger, **self.queue_options)
+        self.breaker = CircuitBreaker(
+            self.loop, self.addr, self.port, logger=self.logger,
+            **self.breaker_options)
+
+    def start(self):
+        """ Schedules the sender tasks for execution """
+        if self.task is None or self.task.done():
+            self.logger.debug('Starting sender task for %s:%s', self.addr, self.port)
+            self.task = asyncio.ensure_future(self.run(), loop=self.loop)
+        if self.framed is True and (self.watch_task is None or self.watch_task.done()):
+            self.watch_task = asyncio.ensure_future(self.watch_acks(), loop=self.loop)
+        return self.task
+
+    def stop(self):
+        """ Cancels the sender tasks and closes its connection """
+        for task in [self.task, self.watch_task, self.ack_task]:
+            if task is not None:
+                task.cancel()
+        if self.writer_out is not None:
+            self.pool.discard(self.writer_out)
+            self.writer_out = None
+
+    # Sender task *************************************************************
+    @asyncio.coroutine
+    def run(self):
+        """ task to send messages queued for this destination """
+        while True:
+            self.msg_to_send = yield from self.queue.get()
+            self.logger.debug('Preparing to send message: %s', self.msg_to_send)
+            if self.framed is not True:
+                yield from self.send_with_retry(self.msg_to_send)
+                continue
+
+            # Hold messages while the peer is known to be down
+            yield from self.breaker.wait_allowed()
+
+            # Wait for room in the window.  A ref still in flight from before
+            # the ref counter rolled over must be ACK'd first so the ACK can
+            # be matched unambiguously
+            ref = self.msg_to_send.split(',', 1)[0]
+            while len(self.in_flight) >= self.window or ref in self.in_flight:
+                self.ack_event.clear()
+                yield from self.ack_event.wait()
+            # In-flight entries are [msg, deadline, attempts, parked].  A
+            # parked entry's deadline is a wake-up time rather than an ACK
+            # timeout, so reaching it doesn't count as a failure
+            self.in_flight[ref] = [
+                self.msg_to_send, self.loop.time() + self.ack_timeout, 0, False]
+            self.max_in_flight = max(self.max_in_flight, len(self.in_flight))
+            self.pending_event.set()
+            try:
+                yield from self.transmit(self.msg_to_send)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Left in flight, so it is retransmitted once its ACK times out
+                self.logger.debug('Could not send message to %s:%s, will retry: '
+                                  '%s', self.addr, self.port, self.msg_to_send)
+                self.send_failed(ref, 'connect failed')
+
+    # Framed connection handling **********************************************
+    @asyncio.coroutine
+    def connect(self):
+        """ Returns the writer for this destination's connection, opening a
+        new one and starting its ACK reader if needed """
+        with (yield from self.conn_lock):
+            if self.writer_out is None or \
+               self.pool.is_healthy(self.reader_out, self.writer_out) is False:
+                if self.writer_out is not None:
+                    self.pool.discard(self.writer_out)
+                    self.writer_out = None
+                self.reader_out, self.writer_out = yield from asyncio.wait_for(
+                    self.pool.acquire(self.addr, self.port,
+                                      greeting=FRAMED_PREAMBLE),
+                    self.connect_timeout, loop=self.loop)
+                self.ack_task = asyncio.ensure_future(
+                    self.read_acks(self.reader_out, self.writer_out), loop=self.loop)
+            return self.writer_out
+
+    @asyncio.coroutine
+    def transmit(self, msg):
+        """ Writes a single framed message to the peer """
+        writer = yield from self.connect()
+        self.logger.debug('Sending message: %s', msg)
+        writer.write(encode_frame(msg))
+        yield from writer.drain()
+
+    @asyncio.coroutine
+    def read_acks(self, reader, writer):
+        """ task to match ACKs read from a connection to in-flight messages """
+        while True:
+            try:
+                self.data_ack = yield from reader.readline()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.data_ack = bytes()
+            if len(self.data_ack) == 0:
+                break
+            self.ack = self.data_ack.decode().strip()
+            if self.in_flight.pop(self.ack, None) is not None:
+                self.logger.debug('Received ACK: %r', self.ack)
+                self.sent += 1
+                self.ack_event.set()
+                if self.breaker.record_success() is True:
+                    # Peer is back, so stop holding parked messages
+                    for entry in self.in_flight.values():
+                        if entry[3] is True:
+                            entry[1] = self.loop.time()
+                    self.pending_event.set()
+            else:
+                self.logger.debug('Received ACK for unknown ref: %r', self.ack)
+            if len(self.in_flight) == 0 and self.queue.qsize() == 0 and \
+               self.writer_out is writer:
+                # Burst is over, so hand the connection back to the pool
+                self.writer_out = None
+                self.reader_out = None
+                self.releases += 1
+                self.pool.release(self.addr, self.port, reader, writer)
+                return
+
+        # Connection lost.  Messages sent only once are retransmitted
+        # immediately on a new connection; retries keep their backoff
+        self.logger.debug('Connection to %s:%s lost with %s message(s) in flight',
+                          self.addr, self.port, len(self.in_flight))
+        if self.writer_out is writer:
+            self.writer_out = None
+            self.reader_out = None
+        self.pool.discard(writer)
+        if len(self.in_flight) > 0:
+            self.breaker.record_failure('connection lost')
+        now = self.loop.time()
+        for entry in self.in_flight.values():
+            if entry[2] == 0:
+                entry[1] = min(entry[1], now)
+                entry[3] = True
+        self.pending_event.set()
+
+    @asyncio.coroutine
+    def watch_acks(self):
+        """ task to retransmit in-flight messages whose ACK has timed out """
+        while True:
+            self.pending_event.clear()
+            delay = None
+            if len(self.in_flight) > 0:
+                ref, entry = min(self.in_flight.items(), key=lambda item: item[1][1])
+                delay = entry[1] - self.loop.time()
+                if delay <= 0:
+                    yield from self.retransmit(ref, entry)
+                    continue
+            try:
+                yield from asyncio.wait_for(
+                    self.pending_event.wait(), delay, loop=self.loop)
+            except asyncio.TimeoutError:
+                pass
+
+    def backoff(self, attempt):
+        """ Returns the jittered exponential delay before retry `attempt` """
+        delay = min(self.retry_backoff_max, self.retry_backoff * (2 ** (attempt - 1)))
+        return delay * random.uniform(1.0 - self.retry_jitter, 1.0 + self.retry_jitter)
+
+    def send_failed(self, ref, reason):
+        """ Records a failed write.  The message stays in flight but is
+        parked so its timeout isn't counted as a second failure """
+        self.breaker.record_failure(reason)
+        entry = self.in_flight.get(ref)
+        if entry is not None:
+            entry[3] = True
+
+    def dead_letter(self, msg, attempts, reason):
+        """ Gives up on a message, moving it to the dead-letter store """
+        self.failed += 1
+        if self.dead_letters is not None:
+            self.dead_letters.add(self.addr, self.port, msg, attempts, reason)
+        else:
+            self.logger.warning('Could not send message to %s:%s after %s '
+                                'attempt(s) (%s): %s',
+                                self.addr, self.port, attempts, reason, msg)
+
+    @asyncio.coroutine
+    def retransmit(self, ref, entry):
+        """ Re-sends an in-flight message, giving up after max_retransmits.
+        Messages are held without using up a retry while the circuit is open """
+        if entry[3] is False:
+            self.breaker.record_failure('no ACK')
+        if entry[2] >= self.max_retransmits:
+            del self.in_flight[ref]
+            self.ack_event.set()
+            self.dead_letter(entry[0], entry[2] + 1, 'no ACK')
+            return
+        if self.breaker.allow() is False:
+            entry[1] = self.loop.time() + self.breaker.retry_in()
+            entry[3] = True
+            return
+        entry[3] = False
+        entry[2] += 1
+        entry[1] = self.loop.time() + self.ack_timeout + self.backoff(entry[2])
+        self.retransmits += 1
+        self.logger.debug('Retransmitting message to %s:%s: %s',
+                          self.addr, self.port, entry[0])
+        try:
+            yield from self.transmit(entry[0])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.logger.debug('Retransmit to %s:%s failed', self.addr, self.port)
+            self.send_failed(ref, 'connect failed')
+
+    # Legacy (unframed) send **************************************************
+    @asyncio.coroutine
+    def send_with_retry(self, msg):
+        """ Sends an unframed message, retrying with backoff and moving it to
+        the dead-letter store once max_retransmits retries have failed """
+        for attempt in range(self.max_retransmits + 1):
+            if attempt > 0:
+                self.retransmits += 1
+                yield from asyncio.sleep(self.backoff(attempt), loop=self.loop)
+            yield from self.breaker.wait_allowed()
+            try:
+                yield from self.send_msg(msg)
+                self.sent += 1
+                self.breaker.record_success()
+                return
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                reason = 'timed out'
+            except Exception as error:
+                reason = '%s: %s' % (type(error).__name__, error)
+            self.breaker.record_failure(reason)
+            self.logger.debug('Send attempt %s to %s:%s failed (%s)',
+                              attempt + 1, self.addr, self.port, reason)
+        self.dead_letter(msg, self.max_retransmits + 1, reason)
+
+    @asyncio.coroutine
+    def send_msg(self, msg):
+        """ Sends a single unframed message over a pooled connection and waits
+        for the ACK.  A pooled connection the peer has since closed returns an
+        empty ACK, in which case the message is re-sent once on a fresh
+        connection """
+        for attempt in range(2):
+            self.reader_out, self.writer_out = yield from asyncio.wait_for(
+                self.pool.acquire(self.addr, self.port),
+                self.connect_timeout, loop=self.loop)
+            try:
+                self.logger.debug('Sending message: %s', msg)
+                self.writer_out.write(msg.encode())
+                self.logger.debug('Waiting for ack')
+                self.data_ack = yield from asyncio.wait_for(
+                    self.reader_out.read(200), self.ack_timeout, loop=self.loop)
+            except Exception:
+                self.pool.discard(self.writer_out)
+                raise
+            if len(self.data_ack) > 0:
+                self.ack = self.data_ack.decode().rstrip()
+                self.logger.debug('Received ACK: %r', self.ack)
+                self.pool.release(self.addr, self.port, self.reader_out, self.writer_out)
+                return self.ack
+            self.logger.debug('Pooled connection to %s:%s was closed by peer, '
+                              'reconnecting', self.addr, self.port)
+            self.pool.discard(self.writer_out)
+        raise ConnectionError('No ACK received from %s:%s' % (self.addr, self.port))
+
+    # Sender statistics *******************************************************
+    @property
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'in_flight': len(self.in_flight),
+            'max_in_flight': self.max_in_flight,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retransmits': self.retransmits,
+            'connections': dict(
+                self.pool.destination_stats(self.addr, self.port),
+                released=self.releases),
+            'circuit': self.breaker.state}
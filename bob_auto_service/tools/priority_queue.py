@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+""" priority_queue.py:
+    Outgoing message queue that serves device commands ahead of telemetry
+    and heartbeats
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import collections
+import logging
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Queue lanes *****************************************************************
+class _Lanes(object):
+    """ One FIFO per priority class.  Stands in for asyncio.Queue's _queue so
+    the base class' qsize(), empty() and repr keep working """
+    def __init__(self, count):
+        self.lanes = [collections.deque() for i in range(count)]
+
+    def __len__(self):
+        return sum(len(lane) for lane in self.lanes)
+
+    def __iter__(self):
+        for lane in self.lanes:
+            for item in lane:
+                yield item
+
+
+# Priority Message Queue Class Def ********************************************
+class PriorityMessageQueue(asyncio.Queue):
+    """ asyncio.Queue of outgoing message strings, served by priority class.
+
+    Messages are classed by their msg_type field using `priorities`, a dict
+    of msg_type -> class (0 is served first).  Types not listed use
+    `default_class`.  Messages within a class stay in FIFO order.  So that a
+    steady stream of high priority traffic can't starve the lower classes, a
+    waiting class is served anyway once `starvation_limit` messages have been
+    taken ahead of it """
+    def __init__(self, loop=None, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.priorities = {}
+        self.classes = 3
+        self.default_class = 1
+        self.starvation_limit = 8
+        self.promoted = 0
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "priorities":
+                    self.priorities = dict(
+                        (str(msg_type), int(msg_class))
+                        for msg_type, msg_class in value.items())
+                    self.logger.debug('Priorities set during __init__ '
+                                      'to: %s', self.priorities)
+                if key == "default_class":
+                    self.default_class = int(value)
+                    self.logger.debug('Default class set during __init__ '
+                                      'to: %s', self.default_class)
+                if key == "starvation_limit":
+                    self.starvation_limit = max(1, int(value))
+                    self.logger.debug('Starvation limit set during __init__ '
+                                      'to: %s', self.starvation_limit)
+        self.classes = max(
+            [self.classes, self.default_class + 1] +
+            [msg_class + 1 for msg_class in self.priorities.values()])
+        self.skipped = [0] * self.classes
+        super(PriorityMessageQueue, self).__init__(loop=loop)
+
+    def classify(self, msg):
+        """ Returns the priority class of a message string """
+        fields = msg.split(',', 6)
+        if len(fields) < 6:
+            return self.default_class
+        return self.priorities.get(fields[5], self.default_class)
+
+    def _init(self, maxsize):
+        self._queue = _Lanes(self.classes)
+
+    def _put(self, item):
+        self._queue.lanes[self.classify(item)].append(item)
+
+    def _get(self):
+        lanes = self._queue.lanes
+        serve = None
+        for i, lane in enumerate(lanes):
+            if len(lane) == 0:
+                continue
+            if serve is None:
+                serve = i
+            elif self.skipped[i] >= self.starvation_limit:
+                # Waited long enough, serve it ahead of the higher classes
+                self.skipped[serve] += 1
+                serve = i
+                self.promoted += 1
+                break
+            else:
+                self.skipped[i] += 1
+        self.skipped[serve] = 0
+        return lanes[serve].popleft()
+
+    @property
+    def stats(self):
+        return {
+            'queued': [len(lane) for lane in self._queue.lanes],
+            'promoted': self.promoted}
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+""" rule_engine.py:
+    Device rules evaluated in the service rather than by the schedule service
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import datetime
+import logging
+import time
+from bob_auto_service.tools.dst import USdst
+from bob_auto_service.tools.sun import Sun
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+DUSK_TO_DAWN = 'dusk to dawn'
+
+
+def rule_name(rule):
+    """ Returns a device rule in the form used by the rule engine, so
+    'dusk_to_dawn' and 'Dusk to Dawn' both match 'dusk to dawn' """
+    return str(rule).strip().lower().replace('_', ' ')
+
+
+# Rule Engine Class Def *******************************************************
+class RuleEngine(object):
+    """ Works out the command for each rule it knows from the local clock,
+    and calls on_transition(rule, dev_cmd) when a rule's command changes.
+
+    Dusk to dawn is on from sunset to the next sunrise.  Sunrise and sunset
+    are worked out once a day by Sun for the configured location, at the
+    standard `utc_offset` plus an hour while US daylight saving time is on.
+    A loop timer is armed for the next transition, checking again at least
+    every `recheck` seconds so a change to the system clock is caught up
+    with """
+    def __init__(self, loop, latitude, longitude, on_transition=None,
+                 logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.on_transition = on_transition
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.utc_offset = -time.timezone / 3600.0
+        self.recheck = 3600.0
+        self.evaluators = {DUSK_TO_DAWN: self.dusk_to_dawn}
+        self.commands = {}
+        self.next_transition = None
+        self.handle = None
+        self.sun_times = {}
+        self.evaluations = 0
+        self.transitions = 0
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "utc_offset":
+                    if value is not None:
+                        self.utc_offset = float(value)
+                        self.logger.debug('UTC offset set during __init__ '
+                                          'to: %s', self.utc_offset)
+                if key == "recheck":
+                    self.recheck = float(value)
+                    self.logger.debug('Recheck set during __init__ '
+                                      'to: %s', self.recheck)
+        self.sun = Sun(self.latitude, self.longitude, self.utc_offset,
+                       logger=self.logger)
+        self.dst = USdst(logger=self.logger)
+
+    @property
+    def rules(self):
+        """ The device rules this engine evaluates """
+        return tuple(self.evaluators)
+
+    def handles(self, rule):
+        return rule_name(rule) in self.evaluators
+
+    def sunrise_sunset(self, day):
+        """ Returns the local sunrise and sunset for a date, worked out once
+        and kept until the day is past """
+        if day not in self.sun_times:
+            offset = self.utc_offset
+            if self.dst.is_active(datetime=datetime.datetime.combine(
+                    day, datetime.time(12, 0))) is True:
+                offset += 1
+            self.sun_times[day] = self.sun.rise_and_set(day, offset)
+            for old in [d for d in self.sun_times if d < day - datetime.timedelta(days=1)]:
+                del self.sun_times[old]
+            self.logger.debug('Sunrise and sunset for %s: %s', day,
+                              self.sun_times[day])
+        return self.sun_times[day]
+
+    def dusk_to_dawn(self, now):
+        """ Returns the dusk to dawn command at now and when it next changes """
+        sunrise, sunset = self.sunrise_sunset(now.date())
+        if now < sunrise:
+            return 'on', sunrise
+        if now < sunset:
+            return 'off', sunset
+        return 'on', self.sunrise_sunset(
+            now.date() + datetime.timedelta(days=1))[0]
+
+    def evaluate(self, rule, now=None):
+        """ Returns the command for a rule at now, or None if the engine
+        doesn't know the rule """
+        evaluator = self.evaluators.get(rule_name(rule))
+        if evaluator is None:
+            return None
+        return evaluator(now or datetime.datetime.now())[0]
+
+    def start(self):
+        """ Sets every rule's command and arms the timer for the first
+        transition """
+        self.run()
+
+    def stop(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def run(self, now=None):
+        """ Re-evaluates every rule at now, or the current time, reports the
+        ones whose command changed and re-arms the timer """
+        self.stop()
+        now = now or datetime.datetime.now()
+        self.evaluations += 1
+        self.next_transition = None
+        for rule, evaluator in self.evaluators.items():
+            dev_cmd, next_transition = evaluator(now)
+            if self.next_transition is None or next_transition < self.next_transition:
+                self.next_transition = next_transition
+            if self.commands.get(rule) == dev_cmd:
+                continue
+            self.commands[rule] = dev_cmd
+            self.transitions += 1
+            self.logger.info('%s rule is now %s, until %s', rule, dev_cmd,
+                             next_transition)
+            if self.on_transition is not None:
+                try:
+                    self.on_transition(rule, dev_cmd)
+                except Exception:
+                    self.logger.exception('Applying %s rule failed', rule)
+        if self.next_transition is not None:
+            delay = (self.next_transition - now).total_seconds()
+            self.handle = self.loop.call_at(
+                self.loop.time() + max(0.0, min(delay, self.recheck)), self.run)
+
+    @property
+    def stats(self):
+        return {
+            'commands': dict(self.commands),
+            'next_transition': str(self.next_transition),
+            'evaluations': self.evaluations,
+            'transitions': self.transitions}
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+""" schedule_cache.py:
+    Cache of each device's scheduled command and its next transition time
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import datetime
+import logging
+import time
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Schedule Entry Class Def ****************************************************
+class ScheduleEntry(object):
+    """ A device's last scheduled command, when it was checked and when it
+    next changes, both as loop times """
+    __slots__ = ('dev_cmd', 'next_transition', 'checked', 'due', 'handle')
+
+    def __init__(self, dev_cmd, next_transition, checked):
+        self.dev_cmd = dev_cmd
+        self.next_transition = next_transition
+        self.checked = checked
+        self.due = None
+        self.handle = None
+
+
+# Schedule Cache Class Def ****************************************************
+class ScheduleCache(object):
+    """ Remembers the schedule service's answer for each device so it isn't
+    asked again every poll.
+
+    A GDSS-ACK that carries the time of the device's next transition arms a
+    timer for that second, which calls on_due(dev_name) so the device is
+    re-queried as its command changes.  Until then, or until `max_age`
+    seconds have passed, polls skip the device.  Answers without a next
+    transition, or with one already past, are not cached, so those devices
+    are polled as before """
+    def __init__(self, loop, on_due=None, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.on_due = on_due
+        self.entries = {}
+        self.max_age = 3600.0
+        self.hits = 0
+        self.misses = 0
+        self.transitions = 0
+        self.invalidations = 0
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "max_age":
+                    self.max_age = float(value)
+                    self.logger.debug('Max age set during __init__ '
+                                      'to: %s', self.max_age)
+
+    def loop_time_of(self, next_transition):
+        """ Returns the loop time of a local 'YYYY-MM-DD HH:MM:SS' time, or
+        None if it isn't one or has already passed """
+        try:
+            wall = datetime.datetime.strptime(
+                next_transition[:19], '%Y-%m-%d %H:%M:%S').timestamp()
+        except (TypeError, ValueError):
+            return None
+        delay = wall - time.time()
+        if delay <= 0.0:
+            return None
+        return self.loop.time() + delay
+
+    def update(self, dev_name, dev_cmd, next_transition=None):
+        """ Records the schedule service's answer for a device """
+        dev_name = dev_name.lower()
+        self.cancel_timer(dev_name)
+        entry = ScheduleEntry(dev_cmd, next_transition, self.loop.time())
+        entry.due = self.loop_time_of(next_transition)
+        self.entries[dev_name] = entry
+        if entry.due is not None and self.on_due is not None:
+            entry.handle = self.loop.call_at(entry.due, self.fire, dev_name)
+            self.logger.debug('Schedule for %s cached, next transition at %s',
+                              dev_name, next_transition)
+
+    def fire(self, dev_name):
+        """ Called at a device's next transition """
+        entry = self.entries.get(dev_name)
+        if entry is not None:
+            entry.handle = None
+            entry.due = None
+        self.transitions += 1
+        self.logger.debug('Scheduled transition due for %s', dev_name)
+        try:
+            self.on_due(dev_name)
+        except Exception:
+            self.logger.exception('Scheduled transition for %s failed', dev_name)
+
+    def needs_query(self, dev_name):
+        """ Returns True if the device's schedule should be asked for """
+        entry = self.entries.get(dev_name.lower())
+        if entry is None or entry.due is None or \
+           self.loop.time() - entry.checked >= self.max_age:
+            self.misses += 1
+            return True
+        self.hits += 1
+        return False
+
+    def cancel_timer(self, dev_name):
+        entry = self.entries.get(dev_name)
+        if entry is not None and entry.handle is not None:
+            entry.handle.cancel()
+            entry.handle = None
+
+    def invalidate(self, dev_name=None):
+        """ Forgets one device's schedule, or every device's """
+        names = list(self.entries) if dev_name is None else [dev_name.lower()]
+        for name in names:
+            self.cancel_timer(name)
+            self.entries.pop(name, None)
+        self.invalidations += 1
+        self.logger.debug('Schedule cache invalidated for: %s',
+                          'all devices' if dev_name is None else dev_name)
+
+    @property
+    def stats(self):
+        return {
+            'cached': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'transitions': self.transitions,
+            'invalidations': self.invalidations}
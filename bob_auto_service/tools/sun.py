@@ -167,12 +167,12 @@ class Sun(object):
             self._sunrise_UTC = datetime.time(
                 self._sunrise_UTC_h, self._sunrise_UTC_m, self._sunrise_UTC_s)
             self._sunrise_adj = datetime.datetime.combine(
-                datetime.date.today(), self._sunrise_UTC) + self._offset
+                self._when.date(), self._sunrise_UTC) + self._offset
         elif self._sunrise_UTC_h >= 24:
             self._sunrise_UTC = datetime.time(
                 (self._sunrise_UTC_h-24), self._sunrise_UTC_m, self._sunrise_UTC_s)
             self._sunrise_adj = datetime.datetime.combine(
-                (datetime.date.today()+ datetime.timedelta(days=1)),
+                (self._when.date()+ datetime.timedelta(days=1)),
                 self._sunrise_UTC) + self._offset
 
         # Convert to UTC then adjust based on time zone offset (solarnoon)
@@ -182,12 +182,12 @@ class Sun(object):
             self._solarnoon_UTC = datetime.time(
                 self._solarnoon_UTC_h, self._solarnoon_UTC_m, self._solarnoon_UTC_s)
             self._solarnoon_adj = datetime.datetime.combine(
-                datetime.date.today(), self._solarnoon_UTC) + self._offset
+                self._when.date(), self._solarnoon_UTC) + self._offset
         elif self._solarnoon_UTC_h >= 24:
             self._solarnoon_UTC = datetime.time(
                 (self._solarnoon_UTC_h-24), self._solarnoon_UTC_m, self._solarnoon_UTC_s)
             self._solarnoon_adj = datetime.datetime.combine(
-                (datetime.date.today() + datetime.timedelta(days=1)),
+                (self._when.date() + datetime.timedelta(days=1)),
                 self._solarnoon_UTC) + self._offset
 
         # Convert to UTC then adjust based on time zone offset (sunset)
@@ -197,12 +197,12 @@ class Sun(object):
             self._sunset_UTC = datetime.time(
                 self._sunset_UTC_h, self._sunset_UTC_m, self._sunset_UTC_s)
             self._sunset_adj = datetime.datetime.combine(
-                datetime.date.today(), self._sunset_UTC) + self._offset
+                self._when.date(), self._sunset_UTC) + self._offset
         elif self._sunset_UTC_h >= 24:
             self._sunset_UTC = datetime.time(
                 (self._sunset_UTC_h-24), self._sunset_UTC_m, self._sunset_UTC_s)
             self._sunset_adj = datetime.datetime.combine(
-                (datetime.date.today()+ datetime.timedelta(days=1)),
+                (self._when.date()+ datetime.timedelta(days=1)),
                 self._sunset_UTC) + self._offset
 
 
@@ -254,3 +254,13 @@ class Sun(object):
         if self.should_rerun(when) is True:
             self.calc(when)
         return self._sunset_adj
+
+
+    def rise_and_set(self, day, offset_hours=None):
+        """ Returns the sunrise and sunset times for the date fed via input
+        parameters, offset from UTC by offset_hours, or by the offset given
+        when the class was created if none is given """
+        if offset_hours is not None:
+            self._offset_hours = offset_hours
+        self.calc(day)
+        return self._sunrise_adj, self._sunset_adj
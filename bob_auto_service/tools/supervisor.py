@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+""" supervisor.py:
+    Long running service tasks that are restarted if they crash
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+STOPPED = 'stopped'
+RUNNING = 'running'
+RESTARTING = 'restarting'
+
+
+# Supervised Task Class Def ***************************************************
+class SupervisedTask(object):
+    """ Runs one piece of the service's work as its own task.
+
+    target is a coroutine function run with this task as its argument; it
+    loops on its own and calls record() after each piece of work.  If target
+    raises, the task is restarted after `restart_delay` seconds, doubling for
+    each crash in a row up to `restart_delay_max` """
+    def __init__(self, loop, name, target, logger=None, **kwargs):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.name = name
+        self.target = target
+        self.task = None
+        self.state = STOPPED
+        self.restart_delay = 1.0
+        self.restart_delay_max = 60.0
+        self.cycles = 0
+        self.busy = 0.0
+        self.max_busy = 0.0
+        self.crashes = 0
+        self.crashes_in_row = 0
+        self.restarts = 0
+        self.last_error = str()
+        # Process input variables if present
+        if kwargs is not None:
+            for key, value in kwargs.items():
+                if key == "restart_delay":
+                    self.restart_delay = float(value)
+                    self.logger.debug('Restart delay set during __init__ '
+                                      'to: %s', self.restart_delay)
+                if key == "restart_delay_max":
+                    self.restart_delay_max = float(value)
+                    self.logger.debug('Restart delay max set during __init__ '
+                                      'to: %s', self.restart_delay_max)
+
+    def start(self):
+        """ Schedules the task for execution """
+        if self.task is None or self.task.done():
+            self.logger.debug('Starting %s task', self.name)
+            self.task = asyncio.ensure_future(self.run(), loop=self.loop)
+        return self.task
+
+    def stop(self):
+        """ Cancels the task """
+        if self.task is not None:
+            self.task.cancel()
+        self.state = STOPPED
+
+    def record(self, started):
+        """ Counts a completed piece of work that began at loop time started """
+        elapsed = self.loop.time() - started
+        self.cycles += 1
+        self.busy += elapsed
+        self.max_busy = max(self.max_busy, elapsed)
+        self.crashes_in_row = 0
+
+    @asyncio.coroutine
+    def run(self):
+        """ task to run target, restarting it each time it crashes """
+        while True:
+            self.state = RUNNING
+            try:
+                yield from self.target(self)
+                self.logger.info('%s task finished', self.name)
+                self.state = STOPPED
+                return
+            except asyncio.CancelledError:
+                self.state = STOPPED
+                raise
+            except Exception as exc:
+                self.crashes += 1
+                self.crashes_in_row += 1
+                self.last_error = repr(exc)
+                delay = min(self.restart_delay_max,
+                            self.restart_delay * 2 ** (self.crashes_in_row - 1))
+                self.logger.exception('%s task crashed, restarting in %s '
+                                      'seconds', self.name, delay)
+            self.state = RESTARTING
+            yield from asyncio.sleep(delay, loop=self.loop)
+            self.restarts += 1
+
+    @property
+    def stats(self):
+        return {
+            'state': self.state,
+            'cycles': self.cycles,
+            'busy': round(self.busy, 3),
+            'max_busy': round(self.max_busy, 3),
+            'crashes': self.crashes,
+            'restarts': self.restarts,
+            'last_error': self.last_error}
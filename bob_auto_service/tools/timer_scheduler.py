@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+""" timer_scheduler.py:
+    Runs periodic jobs from a heap of due times on the event loop's clock
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+
+
+# Authorship Info *************************************************************
+__author__ = "Christopher Maue"
+__copyright__ = "Copyright 2017, The RPi-Home Project"
+__credits__ = ["Christopher Maue"]
+__license__ = "GPL"
+__version__ = "1.0.0"
+__maintainer__ = "Christopher Maue"
+__email__ = "csmaue@gmail.com"
+__status__ = "Development"
+
+
+# Timer Job Class Def *********************************************************
+class TimerJob(object):
+    """ A function called every `interval` seconds, each call moved by up to
+    +/- `jitter` seconds.  Jitter doesn't accumulate: each call is placed
+    around its own slot on the interval """
+    def __init__(self, name, interval, callback, jitter=0.0):
+        self.name = name
+        self.interval = float(interval)
+        self.callback = callback
+        self.jitter = float(jitter)
+        self.slot = 0.0
+        self.due = 0.0
+        self.cancelled = False
+        self.runs = 0
+        self.errors = 0
+        self.skipped = 0
+        self.busy = 0.0
+        self.max_busy = 0.0
+        self.last_error = str()
+
+    @property
+    def stats(self):
+        return {
+            'runs': self.runs,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'busy': round(self.busy, 3),
+            'max_busy': round(self.max_busy, 3),
+            'last_error': self.last_error}
+
+
+# Timer Scheduler Class Def ***************************************************
+class TimerScheduler(object):
+    """ Keeps periodic jobs in a heap ordered by due time, on loop.time() so
+    wall clock changes don't move them.  run() sleeps until the first job is
+    due, runs every job that is due, and goes back to sleep.  A job that
+    raises is logged and keeps its place in the schedule.  A job that falls
+    more than an interval behind skips the calls it missed rather than
+    running them back to back """
+    def __init__(self, loop, logger=None):
+        # Configure logger
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.loop = loop
+        self.jobs = []
+        self.heap = []
+        self.sequence = itertools.count()
+        self.runs = 0
+        self.wakeup = asyncio.Event(loop=self.loop)
+
+    def add(self, name, interval, callback, jitter=0.0, delay=None):
+        """ Schedules callback every interval seconds.  The first call is
+        after delay seconds, or after one interval if no delay is given """
+        job = TimerJob(name, interval, callback, jitter=jitter)
+        job.slot = self.loop.time() + (job.interval if delay is None else float(delay))
+        self.jobs.append(job)
+        self.push(job)
+        self.logger.debug('Scheduled %s every %s seconds (jitter %s), first '
+                          'due in %.3f seconds', name, job.interval, job.jitter,
+                          job.due - self.loop.time())
+        return job
+
+    def cancel(self, job):
+        """ Removes a job from the schedule """
+        job.cancelled = True
+        if job in self.jobs:
+            self.jobs.remove(job)
+
+    def push(self, job):
+        job.due = job.slot
+        if job.jitter > 0.0:
+            job.due += random.uniform(-job.jitter, job.jitter)
+        heapq.heappush(self.heap, (job.due, next(self.sequence), job))
+        # Wake run() if this job is now the first one due
+        if self.heap[0][2] is job:
+            self.wakeup.set()
+
+    def run_due(self):
+        """ Runs every job that is due.  Returns the seconds until the next
+        job is due, or None if no jobs are scheduled """
+        while len(self.heap) > 0:
+            due, sequence, job = self.heap[0]
+            if job.cancelled:
+                heapq.heappop(self.heap)
+                continue
+            now = self.loop.time()
+            if due > now:
+                return due - now
+            heapq.heappop(self.heap)
+            try:
+                job.callback()
+            except Exception as exc:
+                job.errors += 1
+                job.last_error = repr(exc)
+                self.logger.exception('%s job failed', job.name)
+            finished = self.loop.time()
+            job.runs += 1
+            self.runs += 1
+            job.busy += finished - now
+            job.max_busy = max(job.max_busy, finished - now)
+            job.slot += job.interval
+            if job.slot <= finished:
+                missed = int((finished - job.slot) // job.interval) + 1
+                job.skipped += missed
+                job.slot += missed * job.interval
+                self.logger.warning('%s job fell behind, skipping %s call(s)',
+                                    job.name, missed)
+            if job.cancelled is not True:
+                self.push(job)
+        return None
+
+    @asyncio.coroutine
+    def run(self, task=None):
+        """ task to run jobs as they come due.  When supervised, each pass
+        that ran jobs is recorded on the supervising task """
+        while True:
+            started = self.loop.time()
+            runs = self.runs
+            delay = self.run_due()
+            # Jobs added while jobs ran are already in the heap, so only
+            # wake for ones added from now on
+            self.wakeup.clear()
+            if task is not None and self.runs > runs:
+                task.record(started)
+            if delay is None:
+                yield from self.wakeup.wait()
+                continue
+            try:
+                yield from asyncio.wait_for(
+                    self.wakeup.wait(), delay, loop=self.loop)
+            except asyncio.TimeoutError:
+                pass
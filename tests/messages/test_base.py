@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+""" test_base.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.messages.base import Message
+from bob_auto_service.messages.base import device_id
+from bob_auto_service.messages.base import lower_text
+from bob_auto_service.tools.log_support import set_accessor_debug
+
+
+# Define test class ***********************************************************
+class ExampleMessage(Message):
+    """ Message type declared only through its fields table """
+    fields = [
+        ('dev_id', device_id),
+        ('dev_status', lower_text)
+    ]
+
+
+class TestMessageBase(unittest.TestCase):
+    """ unittests for the table-driven message base class """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestMessageBase, self).__init__(*args, **kwargs)
+
+
+    def test_fields(self):
+        """ test that the header fields come before the declared fields """
+        self.assertEqual(
+            ExampleMessage._fields,
+            ('ref', 'dest_addr', 'dest_port', 'source_addr', 'source_port',
+             'msg_type', 'dev_id', 'dev_status'))
+
+
+    def test_slots(self):
+        """ test that messages have no per-instance __dict__ """
+        message = ExampleMessage(logger=self.log)
+        self.assertFalse(hasattr(message, '__dict__'))
+        with self.assertRaises(AttributeError):
+            message.dev_name = 'fylt1'
+
+
+    def test_validation(self):
+        """ test that invalid values leave the field unchanged """
+        message = ExampleMessage(logger=self.log, dev_id=42, dev_status='ON',
+                                 bogus='ignored')
+        self.assertEqual(message.dev_id, '42')
+        self.assertEqual(message.dev_status, 'on')
+        message.dev_id = 'abc'
+        message.dest_addr = '300.1.1.1'
+        message.ref = 1000
+        self.assertEqual(message.dev_id, '42')
+        self.assertEqual(message.dest_addr, '')
+        self.assertEqual(message.ref, '')
+
+
+    def test_complete(self):
+        """ test encoding and decoding the complete message """
+        message = ExampleMessage(logger=self.log)
+        message.complete = '101,192.168.86.1,27041,192.168.86.2,27051,604,7,Off,extra'
+        self.assertEqual(message.complete,
+                         '101,192.168.86.1,27041,192.168.86.2,27051,604,7,off')
+        message.complete = '102,192.168.86.1,27041'
+        self.assertEqual(message.ref, '101')
+
+
+    def test_complete_fallback(self):
+        """ test that fields the compiled decoder can't match in one pass are
+        still validated one at a time """
+        message = ExampleMessage(logger=self.log)
+        message.complete = '101,192.168.86.1,27041,192.168.86.2,27051,604,7,Off'
+        message.complete = '102,300.1.1.1,27041,192.168.86.2,27051,604,+8,ON'
+        self.assertEqual(message.complete,
+                         '102,192.168.86.1,27041,192.168.86.2,27051,604,+8,on')
+
+
+
+    def test_accessor_debug(self):
+        """ test that accessor debug logging can be turned off, leaving
+        warnings for rejected addresses """
+        set_accessor_debug(False)
+        try:
+            with self.assertLogs(self.log, logging.DEBUG) as logs:
+                message = ExampleMessage(logger=self.log, dev_id=42)
+                message.complete = '101,192.168.86.1,27041,192.168.86.2,27051,604,7,Off'
+                message.complete = '102,300.1.1.1,27041,192.168.86.2,27051,604,+8,ON'
+                message.dev_status = 'On'
+                self.assertEqual(message.dev_status, 'on')
+            self.assertEqual(
+                [record.levelno for record in logs.records], [logging.WARNING])
+        finally:
+            set_accessor_debug(True)
+        with self.assertLogs(self.log, logging.DEBUG):
+            self.assertEqual(message.dev_status, 'on')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+""" test_envelope.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.messages.envelope import MessageEnvelope
+from bob_auto_service.messages.envelope import as_envelope
+from bob_auto_service.messages.set_device_state import SetDeviceStateMessage
+
+
+# Define test class ***********************************************************
+class TestMessageEnvelope(unittest.TestCase):
+    """ unittests for the inbound message envelope """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestMessageEnvelope, self).__init__(*args, **kwargs)
+        self.raw = '101,127.0.0.1,27001,192.168.86.2,27061,604,fylt1,' \
+                   '192.168.86.21,On,off,2017-10-04 07:01:03'
+
+
+    def test_header(self):
+        """ test that the header fields are split out on creation """
+        envelope = MessageEnvelope(self.raw)
+        self.assertTrue(envelope.has_header)
+        self.assertEqual(
+            (envelope.ref, envelope.dest_addr, envelope.dest_port,
+             envelope.source_addr, envelope.source_port, envelope.msg_type),
+            ('101', '127.0.0.1', '27001', '192.168.86.2', '27061', '604'))
+        self.assertEqual(str(envelope), self.raw)
+        self.assertIs(as_envelope(envelope), envelope)
+
+
+    def test_short_message(self):
+        """ test that a message without a full header can still be ACK'd """
+        envelope = MessageEnvelope('102,127.0.0.1,27001')
+        self.assertFalse(envelope.has_header)
+        self.assertEqual(envelope.ref, '102')
+        self.assertEqual(envelope.msg_type, '')
+        self.assertIsNone(envelope.forward('127.0.0.2', '27011'))
+        self.assertEqual(
+            MessageEnvelope('103,127.0.0.1,27001,x').forward('127.0.0.2', '27011'),
+            '103,127.0.0.2,27011,x')
+
+
+    def test_decode(self):
+        """ test that the body is decoded once, on request """
+        envelope = MessageEnvelope(self.raw)
+        self.assertIsNone(envelope.message)
+        message = envelope.decode(SetDeviceStateMessage, self.log)
+        self.assertEqual(message.dev_cmd, 'on')
+        self.assertEqual(message.dev_status, 'off')
+        self.assertIs(envelope.decode(SetDeviceStateMessage, self.log), message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+""" test_get_device_scheduled_state_bulk.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import copy
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.messages.get_device_scheduled_state_bulk import GetDeviceScheduledStateBulkMessage
+
+
+# Define test class ***********************************************************
+class TestGetDeviceScheduledStateBulkMessage(unittest.TestCase):
+    """ unittests for Get Device Scheduled State Bulk Message Class """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.temp_str = str()
+        super(TestGetDeviceScheduledStateBulkMessage, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.message = GetDeviceScheduledStateBulkMessage(logger=self.log)
+        super(TestGetDeviceScheduledStateBulkMessage, self).setUp()
+
+
+    def test_init(self):
+        """ test class __init__ and input variables """
+        self.message = GetDeviceScheduledStateBulkMessage(
+            logger=self.log,
+            ref='101',
+            dest_addr='192.168.86.1',
+            dest_port='17061',
+            source_addr='192.168.5.4',
+            source_port='12000',
+            msg_type='304',
+            dev_names='fylt1;fylt2'
+        )
+        self.assertEqual(self.message.ref, '101')
+        self.assertEqual(self.message.msg_type, '304')
+        self.assertEqual(self.message.dev_names, 'fylt1;fylt2')
+        self.assertEqual(self.message.dev_name_list, ['fylt1', 'fylt2'])
+
+
+    def test_dev_name_list(self):
+        """ test setting and getting the device names as a list """
+        self.assertEqual(self.message.dev_name_list, [])
+        self.message.dev_name_list = ['fylt1', 'bylt1', 'ewlt1']
+        self.assertEqual(self.message.dev_names, 'fylt1;bylt1;ewlt1')
+        self.assertEqual(self.message.dev_name_list, ['fylt1', 'bylt1', 'ewlt1'])
+        self.message.dev_name_list = ['fylt1']
+        self.assertEqual(self.message.dev_names, 'fylt1')
+
+
+    def test_complete(self):
+        self.temp_str = '142,127.0.0.1,12000,192.168.5.45,13000,304,fylt1;fylt2;bylt1'
+        self.message.complete = copy.copy(self.temp_str)
+        self.assertEqual(self.message.ref, '142')
+        self.assertEqual(self.message.dest_addr, '127.0.0.1')
+        self.assertEqual(self.message.dest_port, '12000')
+        self.assertEqual(self.message.source_addr, '192.168.5.45')
+        self.assertEqual(self.message.source_port, '13000')
+        self.assertEqual(self.message.msg_type, '304')
+        self.assertEqual(self.message.dev_name_list, ['fylt1', 'fylt2', 'bylt1'])
+        self.assertEqual(self.message.complete, self.temp_str)
+
+
+if __name__ == "__main__":
+    unittest.main()
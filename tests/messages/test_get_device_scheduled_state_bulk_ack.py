@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+""" test_get_device_scheduled_state_bulk_ack.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import copy
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.messages.get_device_scheduled_state_bulk_ack import GetDeviceScheduledStateBulkMessageACK
+
+
+# Define test class ***********************************************************
+class TestGetDeviceScheduledStateBulkMessageACK(unittest.TestCase):
+    """ unittests for Get Device Scheduled State Bulk ACK Message Class """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.temp_str = str()
+        super(TestGetDeviceScheduledStateBulkMessageACK, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.message = GetDeviceScheduledStateBulkMessageACK(logger=self.log)
+        super(TestGetDeviceScheduledStateBulkMessageACK, self).setUp()
+
+
+    def test_dev_state_list(self):
+        """ test setting and getting the device states as a list """
+        self.assertEqual(self.message.dev_state_list, [])
+        self.message.dev_state_list = [
+            ('fylt1', 'on', '2017-10-04 19:30:00'),
+            ('fylt2', 'off', None)]
+        self.assertEqual(self.message.dev_states,
+                         'fylt1|on|2017-10-04 19:30:00;fylt2|off|')
+        self.assertEqual(self.message.dev_state_list, [
+            ('fylt1', 'on', '2017-10-04 19:30:00'),
+            ('fylt2', 'off', None)])
+        # Entries without a next transition, and malformed entries
+        self.message.dev_states = 'fylt1|on;bad;|off;fylt2|off|'
+        self.assertEqual(self.message.dev_state_list, [
+            ('fylt1', 'on', None),
+            ('fylt2', 'off', None)])
+
+
+    def test_complete(self):
+        self.temp_str = '142,127.0.0.1,12000,192.168.5.45,13000,305,' \
+                        'fylt1|on|2017-10-04 19:30:00;bylt1|off|'
+        self.message.complete = copy.copy(self.temp_str)
+        self.assertEqual(self.message.ref, '142')
+        self.assertEqual(self.message.source_addr, '192.168.5.45')
+        self.assertEqual(self.message.source_port, '13000')
+        self.assertEqual(self.message.msg_type, '305')
+        self.assertEqual(self.message.dev_state_list, [
+            ('fylt1', 'on', '2017-10-04 19:30:00'),
+            ('bylt1', 'off', None)])
+        self.assertEqual(self.message.complete, self.temp_str)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+""" test_msg_processing.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.msg_processing import forward_msg
+
+
+# Define test class ***********************************************************
+class TestForwardMsg(unittest.TestCase):
+    """ unittests for the message forwarding fast path """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestForwardMsg, self).__init__(*args, **kwargs)
+
+
+    def test_forward_msg(self):
+        """ test that only the destination fields are replaced """
+        msg_in = '101,127.2.2.1,27001,127.3.3.1,27002,102,Device,192.168.86.1,' \
+                 'On,2017-01-01 10:02:03.123456,extra'
+        self.assertEqual(
+            forward_msg(self.log, msg_in, '127.0.0.1', '27011'),
+            '101,127.0.0.1,27011,127.3.3.1,27002,102,Device,192.168.86.1,'
+            'On,2017-01-01 10:02:03.123456,extra')
+
+
+    def test_forward_malformed_msg(self):
+        """ test that messages without a destination are not forwarded """
+        self.assertIsNone(forward_msg(self.log, '101,127.2.2.1', '127.0.0.1', '27011'))
+
+
+if __name__ == "__main__":
+    unittest.main()
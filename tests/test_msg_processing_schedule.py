@@ -17,6 +17,7 @@ from bob_auto_service.configure import ConfigureService
 from bob_auto_service.msg_processing_schedule import create_get_device_scheduled_state_msg
 from bob_auto_service.msg_processing_schedule import process_get_device_scheduled_state_msg
 from bob_auto_service.msg_processing_schedule import process_get_device_scheduled_state_msg_ack
+from bob_auto_service.msg_processing_schedule import process_get_device_scheduled_state_bulk_msg_ack
 
 
 # Define test class ***********************************************************
@@ -74,7 +75,7 @@ class Test_message_processing_schedule(unittest.TestCase):
         # check for proper number of outgoing messages generated
         self.count = 0
         for d in self.devices:
-            if d.dev_rule == "schedule" or d.dev_rule == "dusk_to_dawn" or d.dev_rule == "":
+            if d.dev_rule == "schedule" or d.dev_rule == "dusk to dawn" or d.dev_rule == "":
                 self.count += 1
         self.assertEqual(len(self.msg_out), self.count)
 
@@ -100,7 +101,7 @@ class Test_message_processing_schedule(unittest.TestCase):
         # are NOT the ones we are looking for
         self.count = 0
         for d in self.devices:
-            if (d.dev_rule == "schedule" or d.dev_rule == "dusk_to_dawn" or d.dev_rule == "") and d.dev_name != "":
+            if (d.dev_rule == "schedule" or d.dev_rule == "dusk to dawn" or d.dev_rule == "") and d.dev_name != "":
                 self.count += 1
         self.assertEqual(self.count, 0)
 
@@ -161,6 +162,69 @@ class Test_message_processing_schedule(unittest.TestCase):
 
 
 
+    def test_create_get_device_scheduled_state_bulk_msg(self):
+        """ test that devices are asked for in bulk messages of bulk_size """
+        self.msg_out = create_get_device_scheduled_state_msg(
+            self.log,
+            self.ref_num,
+            self.devices,
+            self.service_addresses,
+            self.message_types,
+            bulk_size=2)
+        # check for proper number of outgoing messages generated
+        self.dev_names = [
+            d.dev_name for d in self.devices
+            if d.dev_rule == "schedule" or d.dev_rule == "dusk to dawn" or d.dev_rule == ""]
+        self.assertEqual(len(self.msg_out), (len(self.dev_names) + 1) // 2)
+        # Check message contents
+        self.bulk_names = []
+        for j in self.msg_out:
+            self.msg_out_split = j.split(",")
+            self.assertEqual(self.msg_out_split[1], self.service_addresses['schedule_addr'])
+            self.assertEqual(self.msg_out_split[2], self.service_addresses['schedule_port'])
+            self.assertEqual(self.msg_out_split[5], '304')
+            self.assertLessEqual(len(self.msg_out_split[6].split(";")), 2)
+            self.bulk_names.extend(self.msg_out_split[6].split(";"))
+        self.assertEqual(self.bulk_names, self.dev_names)
+
+
+    def test_create_get_device_scheduled_state_msg_local_rules(self):
+        """ test that devices with locally evaluated rules are not asked for """
+        self.msg_out = create_get_device_scheduled_state_msg(
+            self.log,
+            self.ref_num,
+            self.devices,
+            self.service_addresses,
+            self.message_types,
+            local_rules=('dusk to dawn',))
+        self.dev_names = [
+            d.dev_name for d in self.devices
+            if d.dev_rule == "schedule" or d.dev_rule == ""]
+        self.assertEqual([j.split(",")[6] for j in self.msg_out], self.dev_names)
+
+
+    def test_process_get_device_scheduled_state_bulk_msg_ack(self):
+        """ test that every command in a bulk ACK is applied in one pass """
+        for cmd in ['on', 'off']:
+            self.msg_in = "143,127.0.0.1,27001,127.0.0.1,27051,305," \
+                          "fylt1|%s|;fylt2|%s|;nosuchdevice|on|" % (cmd, cmd)
+            # call function
+            self.msg_out = process_get_device_scheduled_state_bulk_msg_ack(
+                self.log,
+                self.ref_num,
+                self.devices,
+                self.msg_in,
+                self.service_addresses,
+                self.message_types)
+            # check for one outgoing message per known device
+            self.assertEqual(len(self.msg_out), 2)
+            for dev_name, out_msg in zip(['fylt1', 'fylt2'], self.msg_out):
+                self.msg_out_split = out_msg.split(",")
+                self.assertEqual(self.msg_out_split[5], self.message_types['set_device_state'])
+                self.assertEqual(self.msg_out_split[6], dev_name)
+                self.assertEqual(self.msg_out_split[8], cmd)
+
+
 
 
 if __name__ == "__main__":
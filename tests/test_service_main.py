@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+""" test_service_main.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import datetime
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bob_auto_service.service_main import MainTask
+from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.ref_num import RefNum
+
+
+# Define test class ***********************************************************
+class TestMainTaskDispatch(unittest.TestCase):
+    """ unittests for the main task's incoming message dispatch table """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestMainTaskDispatch, self).__init__(*args, **kwargs)
+        self.service_addresses = {
+            'automation_addr': '127.0.0.1', 'automation_port': '27001',
+            'database_addr': '127.0.0.1', 'database_port': '27011',
+            'occupancy_addr': '127.0.0.1', 'occupancy_port': '27041',
+            'wemo_addr': '127.0.0.1', 'wemo_port': '27061'}
+        self.message_types = {
+            'heartbeat': '100', 'log_status_update': '102',
+            'get_device_state_ack': '603', 'occupancy_check': '404',
+            'set_device_state': '604'}
+
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.msg_out_queue = []
+        self.task = MainTask(
+            logger=self.log,
+            loop=self.loop,
+            service_addresses=self.service_addresses,
+            message_types=self.message_types,
+            ref=RefNum(logger=self.log),
+            devices=[
+                Device(logger=self.log, dev_name='fylt1', dev_addr='192.168.86.21',
+                       dev_status='off', dev_last_seen='2017-10-04 07:01:30'),
+                Device(logger=self.log, dev_name='fylt2', dev_addr='192.168.86.22')])
+        self.task.queue_msgs = self.msg_out_queue.extend
+
+
+    def tearDown(self):
+        self.loop.close()
+
+
+    def test_heartbeat(self):
+        """ test that heartbeats update only their own service's timestamp """
+        self.task.next_msg = '101,127.0.0.1,27001,127.0.0.1,27011,100'
+        self.task.process_msg()
+        self.assertGreater(self.task.timestamp_db, self.loop.time() - 5)
+        self.assertIsNone(self.task.timestamp_wemo)
+        self.assertEqual(self.task.unroutable, 0)
+
+
+    def test_unroutable(self):
+        """ test that messages without a handler are counted and dropped """
+        for msg in ['102,127.0.0.1,27001,127.0.0.1,27011,604,fylt1',
+                    '103,127.0.0.1,27001,127.0.0.1,29999,100',
+                    '104,127.0.0.1,27001']:
+            self.task.next_msg = msg
+            self.task.process_msg()
+        self.assertEqual(self.task.unroutable, 3)
+        self.assertEqual(self.msg_out_queue, [])
+
+
+    def test_register(self):
+        """ test that a registered handler receives its messages """
+        received = []
+
+        def handler(msg):
+            received.append(msg)
+            return ['reply']
+        self.task.register('occupancy', 'occupancy_check', handler)
+        self.task.register('occupancy', 'not_a_type', handler)
+        self.task.next_msg = '105,127.0.0.1,27001,127.0.0.1,27041,404,csm'
+        self.task.process_msg()
+        self.assertEqual(received, [self.task.next_msg])
+        self.assertEqual(self.msg_out_queue, ['reply'])
+        self.assertEqual(self.task.unroutable, 0)
+
+
+    def test_check_cos(self):
+        """ test that only devices that changed state are logged, once """
+        devices = self.task.devices
+        self.task.check_cos()
+        # The database service has not been heard from, so nothing is logged
+        self.assertEqual(self.msg_out_queue, [])
+        self.assertEqual(len(devices.changed), 1)
+        self.task.process_heartbeat_db(None)
+        self.task.check_cos()
+        self.assertEqual(len(self.msg_out_queue), 1)
+        self.assertTrue(self.msg_out_queue[0].endswith(
+            ',102,fylt1,192.168.86.21,off,2017-10-04 07:01:30'))
+        self.task.check_cos()
+        self.assertEqual(len(self.msg_out_queue), 1)
+        # A change that is undone before the check is not logged
+        devices[1].dev_status = 'on'
+        devices[1].dev_status = ''
+        devices[0].dev_status = 'ON'
+        self.assertEqual(list(devices.changed), [devices[1], devices[0]])
+        self.task.check_cos()
+        self.assertEqual(len(self.msg_out_queue), 2)
+        self.assertIn(',fylt1,192.168.86.21,on,', self.msg_out_queue[1])
+        self.assertEqual(len(devices.changed), 0)
+
+
+    def test_run(self):
+        """ test that the supervised tasks dispatch messages and publish
+        changes of state """
+        self.task.msg_in_queue = asyncio.Queue(loop=self.loop)
+        self.task.cos_interval = 0.01
+        for msg in ['106,127.0.0.1,27001,127.0.0.1,27011,100',
+                    '107,127.0.0.1,27001,127.0.0.1,27061,603,fylt2,on,'
+                    '2017-10-04 07:02:00']:
+            self.task.msg_in_queue.put_nowait(msg)
+        run = asyncio.ensure_future(self.task.run(), loop=self.loop)
+        self.loop.run_until_complete(asyncio.sleep(0.05, loop=self.loop))
+        run.cancel()
+        self.loop.run_until_complete(asyncio.wait([run], loop=self.loop))
+        self.assertEqual(len(self.msg_out_queue), 2)
+        self.assertIn(',fylt1,192.168.86.21,off,', self.msg_out_queue[0])
+        self.assertIn(',fylt2,192.168.86.22,on,2017-10-04 07:02:00', self.msg_out_queue[1])
+        dispatcher, scheduler, cos = self.task.tasks
+        self.assertEqual(dispatcher.cycles, 2)
+        self.assertEqual(scheduler.cycles, 0)
+        self.assertGreaterEqual(cos.cycles, 1)
+        self.assertEqual([job.name for job in self.task.scheduler.jobs],
+                         ['Heartbeat', 'Schedule poller', 'Stats'])
+        self.assertTrue(all(task.task.cancelled() for task in self.task.tasks))
+
+
+    def test_apply_local_rule(self):
+        """ test that a local rule's command is sent only to the wemo devices
+        that follow it, and only when it changes """
+        task = MainTask(
+            logger=self.log,
+            loop=self.loop,
+            service_addresses=self.service_addresses,
+            message_types=self.message_types,
+            ref=RefNum(logger=self.log),
+            latitude=38.566268,
+            longitude=-90.409878,
+            utc_offset=-6,
+            devices=[
+                Device(logger=self.log, dev_name='fylt1', dev_type='wemo_switch',
+                       dev_addr='192.168.86.21', dev_rule='dusk to dawn'),
+                Device(logger=self.log, dev_name='fylt2', dev_type='wemo_switch',
+                       dev_addr='192.168.86.22', dev_rule='schedule'),
+                Device(logger=self.log, dev_name='bylt1', dev_type='wemo_switch',
+                       dev_addr='192.168.86.23', dev_rule='Dusk_to_Dawn')])
+        task.queue_msgs = self.msg_out_queue.extend
+        self.assertEqual(task.local_rules, ('dusk to dawn',))
+        task.apply_local_rule('dusk to dawn', 'on')
+        self.assertEqual(len(self.msg_out_queue), 2)
+        self.assertTrue(self.msg_out_queue[0].startswith(
+            self.msg_out_queue[0].split(',')[0] + ',127.0.0.1,27061,127.0.0.1,27001,604,fylt1,'))
+        self.assertIn(',604,bylt1,192.168.86.23,on,', self.msg_out_queue[1])
+        task.apply_local_rule('dusk to dawn', 'on')
+        self.assertEqual(len(self.msg_out_queue), 2)
+        task.apply_local_rule('dusk to dawn', 'off')
+        self.assertEqual(len(self.msg_out_queue), 4)
+        self.assertIsNone(self.task.rule_engine)
+
+
+    def test_local_rule_at_sunset(self):
+        """ test that a dusk to dawn device is sent a set device state message
+        when sunset passes, and nothing is sent while the rule is unchanged """
+        task = MainTask(
+            logger=self.log,
+            loop=self.loop,
+            service_addresses=self.service_addresses,
+            message_types=self.message_types,
+            ref=RefNum(logger=self.log),
+            latitude=38.566268,
+            longitude=-90.409878,
+            utc_offset=-6,
+            devices=[
+                Device(logger=self.log, dev_name='fylt1', dev_type='wemo_switch',
+                       dev_addr='192.168.86.21', dev_rule='dusk to dawn'),
+                Device(logger=self.log, dev_name='fylt2', dev_type='wemo_switch',
+                       dev_addr='192.168.86.22', dev_rule='schedule')])
+        task.queue_msgs = self.msg_out_queue.extend
+        sunset = task.rule_engine.sunrise_sunset(datetime.date(2017, 10, 4))[1]
+        task.rule_engine.run(sunset - datetime.timedelta(minutes=1))
+        self.assertEqual(len(self.msg_out_queue), 1)
+        self.assertIn(',604,fylt1,192.168.86.21,off,', self.msg_out_queue[0])
+        task.rule_engine.run(sunset - datetime.timedelta(seconds=1))
+        self.assertEqual(len(self.msg_out_queue), 1)
+        task.rule_engine.run(sunset)
+        self.assertEqual(len(self.msg_out_queue), 2)
+        self.assertIn(',604,fylt1,192.168.86.21,on,', self.msg_out_queue[1])
+        self.assertEqual(task.devices.by_name('fylt1').dev_cmd, 'on')
+        self.assertEqual(task.devices.by_name('fylt2').dev_cmd, '')
+        task.rule_engine.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+""" test_circuit_breaker.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.circuit_breaker import CircuitBreaker
+from bob_auto_service.tools.circuit_breaker import CLOSED, OPEN, HALF_OPEN
+from bob_auto_service.tools.connection_pool import ConnectionPool
+from bob_auto_service.tools.framing import FRAMED_PREAMBLE
+from bob_auto_service.tools.peer_sender import PeerSender
+
+
+# Define test class ***********************************************************
+class TestCircuitBreaker(unittest.TestCase):
+    """ unittests for the per-destination circuit breaker """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.loop = asyncio.get_event_loop()
+        super(TestCircuitBreaker, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(self.loop, '127.0.0.1', 27093, logger=self.log,
+                                      failure_threshold=3, reset_timeout=0.05)
+        super(TestCircuitBreaker, self).setUp()
+
+
+    def test_trip_on_failures(self):
+        """ test that consecutive failures open the breaker and a success
+        resets the count """
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+
+    def test_probe(self):
+        """ test that an open breaker allows one probe after reset_timeout
+        and that the probe result decides the next state """
+        self.breaker.trip('no heartbeat')
+        self.assertFalse(self.breaker.allow())
+        self.loop.run_until_complete(asyncio.sleep(0.06))
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.loop.run_until_complete(asyncio.sleep(0.06))
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.record_success())
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.trips, 2)
+
+
+    def test_trip_only_when_closed(self):
+        """ test that tripping an open breaker does not push back its probe """
+        self.breaker.trip('no heartbeat')
+        opened_at = self.breaker.opened_at
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.breaker.trip('no heartbeat')
+        self.assertEqual(self.breaker.opened_at, opened_at)
+        self.assertEqual(self.breaker.trips, 1)
+
+
+# Define test class ***********************************************************
+class TestPeerSenderCircuit(unittest.TestCase):
+    """ unittests for holding messages to a peer that is down """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.loop = asyncio.get_event_loop()
+        self.port = 27093
+        self.received = []
+        self.server = None
+        super(TestPeerSenderCircuit, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.received = []
+        self.server = None
+        self.pool = ConnectionPool(self.loop, logger=self.log)
+        super(TestPeerSenderCircuit, self).setUp()
+
+
+    def tearDown(self):
+        self.sender.stop()
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        if self.server is not None:
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+        super(TestPeerSenderCircuit, self).tearDown()
+
+
+    @asyncio.coroutine
+    def handle_peer(self, reader, writer):
+        while True:
+            data = yield from reader.readline()
+            data = data.lstrip(FRAMED_PREAMBLE)
+            if len(data) == 0:
+                break
+            self.received.append(data.decode().rstrip())
+            writer.write(data.split(b',')[0] + b'\n')
+            yield from writer.drain()
+        writer.close()
+
+
+    @asyncio.coroutine
+    def wait_for_sent(self, count):
+        while self.sender.sent < count:
+            yield from asyncio.sleep(0.01)
+
+
+    def test_hold_and_restore(self):
+        """ test that messages to a down peer are held once the circuit opens
+        and are delivered after a probe finds the peer back """
+        self.sender = PeerSender(self.loop, '127.0.0.1', self.port, self.pool,
+                                 logger=self.log, ack_timeout=0.05,
+                                 retry_backoff=0.05, retry_jitter=0,
+                                 max_retransmits=10, failure_threshold=2,
+                                 reset_timeout=0.3)
+        for ref in ['101', '102', '103']:
+            self.sender.queue.put_nowait(ref + ',127.0.0.1,27093,127.0.0.1,27001,100')
+        self.sender.start()
+        self.loop.run_until_complete(asyncio.sleep(0.2))
+        self.assertEqual(self.sender.breaker.state, 'open')
+        retransmits = self.sender.retransmits
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.assertEqual(self.sender.retransmits, retransmits)
+
+        self.server = self.loop.run_until_complete(asyncio.start_server(
+            self.handle_peer, host='127.0.0.1', port=self.port))
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_sent(3), 2.0))
+        self.assertEqual(self.sender.breaker.state, 'closed')
+        self.assertEqual(self.sender.failed, 0)
+        self.assertEqual(sorted(msg.split(',')[0] for msg in self.received),
+                         ['101', '102', '103'])
+
+
+if __name__ == "__main__":
+    unittest.main()
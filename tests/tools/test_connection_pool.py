@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+""" test_connection_pool.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.connection_pool import ConnectionPool
+
+
+# Define test class ***********************************************************
+class TestConnectionPool(unittest.TestCase):
+    """ unittests for Connection Pool Class, methods, and functions """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.loop = asyncio.new_event_loop()
+        self.addr = '127.0.0.1'
+        self.port = 27098
+        self.server = None
+        self.connections = 0
+        super(TestConnectionPool, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.pool = ConnectionPool(self.loop, logger=self.log, max_idle=5)
+        self.connections = 0
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(
+                self.handle_conn, host=self.addr, port=self.port, loop=self.loop))
+        super(TestConnectionPool, self).setUp()
+
+
+    def tearDown(self):
+        self.pool.close_all()
+        self.loop.run_until_complete(asyncio.sleep(0.01, loop=self.loop))
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        super(TestConnectionPool, self).tearDown()
+
+
+    @asyncio.coroutine
+    def handle_conn(self, reader, writer):
+        """ Peer that ACKs every chunk it receives without closing """
+        self.connections += 1
+        while True:
+            data = yield from reader.read(200)
+            if len(data) == 0:
+                break
+            writer.write(data.split(b',')[0])
+            yield from writer.drain()
+        writer.close()
+
+
+    @asyncio.coroutine
+    def send(self, msg):
+        reader, writer = yield from self.pool.acquire(self.addr, self.port)
+        writer.write(msg.encode())
+        ack = yield from reader.read(200)
+        self.pool.release(self.addr, self.port, reader, writer)
+        return ack.decode()
+
+
+    def test_init(self):
+        """ test class __init__ and input variables """
+        self.assertEqual(self.pool.loop, self.loop)
+        self.assertEqual(self.pool.max_idle, 5.0)
+        self.assertEqual(self.pool.stats,
+                         {'hits': 0, 'misses': 0, 'evictions': 0, 'idle': 0})
+
+
+    def test_reuse(self):
+        """ test that sequential sends share a single connection """
+        for ref in ['101', '102', '103']:
+            ack = self.loop.run_until_complete(
+                self.send(ref + ',127.0.0.1,27098,127.0.0.1,27001,100'))
+            self.assertEqual(ack, ref)
+        self.assertEqual(self.pool.misses, 1)
+        self.assertEqual(self.pool.hits, 2)
+        self.assertEqual(self.connections, 1)
+        self.assertEqual(self.pool.idle_count, 1)
+
+
+    def test_evict_idle(self):
+        """ test that idle connections are closed after max_idle """
+        self.loop.run_until_complete(
+            self.send('101,127.0.0.1,27098,127.0.0.1,27001,100'))
+        self.pool.evict_idle()
+        self.assertEqual(self.pool.idle_count, 1)
+        self.pool.max_idle = 0.0
+        self.loop.run_until_complete(asyncio.sleep(0.01, loop=self.loop))
+        self.pool.evict_idle()
+        self.assertEqual(self.pool.idle_count, 0)
+        self.assertEqual(self.pool.evictions, 1)
+
+
+    def test_reconnect_after_peer_close(self):
+        """ test that a connection closed by the peer is not reused """
+        reader, writer = self.loop.run_until_complete(
+            self.pool.acquire(self.addr, self.port))
+        self.pool.release(self.addr, self.port, reader, writer)
+        writer.transport.abort()
+        self.loop.run_until_complete(asyncio.sleep(0.01, loop=self.loop))
+        ack = self.loop.run_until_complete(
+            self.send('104,127.0.0.1,27098,127.0.0.1,27001,100'))
+        self.assertEqual(ack, '104')
+        self.assertEqual(self.pool.misses, 2)
+        self.assertEqual(self.pool.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
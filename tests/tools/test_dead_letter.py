@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+""" test_dead_letter.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import queue
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.dead_letter import DeadLetterQueue
+
+
+# Define test class ***********************************************************
+class TestDeadLetterQueue(unittest.TestCase):
+    """ unittests for the undeliverable message store """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestDeadLetterQueue, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.dlq = DeadLetterQueue(logger=self.log, max_size=3)
+        super(TestDeadLetterQueue, self).setUp()
+
+
+    def test_add(self):
+        """ test that dead letters are recorded with their destination """
+        self.dlq.add('127.0.0.1', 27001, '101,127.0.0.1,27001,127.0.0.1,27002,100', 4, 'no ACK')
+        self.assertEqual(len(self.dlq), 1)
+        entry = self.dlq.entries()[0]
+        self.assertEqual(entry.dest_addr, '127.0.0.1')
+        self.assertEqual(entry.dest_port, '27001')
+        self.assertEqual(entry.attempts, 4)
+        self.assertEqual(entry.reason, 'no ACK')
+
+
+    def test_max_size(self):
+        """ test that only the most recent max_size dead letters are kept """
+        for ref in range(101, 106):
+            self.dlq.add('127.0.0.1', '27001', str(ref), 1, 'no ACK')
+        self.assertEqual([entry.msg for entry in self.dlq.entries()],
+                         ['103', '104', '105'])
+        self.assertEqual(self.dlq.stats['total'], 5)
+
+
+    def test_replay(self):
+        """ test that replay re-queues only the selected destination """
+        out_queue = queue.Queue()
+        self.dlq.add('127.0.0.1', '27001', '101', 1, 'no ACK')
+        self.dlq.add('127.0.0.1', '27002', '102', 1, 'no ACK')
+        self.dlq.add('127.0.0.1', '27001', '103', 1, 'no ACK')
+        self.assertEqual(self.dlq.replay(out_queue, '127.0.0.1', 27001), 2)
+        self.assertEqual(out_queue.get_nowait(), '101')
+        self.assertEqual(out_queue.get_nowait(), '103')
+        self.assertEqual([entry.msg for entry in self.dlq.entries()], ['102'])
+        self.assertEqual(self.dlq.stats['replayed'], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,9 @@ if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from bob_auto_service.tools.device import search_device_list
 from bob_auto_service.tools.device import Device
+from bob_auto_service.tools.device import DeviceRegistry
+from bob_auto_service.tools.device import find_device
+from bob_auto_service.tools.device import to_epoch
 
 
 # Define test class ***********************************************************
@@ -131,6 +134,31 @@ class TestDevice(unittest.TestCase):
         self.assertEqual(len(self.device.dev_last_seen), 19)
 
 
+    def test_compact_fields(self):
+        """ test the slotted device's interned values and numeric last seen """
+        self.assertFalse(hasattr(self.device, '__dict__'))
+        self.assertEqual(Device(log=self.log).dev_last_seen, '')
+        self.device.dev_status = ''.join(['o', 'n'])
+        self.device.dev_status_mem = 'ON'
+        self.assertIs(self.device.dev_status, self.device.dev_status_mem)
+        self.device.dev_last_seen = '2017-10-04 07:01:30.123456'
+        self.assertEqual(self.device.last_seen, 1507100490.0)
+        self.assertEqual(self.device.dev_last_seen, '2017-10-04 07:01:30')
+        self.device.dev_last_seen_mem = datetime.datetime(2017, 10, 4, 7, 1, 30)
+        self.assertEqual(self.device.last_seen_mem, self.device.last_seen)
+        self.device.dev_last_seen = '2017-10-04'
+        self.assertEqual(self.device.dev_last_seen[:10], '2017-10-04')
+        # Invalid times leave the last seen time as it was
+        self.device.dev_last_seen = '2017-10-04 07:01:30'
+        self.device.dev_last_seen = 'yesterday'
+        self.device.dev_last_seen = '2017-13-04 07:01:30'
+        self.device.dev_last_seen = '2017-10-04 25:61:61'
+        self.device.dev_last_seen = '2017-10-04 07:60:30'
+        self.assertEqual(self.device.dev_last_seen, '2017-10-04 07:01:30')
+        self.assertIsNone(to_epoch('2017-10-04 24:00:00'))
+        self.assertEqual(to_epoch('2017-10-04 23:59:59.5'), 1507161599.0)
+
+
     def test_search_device_list(self):
         self.device.dev_name = 'name@index0'
         self.device_list.append(copy.copy(self.device))
@@ -152,6 +180,91 @@ class TestDevice(unittest.TestCase):
             search_device_list(self.log, self.device_list, 'name@index9'), None)
 
 
+# Define test class ***********************************************************
+class TestDeviceRegistry(unittest.TestCase):
+    """ unittests for DeviceRegistry Class and its indexes """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestDeviceRegistry, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.devices = [
+            Device(logger=self.log, dev_name='fylt1', dev_type='wemo_switch',
+                   dev_addr='192.168.86.21', dev_rule='dusk to dawn'),
+            Device(logger=self.log, dev_name='fyot1', dev_type='wemo_switch',
+                   dev_addr='192.168.86.22', dev_rule='schedule'),
+            Device(logger=self.log, dev_name='bylt1', dev_type='wemo_switch',
+                   dev_addr='192.168.86.23', dev_rule='schedule')]
+        self.registry = DeviceRegistry(self.devices, logger=self.log)
+
+
+    def test_list_behaviour(self):
+        """ test the registry iterates and indexes like the device list """
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(list(self.registry), self.devices)
+        self.assertIs(self.registry[1], self.devices[1])
+        self.assertIs(self.registry[-1], self.devices[2])
+
+
+    def test_lookups(self):
+        """ test lookups by name, address, type and rule """
+        self.assertIs(self.registry.by_name('FYOT1'), self.devices[1])
+        self.assertIsNone(self.registry.by_name('nobody'))
+        self.assertEqual(self.registry.by_addr('192.168.86.23'), [self.devices[2]])
+        self.assertEqual(self.registry.by_type('wemo_switch'), self.devices)
+        self.assertEqual(self.registry.by_rule('schedule'), self.devices[1:])
+        self.assertEqual(self.registry.by_rule('dusk to dawn'), self.devices[:1])
+        self.assertIs(find_device(self.registry, 'bylt1'), self.devices[2])
+        self.assertIs(find_device(self.devices, 'bylt1'), self.devices[2])
+        self.assertIsNone(find_device(self.devices, 'nobody'))
+
+
+    def test_reindex(self):
+        """ test the indexes follow changes to the devices' fields """
+        self.devices[0].dev_name = 'FYLT2'
+        self.devices[0].dev_addr = '192.168.86.30'
+        self.devices[0].dev_rule = 'schedule'
+        self.assertIsNone(self.registry.by_name('fylt1'))
+        self.assertIs(self.registry.by_name('fylt2'), self.devices[0])
+        self.assertEqual(self.registry.by_addr('192.168.86.21'), [])
+        self.assertEqual(self.registry.by_addr('192.168.86.30'), [self.devices[0]])
+        # A re-indexed device goes to the end of its new index entry
+        self.assertEqual(self.registry.by_rule('schedule'),
+                         self.devices[1:] + self.devices[:1])
+        self.assertEqual(self.registry.by_rule('dusk to dawn'), [])
+
+
+    def test_add_remove(self):
+        """ test adding and removing devices keeps the indexes current """
+        device = Device(logger=self.log, dev_name='fylt1', dev_type='wemo_switch',
+                        dev_addr='192.168.86.24', dev_rule='schedule')
+        self.registry.add(device)
+        self.assertIs(self.registry[-1], device)
+        # The first device added with a name wins, as in a list search
+        self.assertIs(self.registry.by_name('fylt1'), self.devices[0])
+        self.registry.remove(self.devices[0])
+        self.assertIs(self.registry.by_name('fylt1'), device)
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(list(self.registry), self.devices[1:] + [device])
+        self.assertIs(self.registry[0], self.devices[1])
+        self.assertEqual(self.registry.by_type('wemo_switch'),
+                         self.devices[1:] + [device])
+        with self.assertRaises(ValueError):
+            self.registry.remove(self.devices[0])
+        # Copies are not in the registry
+        duplicate = copy.copy(device)
+        duplicate.dev_name = 'copy'
+        self.assertIsNone(self.registry.by_name('copy'))
+        self.assertEqual(duplicate.dev_addr, device.dev_addr)
+        # Removed devices no longer update the registry
+        self.devices[0].dev_name = 'gone'
+        self.assertIsNone(self.registry.by_name('gone'))
+
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+""" test_framing.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.framing import encode_frame
+from bob_auto_service.tools.framing import MessageFramer
+from bob_auto_service.tools.framing import MAX_FRAME_SIZE
+
+
+# Define test class ***********************************************************
+class TestMessageFramer(unittest.TestCase):
+    """ unittests for message framing functions and stream parser """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.msg1 = '101,127.0.0.1,27001,127.0.0.1,27061,100'
+        self.msg2 = '102,127.0.0.1,27001,127.0.0.1,27061,604,fylt1,' \
+                    '192.168.86.21,on,off,2017-08-05 08:45:00'
+        super(TestMessageFramer, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.framer = MessageFramer(logger=self.log)
+        super(TestMessageFramer, self).setUp()
+
+
+    def test_encode_frame(self):
+        """ test encoding a message into its wire format """
+        self.assertEqual(encode_frame(self.msg1), self.msg1.encode() + b'\n')
+
+
+    def test_feed_multiple(self):
+        """ test that back-to-back messages in one read are all returned """
+        data = encode_frame(self.msg1) + encode_frame(self.msg2)
+        self.assertEqual(self.framer.feed(data), [self.msg1, self.msg2])
+        self.assertEqual(self.framer.pending, b'')
+
+
+    def test_feed_partial(self):
+        """ test that a message split across reads is reassembled """
+        data = encode_frame(self.msg2)
+        self.assertEqual(self.framer.feed(data[:10]), [])
+        self.assertEqual(self.framer.pending, data[:10])
+        self.assertEqual(self.framer.feed(data[10:50]), [])
+        self.assertEqual(self.framer.feed(data[50:]), [self.msg2])
+        self.assertEqual(self.framer.pending, b'')
+
+
+    def test_feed_long_message(self):
+        """ test that messages longer than the old 200 byte read survive """
+        msg = self.msg2 + ',' + ('x' * 500)
+        self.assertEqual(self.framer.feed(encode_frame(msg)), [msg])
+
+
+    def test_feed_crlf_and_blank(self):
+        """ test that CR-LF endings and empty frames are tolerated """
+        data = self.msg1.encode() + b'\r\n\n'
+        self.assertEqual(self.framer.feed(data), [self.msg1])
+
+
+    def test_flush(self):
+        """ test returning an unframed legacy message """
+        self.framer.feed(self.msg1.encode())
+        self.assertEqual(self.framer.flush(), self.msg1)
+        self.assertEqual(self.framer.pending, b'')
+
+
+    def test_oversize(self):
+        """ test that runaway data without a delimiter is discarded """
+        self.framer.feed(b'x' * (MAX_FRAME_SIZE + 1))
+        self.assertEqual(self.framer.pending, b'')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,10 +6,15 @@
 import logging
 import os
 import sys
+import tempfile
+import threading
 import unittest
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.log_support import FlightRecorder
+from bob_auto_service.tools.log_support import LogRouter
 from bob_auto_service.tools.log_support import setup_log_handlers
+from bob_auto_service.tools.log_support import start_queue_logging
 
 
 # Define test class ***********************************************************
@@ -37,6 +42,109 @@ class TestLogger(unittest.TestCase):
         self.assertEqual(len(self.logger.handlers), 3)
 
 
+class RecordingHandler(logging.Handler):
+    """ Keeps the records it is given, and the thread that handled them """
+    def __init__(self, level=logging.NOTSET):
+        super(RecordingHandler, self).__init__(level)
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.current_thread())
+
+
+class TestLogRouter(unittest.TestCase):
+    """ unittests for the per-module log router and background logging """
+
+    def setUp(self):
+        self.logger = logging.getLogger('test_log_router')
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.by_file = RecordingHandler()
+        self.by_func = RecordingHandler()
+        self.info = RecordingHandler(logging.INFO)
+        self.router = LogRouter()
+        self.router.add_route('test_log_support.py', '', self.by_file)
+        self.router.add_route('test_log_support.py', 'log_from_here', self.by_func)
+        self.router.add_route('', 'log_from_here', self.info)
+
+
+    def log_from_here(self):
+        self.logger.debug('routed debug')
+        self.logger.info('routed info')
+
+
+    def test_routing(self):
+        """ test that records reach only the handlers routed to their file
+        and function, at the handlers' levels """
+        self.logger.handlers = [self.router]
+        self.logger.debug('file only')
+        self.log_from_here()
+        self.assertEqual([r.getMessage() for r in self.by_file.records],
+                         ['file only', 'routed debug', 'routed info'])
+        self.assertEqual([r.getMessage() for r in self.by_func.records],
+                         ['routed debug', 'routed info'])
+        self.assertEqual([r.getMessage() for r in self.info.records],
+                         ['routed info'])
+
+
+    def test_queue_logging(self):
+        """ test that handlers run on the listener thread """
+        listener = start_queue_logging(self.logger, [self.router])
+        try:
+            self.log_from_here()
+        finally:
+            listener.stop()
+        self.assertEqual(len(self.by_func.records), 2)
+        self.assertNotIn(threading.current_thread(), self.by_func.threads)
+
+
+
+class TestFlightRecorder(unittest.TestCase):
+    """ unittests for the in-memory debug flight recorder """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.recorder = FlightRecorder(self.path, capacity=3)
+        self.logger = logging.getLogger('test_flight_recorder')
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.handlers = [self.recorder]
+
+
+    def read_dumps(self):
+        dumps = []
+        for file_name in sorted(os.listdir(self.path)):
+            with open(os.path.join(self.path, file_name)) as dump_file:
+                dumps.append(dump_file.read().splitlines())
+        return dumps
+
+
+    def test_dump(self):
+        """ test that only the most recent records are kept and dumped """
+        for i in range(5):
+            self.logger.debug('record %s', i)
+        self.assertEqual(self.read_dumps(), [])
+        self.recorder.dump('test')
+        dumps = self.read_dumps()
+        self.assertEqual(len(dumps), 1)
+        self.assertTrue(dumps[0][0].endswith(': test'))
+        self.assertEqual([line.split()[-1] for line in dumps[0][1:]],
+                         ['2', '3', '4'])
+
+
+    def test_dump_on_error(self):
+        """ test that errors dump the ring, at most once per interval """
+        self.logger.debug('before')
+        self.logger.error('first')
+        self.logger.error('second')
+        dumps = self.read_dumps()
+        self.assertEqual(len(dumps), 1)
+        self.assertIn('before', dumps[0][1])
+        self.assertIn('ERROR', dumps[0][2])
+
+
 if __name__ == "__main__":
     unittest.main()
     
\ No newline at end of file
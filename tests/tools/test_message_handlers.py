@@ -12,6 +12,7 @@ import sys
 import unittest
 if __name__ == "__main__":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.framing import FRAMED_PREAMBLE
 from bob_auto_service.tools.message_handlers import MessageHandler
 
 
@@ -62,5 +63,185 @@ class TestMessageHandler(unittest.TestCase):
         asyncio.Task.all_tasks()
 
 
+# Define test class ***********************************************************
+class TestMessageFraming(unittest.TestCase):
+    """ unittests for framed and legacy message exchange between handlers """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.loop = asyncio.get_event_loop()
+        self.port = 27095
+        self.tasks = []
+        super(TestMessageFraming, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.mh = MessageHandler(self.loop, logger=self.log)
+        self.server = self.loop.run_until_complete(asyncio.start_server(
+            self.mh.handle_msg_in, host='127.0.0.1', port=self.port))
+        self.tasks = []
+        super(TestMessageFraming, self).setUp()
+
+
+    def tearDown(self):
+        for task in self.tasks:
+            task.cancel()
+        for sender in self.mh.senders.values():
+            sender.stop()
+        self.mh.pool.close_all()
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        super(TestMessageFraming, self).tearDown()
+
+
+    @asyncio.coroutine
+    def exchange(self, data, read_fn, gap=0):
+        """ Sends data, or each part of a list of data gap seconds apart,
+        and returns what read_fn reads back """
+        if isinstance(data, bytes):
+            data = [data]
+        reader, writer = yield from asyncio.open_connection('127.0.0.1', self.port)
+        for i, part in enumerate(data):
+            if i > 0:
+                yield from asyncio.sleep(gap)
+            writer.write(part)
+            yield from writer.drain()
+        ack = yield from asyncio.wait_for(read_fn(reader), 2.0)
+        writer.close()
+        return ack
+
+
+    @asyncio.coroutine
+    def read_legacy_ack(self, reader):
+        ack = yield from reader.read(200)
+        return ack
+
+
+    @asyncio.coroutine
+    def wait_for_queue(self, count):
+        while self.mh.msg_in_queue.qsize() < count:
+            yield from asyncio.sleep(0.01)
+
+
+    def test_framed_messages_share_connection(self):
+        """ test that several framed messages on one connection are each
+        queued and ACK'd """
+        data = FRAMED_PREAMBLE + \
+               b'101,127.0.0.1,27095,127.0.0.1,27001,100\n' \
+               b'102,127.0.0.1,27095,127.0.0.1,27001,100\n' \
+               b'103,127.0.0.1,27095,127.0.0.1,27001,100\n'
+
+        @asyncio.coroutine
+        def read_acks(reader):
+            acks = []
+            for i in range(3):
+                line = yield from reader.readline()
+                acks.append(line)
+            return acks
+
+        acks = self.loop.run_until_complete(self.exchange(data, read_acks))
+        self.assertEqual(acks, [b'101\n', b'102\n', b'103\n'])
+        self.assertEqual(self.mh.msg_in_queue.qsize(), 3)
+        self.assertEqual(self.mh.msg_in_queue.get_nowait().raw,
+                         '101,127.0.0.1,27095,127.0.0.1,27001,100')
+
+
+    def test_legacy_message(self):
+        """ test that an unframed single message is ACK'd and queued as
+        soon as it arrives """
+        data = b'104,127.0.0.1,27095,127.0.0.1,27001,100'
+        started = self.loop.time()
+        ack = self.loop.run_until_complete(
+            self.exchange(data, self.read_legacy_ack))
+        self.assertLess(self.loop.time() - started, 0.05)
+        self.assertEqual(ack, b'104')
+        self.assertEqual(self.mh.msg_in_queue.get_nowait().raw,
+                         '104,127.0.0.1,27095,127.0.0.1,27001,100')
+
+
+    def test_legacy_message_split(self):
+        """ test that an unframed message split across writes is queued
+        whole, however long the gap between the writes """
+        data = [b'200,127.0.0.1,27095,', b'127.0.0.1,27001,100']
+        for gap in [0.02, 0.15]:
+            ack = self.loop.run_until_complete(
+                self.exchange(data, self.read_legacy_ack, gap=gap))
+            self.assertEqual(ack, b'200')
+            self.assertEqual(self.mh.msg_in_queue.get_nowait().raw,
+                             '200,127.0.0.1,27095,127.0.0.1,27001,100')
+        # A connection closed before the header arrives is dropped
+        @asyncio.coroutine
+        def send_partial():
+            reader, writer = yield from asyncio.open_connection(
+                '127.0.0.1', self.port)
+            writer.write(b'201,127.0.0.1')
+            writer.write_eof()
+            ack = yield from asyncio.wait_for(reader.read(200), 2.0)
+            writer.close()
+            return ack
+
+        self.assertEqual(self.loop.run_until_complete(send_partial()), b'')
+        self.assertEqual(self.mh.msg_in_queue.qsize(), 0)
+
+
+    def test_framed_message_split(self):
+        """ test that a framed peer pausing mid-frame keeps its connection
+        and has the message reassembled """
+        data = [FRAMED_PREAMBLE + b'202,127.0.0.1,27095,',
+                b'127.0.0.1,27001,100\n203,127.0.0.1,',
+                b'27095,127.0.0.1,27001,100\n']
+
+        @asyncio.coroutine
+        def read_acks(reader):
+            acks = []
+            for i in range(2):
+                line = yield from reader.readline()
+                acks.append(line)
+            return acks
+
+        acks = self.loop.run_until_complete(
+            self.exchange(data, read_acks, gap=0.15))
+        self.assertEqual(acks, [b'202\n', b'203\n'])
+        self.assertEqual(self.mh.msg_in_queue.get_nowait().raw,
+                         '202,127.0.0.1,27095,127.0.0.1,27001,100')
+        self.assertEqual(self.mh.msg_in_queue.get_nowait().raw,
+                         '203,127.0.0.1,27095,127.0.0.1,27001,100')
+
+
+    def test_outgoing_unframed_by_default(self):
+        """ test that a peer not listed as framed is sent unframed messages
+        that it ACKs and queues """
+        for ref in ['108', '109']:
+            self.mh.msg_out_queue.put_nowait(
+                ref + ',127.0.0.1,27095,127.0.0.1,27001,100')
+        self.tasks.append(asyncio.ensure_future(self.mh.handle_msg_out()))
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_queue(2), 2.0))
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        sender = self.mh.senders[('127.0.0.1', '27095')]
+        self.assertFalse(sender.framed)
+        self.assertEqual(sender.sent, 2)
+        self.assertEqual(self.mh.msg_in_queue.get_nowait().raw,
+                         '108,127.0.0.1,27095,127.0.0.1,27001,100')
+
+
+    def test_outgoing_reuses_connection(self):
+        """ test that the outgoing sender keeps one framed connection open
+        for consecutive messages to a framed peer """
+        self.mh.framed_peers.add(('127.0.0.1', '27095'))
+        for ref in ['105', '106', '107']:
+            self.mh.msg_out_queue.put_nowait(
+                ref + ',127.0.0.1,27095,127.0.0.1,27001,100')
+        self.tasks.append(asyncio.ensure_future(self.mh.handle_msg_out()))
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_queue(3), 2.0))
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.assertEqual(self.mh.pool.misses, 1)
+        self.assertEqual(self.mh.senders[('127.0.0.1', '27095')].sent, 3)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+""" test_pacer.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.pacer import PacedEmitter
+from bob_auto_service.tools.pacer import TokenBucket
+
+
+# Define test class ***********************************************************
+class TestPacedEmitter(unittest.TestCase):
+    """ unittests for the token bucket and paced batch emitter """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestPacedEmitter, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.emitted = []
+
+
+    def tearDown(self):
+        self.loop.close()
+
+
+    def emit(self, item):
+        self.emitted.append((item, self.loop.time()))
+
+
+    def test_token_bucket(self):
+        """ test that tokens refill at the rate up to the capacity """
+        bucket = TokenBucket(2.0, 2, 100.0)
+        self.assertTrue(bucket.take(100.0))
+        self.assertTrue(bucket.take(100.0))
+        self.assertFalse(bucket.take(100.0))
+        self.assertAlmostEqual(bucket.wait_time(100.0), 0.5)
+        self.assertAlmostEqual(bucket.wait_time(100.25), 0.25)
+        self.assertTrue(bucket.take(100.5))
+        bucket.refill(200.0)
+        self.assertEqual(bucket.tokens, 2.0)
+
+
+    def test_submit(self):
+        """ test that a batch is emitted evenly over its period """
+        pacer = PacedEmitter(self.loop, self.emit, logger=self.log)
+        started = self.loop.time()
+        pacer.submit(['a', 'b', 'c', 'd', 'e'], 0.2)
+        self.assertEqual([item for item, when in self.emitted], ['a'])
+        self.loop.run_until_complete(asyncio.sleep(0.3, loop=self.loop))
+        self.assertEqual([item for item, when in self.emitted],
+                         ['a', 'b', 'c', 'd', 'e'])
+        offsets = [when - started for item, when in self.emitted]
+        gaps = [b - a for a, b in zip(offsets, offsets[1:])]
+        for gap in gaps:
+            self.assertGreaterEqual(gap, 0.045)
+            self.assertLess(gap, 0.1)
+        self.assertLess(offsets[-1], 0.3)
+        self.assertEqual(pacer.stats['emitted'], 5)
+        self.assertEqual(pacer.stats['max_backlog'], 5)
+
+
+    def test_burst_and_flush(self):
+        """ test that a burst goes out at once, that a zero period sends the
+        whole batch now, and that an overrun sends the remainder first """
+        pacer = PacedEmitter(self.loop, self.emit, logger=self.log, burst=3,
+                             jitter=0.5)
+        pacer.submit(['a', 'b', 'c', 'd'], 10)
+        self.assertEqual(len(self.emitted), 3)
+        pacer.submit(['e', 'f'], 0)
+        self.assertEqual([item for item, when in self.emitted],
+                         ['a', 'b', 'c', 'd', 'e', 'f'])
+        self.assertIsNone(pacer.handle)
+        pacer = PacedEmitter(self.loop, self.emit, logger=self.log)
+        pacer.submit(['g', 'h'], 10)
+        pacer.submit(['i'], 10)
+        self.assertEqual(list(pacer.backlog), ['h', 'i'])
+        self.assertEqual(pacer.stats['overruns'], 1)
+        pacer.cancel()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+#!/usr/bin/python3
+""" test_peer_sender.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.connection_pool import ConnectionPool
+from bob_auto_service.tools.dead_letter import DeadLetterQueue
+from bob_auto_service.tools.framing import FRAMED_PREAMBLE
+from bob_auto_service.tools.message_handlers import MessageHandler
+from bob_auto_service.tools.peer_sender import PeerSender
+
+
+# Define test class ***********************************************************
+class TestPeerSender(unittest.TestCase):
+    """ unittests for per-destination outgoing message senders """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.loop = asyncio.get_event_loop()
+        self.good_port = 27097
+        self.stalled_port = 27096
+        self.received = []
+        self.servers = []
+        self.tasks = []
+        super(TestPeerSender, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.mh = MessageHandler(
+            self.loop, logger=self.log,
+            framed_peers=[('127.0.0.1', self.good_port),
+                          ('127.0.0.1', self.stalled_port)])
+        self.received = []
+        self.servers = [
+            self.loop.run_until_complete(asyncio.start_server(
+                self.handle_good, host='127.0.0.1', port=self.good_port)),
+            self.loop.run_until_complete(asyncio.start_server(
+                self.handle_stalled, host='127.0.0.1', port=self.stalled_port))]
+        super(TestPeerSender, self).setUp()
+
+
+    def tearDown(self):
+        for task in self.tasks:
+            task.cancel()
+        for sender in self.mh.senders.values():
+            sender.stop()
+        self.mh.pool.close_all()
+        for server in self.servers:
+            server.close()
+            self.loop.run_until_complete(server.wait_closed())
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        super(TestPeerSender, self).tearDown()
+
+
+    @asyncio.coroutine
+    def handle_good(self, reader, writer):
+        """ Peer that ACKs every message it receives """
+        while True:
+            data = yield from reader.readline()
+            data = data.lstrip(FRAMED_PREAMBLE)
+            if len(data) == 0:
+                break
+            self.received.append(data.decode().rstrip())
+            writer.write(data.split(b',')[0] + b'\n')
+            yield from writer.drain()
+        writer.close()
+
+
+    @asyncio.coroutine
+    def handle_stalled(self, reader, writer):
+        """ Peer that accepts connections but never ACKs """
+        yield from asyncio.sleep(60)
+
+
+    @asyncio.coroutine
+    def wait_for_received(self, count):
+        while len(self.received) < count:
+            yield from asyncio.sleep(0.01)
+
+
+    def test_get_sender(self):
+        """ test that one sender is created per destination """
+        sender1 = self.mh.get_sender('127.0.0.1', 27097)
+        sender2 = self.mh.get_sender('127.0.0.1', '27097')
+        sender3 = self.mh.get_sender('127.0.0.1', '27096')
+        self.assertIs(sender1, sender2)
+        self.assertIsNot(sender1, sender3)
+        self.assertEqual(len(self.mh.senders), 2)
+
+
+    def test_no_head_of_line_blocking(self):
+        """ test that a stalled peer does not delay traffic to other peers and
+        that ordering is kept per destination """
+        self.mh.msg_out_queue.put_nowait('101,127.0.0.1,27096,127.0.0.1,27001,100')
+        self.mh.msg_out_queue.put_nowait('102,127.0.0.1,27096,127.0.0.1,27001,100')
+        self.mh.msg_out_queue.put_nowait('103,127.0.0.1,27097,127.0.0.1,27001,100')
+        self.mh.msg_out_queue.put_nowait('104,127.0.0.1,27096,127.0.0.1,27001,100')
+        self.mh.msg_out_queue.put_nowait('105,127.0.0.1,27097,127.0.0.1,27001,100')
+        self.mh.msg_out_queue.put_nowait('106,127.0.0.1,27097,127.0.0.1,27001,100')
+        self.tasks.append(asyncio.ensure_future(self.mh.handle_msg_out()))
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_received(3), 2.0))
+        self.assertEqual([msg.split(',')[0] for msg in self.received],
+                         ['103', '105', '106'])
+        self.assertEqual(
+            self.mh.senders[('127.0.0.1', '27097')].sent, 3)
+        self.assertEqual(
+            self.mh.senders[('127.0.0.1', '27096')].sent, 0)
+
+
+# Define test class ***********************************************************
+class TestPeerSenderWindow(unittest.TestCase):
+    """ unittests for pipelined sends and ref-correlated ACKs """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.loop = asyncio.get_event_loop()
+        self.port = 27094
+        self.received = []
+        self.hold_acks = 0
+        self.drop_first = False
+        super(TestPeerSenderWindow, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.received = []
+        self.hold_acks = 0
+        self.drop_first = False
+        self.pool = ConnectionPool(self.loop, logger=self.log)
+        self.server = self.loop.run_until_complete(asyncio.start_server(
+            self.handle_peer, host='127.0.0.1', port=self.port))
+        super(TestPeerSenderWindow, self).setUp()
+
+
+    def tearDown(self):
+        self.sender.stop()
+        self.pool.close_all()
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        super(TestPeerSenderWindow, self).tearDown()
+
+
+    @asyncio.coroutine
+    def handle_peer(self, reader, writer):
+        """ Peer that holds its ACKs until hold_acks messages have arrived,
+        then ACKs them newest first.  Optionally ignores the first message """
+        held = []
+        while True:
+            data = yield from reader.readline()
+            data = data.lstrip(FRAMED_PREAMBLE)
+            if len(data) == 0:
+                break
+            self.received.append(data.decode().rstrip())
+            if self.drop_first is True and len(self.received) == 1:
+                continue
+            held.append(data.split(b',')[0] + b'\n')
+            if len(held) >= self.hold_acks:
+                for ack in reversed(held):
+                    writer.write(ack)
+                held = []
+                yield from writer.drain()
+        writer.close()
+
+
+    @asyncio.coroutine
+    def wait_for_sent(self, count):
+        while self.sender.sent < count:
+            yield from asyncio.sleep(0.01)
+
+
+    def queue_msgs(self, refs):
+        for ref in refs:
+            self.sender.queue.put_nowait(ref + ',127.0.0.1,27094,127.0.0.1,27001,100')
+
+
+    def test_window(self):
+        """ test that several messages are sent before any ACK arrives and
+        that out-of-order ACKs are matched by ref """
+        self.hold_acks = 4
+        self.sender = PeerSender(self.loop, '127.0.0.1', self.port, self.pool,
+                                 logger=self.log, send_window=4)
+        self.queue_msgs(['101', '102', '103', '104', '105', '106', '107', '108'])
+        self.sender.start()
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_sent(8), 2.0))
+        self.assertEqual(self.sender.max_in_flight, 4)
+        self.assertEqual(self.sender.stats['in_flight'], 0)
+        self.assertEqual(self.sender.retransmits, 0)
+        self.assertEqual(len(self.received), 8)
+
+
+    def test_window_limit(self):
+        """ test that no more than window messages are left unacknowledged """
+        self.hold_acks = 100
+        self.sender = PeerSender(self.loop, '127.0.0.1', self.port, self.pool,
+                                 logger=self.log, send_window=3, ack_timeout=10)
+        self.queue_msgs(['101', '102', '103', '104', '105'])
+        self.sender.start()
+        self.loop.run_until_complete(asyncio.sleep(0.1))
+        self.assertEqual(len(self.received), 3)
+        self.assertEqual(self.sender.stats['in_flight'], 3)
+        self.assertEqual(self.sender.stats['queued'], 1)
+
+
+    def test_release_between_bursts(self):
+        """ test that the connection goes back to the pool once a burst is
+        ACK'd and that the next burst reuses it """
+        self.hold_acks = 1
+        self.sender = PeerSender(self.loop, '127.0.0.1', self.port, self.pool,
+                                 logger=self.log)
+        self.queue_msgs(['101', '102', '103'])
+        self.sender.start()
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_sent(3), 2.0))
+        self.assertIsNone(self.sender.writer_out)
+        self.assertEqual(self.pool.idle_count, 1)
+        self.queue_msgs(['104', '105'])
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_sent(5), 2.0))
+        self.assertEqual(self.pool.misses, 1)
+        self.assertEqual(self.pool.hits, 1)
+        self.assertEqual(self.sender.stats['connections'],
+                         {'opened': 1, 'reused': 1, 'released': 2})
+
+
+    def test_retransmit(self):
+        """ test that a message whose ACK times out is retransmitted """
+        self.hold_acks = 1
+        self.drop_first = True
+        self.sender = PeerSender(self.loop, '127.0.0.1', self.port, self.pool,
+                                 logger=self.log, ack_timeout=0.1)
+        self.queue_msgs(['101', '102'])
+        self.sender.start()
+        self.loop.run_until_complete(
+            asyncio.wait_for(self.wait_for_sent(2), 2.0))
+        self.assertEqual(self.sender.retransmits, 1)
+        self.assertEqual(self.received[0].split(',')[0], '101')
+        self.assertEqual(self.received[-1].split(',')[0], '101')
+
+
+    def test_dead_letter(self):
+        """ test that a message is dead-lettered once its retries run out
+        and that the retries back off """
+        self.hold_acks = 100
+        dead_letters = DeadLetterQueue(logger=self.log)
+        self.sender = PeerSender(self.loop, '127.0.0.1', self.port, self.pool,
+                                 logger=self.log, ack_timeout=0.05,
+                                 max_retransmits=2, retry_backoff=0.1,
+                                 retry_jitter=0, dead_letters=dead_letters)
+        self.queue_msgs(['101'])
+        self.sender.start()
+        self.loop.run_until_complete(asyncio.sleep(0.15))
+        self.assertEqual(len(self.received), 2)
+        self.loop.run_until_complete(asyncio.sleep(0.5))
+        self.assertEqual(len(self.received), 3)
+        self.assertEqual(self.sender.failed, 1)
+        self.assertEqual(self.sender.stats['in_flight'], 0)
+        self.assertEqual(len(dead_letters), 1)
+        self.assertEqual(dead_letters.entries()[0].attempts, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
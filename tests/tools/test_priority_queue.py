@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+""" test_priority_queue.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.priority_queue import PriorityMessageQueue
+
+
+# Define test class ***********************************************************
+class TestPriorityMessageQueue(unittest.TestCase):
+    """ unittests for the outgoing priority message queue """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        self.loop = asyncio.get_event_loop()
+        self.priorities = {'604': 0, '100': 2}
+        super(TestPriorityMessageQueue, self).__init__(*args, **kwargs)
+
+
+    def msg(self, ref, msg_type):
+        return '%s,127.0.0.1,27041,127.0.0.1,27051,%s,fylt1' % (ref, msg_type)
+
+
+    def drain(self, queue):
+        return [queue.get_nowait().split(',')[0] for i in range(queue.qsize())]
+
+
+    def test_priority_order(self):
+        """ test that classes are served in order and FIFO within a class """
+        queue = PriorityMessageQueue(loop=self.loop, logger=self.log,
+                                     priorities=self.priorities)
+        queue.put_nowait(self.msg('101', '100'))
+        queue.put_nowait(self.msg('102', '302'))
+        queue.put_nowait(self.msg('103', '604'))
+        queue.put_nowait(self.msg('104', '302'))
+        queue.put_nowait(self.msg('105', '604'))
+        queue.put_nowait('malformed')
+        self.assertEqual(queue.qsize(), 6)
+        self.assertEqual(queue.stats['queued'], [2, 3, 1])
+        self.assertEqual(self.drain(queue),
+                         ['103', '105', '102', '104', 'malformed', '101'])
+        self.assertTrue(queue.empty())
+
+
+    def test_starvation_limit(self):
+        """ test that a waiting low class is served after starvation_limit
+        higher class messages """
+        queue = PriorityMessageQueue(loop=self.loop, logger=self.log,
+                                     priorities=self.priorities,
+                                     starvation_limit=2)
+        queue.put_nowait(self.msg('101', '100'))
+        for ref in range(102, 107):
+            queue.put_nowait(self.msg(str(ref), '604'))
+        self.assertEqual(self.drain(queue),
+                         ['102', '103', '101', '104', '105', '106'])
+        self.assertEqual(queue.promoted, 1)
+
+
+    def test_get_wakes(self):
+        """ test that a waiting get() is woken by put_nowait() """
+        queue = PriorityMessageQueue(loop=self.loop, logger=self.log,
+                                     priorities=self.priorities)
+        self.loop.call_later(0.01, queue.put_nowait, self.msg('101', '604'))
+        msg = self.loop.run_until_complete(asyncio.wait_for(queue.get(), 1.0))
+        self.assertEqual(msg.split(',')[0], '101')
+
+
+if __name__ == "__main__":
+    unittest.main()
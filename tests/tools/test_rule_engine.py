@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+""" test_rule_engine.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import datetime
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.rule_engine import DUSK_TO_DAWN
+from bob_auto_service.tools.rule_engine import RuleEngine
+from bob_auto_service.tools.rule_engine import rule_name
+
+
+# Define test class ***********************************************************
+class TestRuleEngine(unittest.TestCase):
+    """ unittests for the locally evaluated device rules """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestRuleEngine, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.transitions = []
+        self.engine = RuleEngine(
+            self.loop, 38.566268, -90.409878,
+            on_transition=lambda rule, cmd: self.transitions.append((rule, cmd)),
+            logger=self.log, utc_offset=-6)
+
+
+    def tearDown(self):
+        self.engine.stop()
+        self.loop.close()
+
+
+    def test_rule_name(self):
+        """ test that the configured and legacy spellings both match """
+        self.assertEqual(rule_name('dusk to dawn'), DUSK_TO_DAWN)
+        self.assertEqual(rule_name('dusk_to_dawn'), DUSK_TO_DAWN)
+        self.assertEqual(rule_name(' Dusk to Dawn'), DUSK_TO_DAWN)
+        self.assertTrue(self.engine.handles('dusk_to_dawn'))
+        self.assertFalse(self.engine.handles('schedule'))
+        self.assertIsNone(self.engine.evaluate('schedule'))
+
+
+    def test_sunrise_sunset(self):
+        """ test that sun times are local, follow daylight saving time, and
+        are worked out once per day """
+        sunrise, sunset = self.engine.sunrise_sunset(datetime.date(2017, 6, 21))
+        self.assertEqual(sunrise.date(), datetime.date(2017, 6, 21))
+        self.assertTrue(datetime.time(5, 30) < sunrise.time() < datetime.time(5, 45))
+        self.assertTrue(datetime.time(20, 20) < sunset.time() < datetime.time(20, 40))
+        sunrise, sunset = self.engine.sunrise_sunset(datetime.date(2017, 12, 21))
+        self.assertTrue(datetime.time(7, 5) < sunrise.time() < datetime.time(7, 25))
+        self.assertTrue(datetime.time(16, 35) < sunset.time() < datetime.time(16, 55))
+        self.assertIs(self.engine.sunrise_sunset(datetime.date(2017, 12, 21))[0], sunrise)
+        # Days before yesterday are dropped
+        self.assertNotIn(datetime.date(2017, 6, 21), self.engine.sun_times)
+
+
+    def test_dusk_to_dawn(self):
+        """ test the command and next transition through a day """
+        day = datetime.date(2017, 10, 4)
+        sunrise, sunset = self.engine.sunrise_sunset(day)
+        night = datetime.datetime.combine(day, datetime.time(3, 0))
+        self.assertEqual(self.engine.dusk_to_dawn(night), ('on', sunrise))
+        noon = datetime.datetime.combine(day, datetime.time(12, 0))
+        self.assertEqual(self.engine.dusk_to_dawn(noon), ('off', sunset))
+        self.assertEqual(self.engine.dusk_to_dawn(sunset), (
+            'on', self.engine.sunrise_sunset(day + datetime.timedelta(days=1))[0]))
+        self.assertEqual(self.engine.evaluate('dusk_to_dawn', noon), 'off')
+
+
+    def test_run(self):
+        """ test that transitions are reported once and the timer is armed
+        for the next one, or the recheck if sooner """
+        self.engine.recheck = 60
+        self.engine.start()
+        cmd = self.engine.evaluate(DUSK_TO_DAWN)
+        self.assertEqual(self.transitions, [(DUSK_TO_DAWN, cmd)])
+        self.assertLessEqual(self.engine.handle._when - self.loop.time(), 60)
+        self.engine.run()
+        self.assertEqual(len(self.transitions), 1)
+        self.engine.commands[DUSK_TO_DAWN] = 'unknown'
+        self.engine.run()
+        self.assertEqual(self.transitions[-1], (DUSK_TO_DAWN, cmd))
+        self.assertEqual(self.engine.stats['transitions'], 2)
+        self.assertEqual(self.engine.stats['evaluations'], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+""" test_schedule_cache.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import datetime
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.messages.envelope import MessageEnvelope
+from bob_auto_service.msg_processing_schedule import next_transition_of
+from bob_auto_service.tools.schedule_cache import ScheduleCache
+
+
+# Define test class ***********************************************************
+class TestScheduleCache(unittest.TestCase):
+    """ unittests for the cache of device schedules and their transitions """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestScheduleCache, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.due = []
+        self.cache = ScheduleCache(self.loop, on_due=self.due.append,
+                                   logger=self.log, max_age=600)
+
+
+    def tearDown(self):
+        self.loop.close()
+
+
+    def in_seconds(self, seconds):
+        return (datetime.datetime.now() + datetime.timedelta(
+            seconds=seconds)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+    def test_update(self):
+        """ test that a schedule with a next transition is cached and its
+        timer armed for that second, and that one without isn't cached """
+        self.assertTrue(self.cache.needs_query('Lamp'))
+        self.cache.update('Lamp', 'on', self.in_seconds(300))
+        entry = self.cache.entries['lamp']
+        self.assertEqual(entry.dev_cmd, 'on')
+        self.assertAlmostEqual(entry.due - self.loop.time(), 300, delta=1.5)
+        self.assertEqual(entry.handle._when, entry.due)
+        self.assertFalse(self.cache.needs_query('lamp'))
+        # No transition, or one already past, leaves the device polled
+        self.cache.update('fan', 'off')
+        self.assertTrue(self.cache.needs_query('fan'))
+        self.cache.update('fan', 'off', self.in_seconds(-5))
+        self.assertTrue(self.cache.needs_query('fan'))
+        self.cache.update('fan', 'off', 'not a time')
+        self.assertTrue(self.cache.needs_query('fan'))
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(self.cache.stats['misses'], 4)
+
+
+    def test_fire(self):
+        """ test that a transition calls on_due and leaves the device to be
+        queried, and that a new answer replaces the old timer """
+        self.cache.update('lamp', 'on', self.in_seconds(300))
+        old_handle = self.cache.entries['lamp'].handle
+        self.cache.update('lamp', 'on', self.in_seconds(600))
+        self.assertTrue(old_handle._cancelled)
+        self.cache.fire('lamp')
+        self.assertEqual(self.due, ['lamp'])
+        self.assertIsNone(self.cache.entries['lamp'].handle)
+        self.assertTrue(self.cache.needs_query('lamp'))
+        self.assertEqual(self.cache.stats['transitions'], 1)
+        # A failing on_due is logged, not raised
+        self.cache.on_due = None
+        self.cache.fire('lamp')
+        self.assertEqual(self.cache.stats['transitions'], 2)
+
+
+    def test_fire_on_time(self):
+        """ test that the armed timer runs on_due at the transition """
+        self.cache.update('lamp', 'on', self.in_seconds(1))
+        due = self.cache.entries['lamp'].due
+        self.loop.run_until_complete(
+            asyncio.sleep(due - self.loop.time() + 0.05, loop=self.loop))
+        self.assertEqual(self.due, ['lamp'])
+
+
+    def test_max_age_and_invalidate(self):
+        """ test that old entries are re-queried and that invalidation drops
+        entries and cancels their timers """
+        self.cache.update('lamp', 'on', self.in_seconds(3000))
+        self.cache.update('fan', 'off', self.in_seconds(3000))
+        self.cache.entries['lamp'].checked -= 600
+        self.assertTrue(self.cache.needs_query('lamp'))
+        self.assertFalse(self.cache.needs_query('fan'))
+        handle = self.cache.entries['fan'].handle
+        self.cache.invalidate('FAN')
+        self.assertTrue(handle._cancelled)
+        self.assertNotIn('fan', self.cache.entries)
+        self.cache.invalidate()
+        self.assertEqual(self.cache.stats['cached'], 0)
+
+
+    def test_next_transition_of(self):
+        """ test reading the optional next transition field of a GDSS ACK """
+        header = '100,192.168.86.1,27001,192.168.86.2,27003,303,'
+        self.assertEqual(
+            next_transition_of(MessageEnvelope(
+                header + 'lamp,on,2017-10-04 19:30:00')),
+            '2017-10-04 19:30:00')
+        self.assertIsNone(next_transition_of(MessageEnvelope(header + 'lamp,on')))
+        self.assertIsNone(next_transition_of(MessageEnvelope(header + 'lamp,on,')))
+        self.assertIsNone(next_transition_of(MessageEnvelope('100,lamp,on')))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+""" test_supervisor.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.supervisor import SupervisedTask
+from bob_auto_service.tools.supervisor import RUNNING, STOPPED
+
+
+# Define test class ***********************************************************
+class TestSupervisedTask(unittest.TestCase):
+    """ unittests for supervised, restart-on-crash service tasks """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestSupervisedTask, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.calls = []
+
+
+    def tearDown(self):
+        self.loop.close()
+
+
+    def test_stop(self):
+        """ test that a running task records its work and can be stopped """
+        @asyncio.coroutine
+        def target(task):
+            while True:
+                started = self.loop.time()
+                yield from asyncio.sleep(0.01, loop=self.loop)
+                task.record(started)
+        task = SupervisedTask(self.loop, 'worker', target, logger=self.log)
+        task.start()
+        self.loop.run_until_complete(asyncio.sleep(0.055, loop=self.loop))
+        self.assertEqual(task.state, RUNNING)
+        task.stop()
+        self.loop.run_until_complete(asyncio.sleep(0, loop=self.loop))
+        self.assertEqual(task.state, STOPPED)
+        self.assertTrue(task.task.cancelled())
+        self.assertGreaterEqual(task.cycles, 3)
+        self.assertGreaterEqual(task.stats['max_busy'], 0.01)
+
+
+    def test_restart_backoff(self):
+        """ test that a crashing coroutine task is restarted with a growing
+        delay, and that completed work resets the delay """
+        @asyncio.coroutine
+        def target(task):
+            self.calls.append(self.loop.time())
+            if len(self.calls) == 3:
+                task.record(self.loop.time())
+            if len(self.calls) < 5:
+                raise RuntimeError('crash %s' % len(self.calls))
+        task = SupervisedTask(self.loop, 'worker', target, logger=self.log,
+                              restart_delay=0.01, restart_delay_max=0.02)
+        self.loop.run_until_complete(task.start())
+        self.assertEqual(len(self.calls), 5)
+        self.assertEqual(task.crashes, 4)
+        self.assertEqual(task.restarts, 4)
+        self.assertEqual(task.cycles, 1)
+        self.assertEqual(task.state, STOPPED)
+        gaps = [b - a for a, b in zip(self.calls, self.calls[1:])]
+        # 0.01 then 0.02 (capped), reset by record() to 0.01, then 0.02
+        self.assertGreaterEqual(gaps[1], 0.02)
+        self.assertGreaterEqual(gaps[3], 0.02)
+        self.assertLess(gaps[2], gaps[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
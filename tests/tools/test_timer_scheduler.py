@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+""" test_timer_scheduler.py:
+"""
+
+# Import Required Libraries (Standard, Third Party, Local) ********************
+import asyncio
+import logging
+import os
+import sys
+import unittest
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from bob_auto_service.tools.supervisor import SupervisedTask
+from bob_auto_service.tools.timer_scheduler import TimerScheduler
+
+
+# Define test class ***********************************************************
+class TestTimerScheduler(unittest.TestCase):
+    """ unittests for the heap-based periodic job scheduler """
+
+    def __init__(self, *args, **kwargs):
+        logging.basicConfig(stream=sys.stdout)
+        self.log = logging.getLogger(__name__)
+        self.log.level = logging.DEBUG
+        super(TestTimerScheduler, self).__init__(*args, **kwargs)
+
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.scheduler = TimerScheduler(self.loop, logger=self.log)
+        self.calls = []
+
+
+    def tearDown(self):
+        self.loop.close()
+
+
+    def test_run_due(self):
+        """ test that jobs run in due order, keep their slots through errors,
+        and skip calls they fell behind on """
+        def fail():
+            self.calls.append('fail')
+            raise ValueError('job fails')
+        fast = self.scheduler.add('fast', 10, lambda: self.calls.append('fast'),
+                                  delay=0)
+        slow = self.scheduler.add('slow', 1000, lambda: self.calls.append('slow'),
+                                  delay=-1)
+        failing = self.scheduler.add('failing', 10, fail, delay=5)
+        delay = self.scheduler.run_due()
+        self.assertEqual(self.calls, ['slow', 'fast'])
+        self.assertAlmostEqual(delay, 5, places=2)
+        self.assertEqual(slow.skipped, 0)
+        # Pretend the loop stalled for 25 seconds
+        fast.slot -= 25
+        failing.slot -= 25
+        self.scheduler.heap = []
+        for job in [fast, failing]:
+            self.scheduler.push(job)
+        self.scheduler.run_due()
+        self.assertEqual(self.calls, ['slow', 'fast', 'fail', 'fast'])
+        self.assertEqual(fast.skipped, 1)
+        self.assertEqual(failing.skipped, 2)
+        self.assertEqual(failing.errors, 1)
+        self.assertIn('job fails', failing.stats['last_error'])
+        self.assertGreater(failing.slot, self.loop.time())
+        self.scheduler.cancel(fast)
+        self.assertEqual(self.scheduler.jobs, [slow, failing])
+
+
+    def test_jitter(self):
+        """ test that jitter moves each call around its own slot """
+        job = self.scheduler.add('jittery', 10, lambda: None, jitter=2)
+        slot = job.slot
+        dues = []
+        for i in range(50):
+            self.scheduler.push(job)
+            dues.append(job.due - slot)
+        self.assertTrue(all(-2 <= due <= 2 for due in dues))
+        self.assertGreater(len(set(dues)), 1)
+
+
+    def test_run(self):
+        """ test that the supervised scheduler wakes when jobs are due and
+        for jobs added while it sleeps """
+        task = SupervisedTask(self.loop, 'Timer scheduler', self.scheduler.run,
+                              logger=self.log)
+        task.start()
+        self.loop.run_until_complete(asyncio.sleep(0.01, loop=self.loop))
+        self.scheduler.add('periodic', 0.02, lambda: self.calls.append(
+            self.loop.time()))
+        self.loop.run_until_complete(asyncio.sleep(0.11, loop=self.loop))
+        task.stop()
+        self.loop.run_until_complete(asyncio.sleep(0, loop=self.loop))
+        self.assertGreaterEqual(len(self.calls), 4)
+        self.assertEqual(task.cycles, len(self.calls))
+        gaps = [b - a for a, b in zip(self.calls, self.calls[1:])]
+        self.assertTrue(all(0.015 < gap < 0.03 for gap in gaps))
+
+
+    def test_failing_job_isolated(self):
+        """ test that a job raising on every call is logged and counted
+        without restarting the scheduler or holding up the other jobs """
+        def fail():
+            raise RuntimeError('heartbeat failed')
+        task = SupervisedTask(self.loop, 'Timer scheduler', self.scheduler.run,
+                              logger=self.log)
+        failing = self.scheduler.add('failing', 0.02, fail, delay=0)
+        good = self.scheduler.add('good', 0.02, lambda: self.calls.append(
+            self.loop.time()), delay=0.01)
+        task.start()
+        self.loop.run_until_complete(asyncio.sleep(0.11, loop=self.loop))
+        task.stop()
+        self.loop.run_until_complete(asyncio.sleep(0, loop=self.loop))
+        self.assertGreaterEqual(failing.errors, 4)
+        self.assertEqual(failing.errors, failing.runs)
+        self.assertIn('heartbeat failed', failing.stats['last_error'])
+        self.assertGreaterEqual(good.runs, 4)
+        self.assertEqual(good.errors, 0)
+        self.assertEqual(len(self.calls), good.runs)
+        self.assertEqual(task.crashes, 0)
+        self.assertEqual(task.restarts, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()